@@ -1,7 +1,11 @@
+from sqlalchemy import func, or_, and_, insert
 from sqlalchemy.orm import Session
 from . import models
 from ..schemas import product_group, process, target, measurement, spec, equipment
+from ..services import spc_monitor, rollups, hierarchy, search_index, spec_cache, notification_service, result_cache
 import statistics
+import base64
+import json
 from datetime import datetime, timedelta
 
 # 제품군 CRUD 함수
@@ -11,7 +15,9 @@ def create_product_group(db: Session, product_group: product_group.ProductGroupC
         description=product_group.description
     )
     db.add(db_product_group)
+    hierarchy.bump_version(db)
     db.commit()
+    hierarchy.invalidate()
     db.refresh(db_product_group)
     return db_product_group
 
@@ -26,7 +32,9 @@ def update_product_group(db: Session, product_group_id: int, product_group: prod
     if db_product_group:
         db_product_group.name = product_group.name
         db_product_group.description = product_group.description
+        hierarchy.bump_version(db)
         db.commit()
+        hierarchy.invalidate()
         db.refresh(db_product_group)
     return db_product_group
 
@@ -34,7 +42,9 @@ def delete_product_group(db: Session, product_group_id: int):
     db_product_group = db.query(models.ProductGroup).filter(models.ProductGroup.id == product_group_id).first()
     if db_product_group:
         db.delete(db_product_group)
+        hierarchy.bump_version(db)
         db.commit()
+        hierarchy.invalidate()
         return True
     return False
 
@@ -46,7 +56,9 @@ def create_process(db: Session, process: process.ProcessCreate):
         description=process.description
     )
     db.add(db_process)
+    hierarchy.bump_version(db)
     db.commit()
+    hierarchy.invalidate()
     db.refresh(db_process)
     return db_process
 
@@ -65,7 +77,9 @@ def update_process(db: Session, process_id: int, process: process.ProcessCreate)
         db_process.product_group_id = process.product_group_id
         db_process.name = process.name
         db_process.description = process.description
+        hierarchy.bump_version(db)
         db.commit()
+        hierarchy.invalidate()
         db.refresh(db_process)
     return db_process
 
@@ -73,7 +87,9 @@ def delete_process(db: Session, process_id: int):
     db_process = db.query(models.Process).filter(models.Process.id == process_id).first()
     if db_process:
         db.delete(db_process)
+        hierarchy.bump_version(db)
         db.commit()
+        hierarchy.invalidate()
         return True
     return False
 
@@ -85,7 +101,12 @@ def create_target(db: Session, target: target.TargetCreate):
         description=target.description
     )
     db.add(db_target)
+    db.flush()
+    # 새 타겟은 측정 데이터가 없으므로 처음부터 집계 완료 상태
+    rollups.mark_covered(db, db_target.id)
+    hierarchy.bump_version(db)
     db.commit()
+    hierarchy.invalidate()
     db.refresh(db_target)
     return db_target
 
@@ -104,7 +125,9 @@ def update_target(db: Session, target_id: int, target: target.TargetCreate):
         db_target.process_id = target.process_id
         db_target.name = target.name
         db_target.description = target.description
+        hierarchy.bump_version(db)
         db.commit()
+        hierarchy.invalidate()
         db.refresh(db_target)
     return db_target
 
@@ -112,7 +135,10 @@ def delete_target(db: Session, target_id: int):
     db_target = db.query(models.Target).filter(models.Target.id == target_id).first()
     if db_target:
         db.delete(db_target)
+        rollups.clear_coverage(db, target_id)
+        hierarchy.bump_version(db)
         db.commit()
+        hierarchy.invalidate()
         return True
     return False
 
@@ -158,14 +184,24 @@ def create_measurement(db: Session, measurement_data: measurement.MeasurementCre
     )
     
     db.add(db_measurement)
+    db.flush()
+    
+    # 실시간 SPC 판정 상태 갱신 (같은 트랜잭션에서 처리)
+    spc_monitor.record_measurement(db, db_measurement)
+    
+    # 일별 집계에 반영 (측정 일시는 DB 기본값이므로 flush 후 조회)
+    db.refresh(db_measurement, attribute_names=["created_at"])
+    rollups.add_measurement(db, db_measurement)
+    
+    # 검색 색인에 DEVICE / LOT NO / WAFER NO 추가
+    search_index.index_measurements(db, [db_measurement])
+    
     db.commit()
+    result_cache.invalidate(db_measurement.target_id)
     db.refresh(db_measurement)
 
     # SPEC 체크 및 알림 생성
-    active_spec = db.query(models.Spec).filter(
-        models.Spec.target_id == db_measurement.target_id,
-        models.Spec.is_active == True
-    ).first()
+    active_spec = spec_cache.get_active_spec(db, db_measurement.target_id)
 
     if active_spec:
         # SPEC 범위를 벗어난 값이 있는지 확인
@@ -177,9 +213,8 @@ def create_measurement(db: Session, measurement_data: measurement.MeasurementCre
             db_measurement.value_right
         ]
         
-        # SPEC 범위를 벗어난 값이 있는 경우 알림 생성
+        # SPEC 범위를 벗어난 값이 있는 경우 알림 요청 (커밋 후 큐에 추가, 발송은 백그라운드에서 처리)
         if any(v < active_spec.lsl or v > active_spec.usl for v in values):
-            from ..services import notification_service
             notification_service.create_spec_violation_notification(
                 db=db,
                 measurement=db_measurement,
@@ -189,15 +224,12 @@ def create_measurement(db: Session, measurement_data: measurement.MeasurementCre
 
 # backend/database/crud.py 파일의 get_measurements 함수 업데이트
 
-def get_measurements(db: Session, target_id: int = None, process_id: int = None,
-                     product_group_id: int = None, device: str = None, 
-                     lot_no: str = None, start_date: datetime = None, 
-                     end_date: datetime = None, equipment_id: int = None,
-                     keyword: str = None):
-    
-    # 조인 쿼리를 위한 설정
-    query = db.query(models.Measurement)
-    
+def _filter_measurements(query, target_id: int = None, process_id: int = None,
+                         product_group_id: int = None, device: str = None,
+                         lot_no: str = None, start_date: datetime = None,
+                         end_date: datetime = None, equipment_id: int = None,
+                         keyword: str = None):
+    """측정 데이터 조회 조건 적용 (get_measurements, get_measurements_page 공통)"""
     # 제품군 또는 공정으로 필터링이 필요한 경우 조인 수행
     if product_group_id or process_id:
         query = query.join(models.Target, models.Measurement.target_id == models.Target.id)
@@ -212,10 +244,12 @@ def get_measurements(db: Session, target_id: int = None, process_id: int = None,
     # 기존 필터 적용
     if target_id:
         query = query.filter(models.Measurement.target_id == target_id)
+    # 부분 문자열 검색은 검색 색인에서 일치하는 값을 찾아 IN 조건으로 변환
+    db = query.session
     if device:
-        query = query.filter(models.Measurement.device.like(f"%{device}%"))
+        query = query.filter(search_index.contains_condition(db, "device", device))
     if lot_no:
-        query = query.filter(models.Measurement.lot_no.like(f"%{lot_no}%"))
+        query = query.filter(search_index.contains_condition(db, "lot_no", lot_no))
     if start_date:
         query = query.filter(models.Measurement.created_at >= start_date)
     if end_date:
@@ -231,21 +265,163 @@ def get_measurements(db: Session, target_id: int = None, process_id: int = None,
     # 키워드 검색 처리
     if keyword:
         query = query.filter(
-            (models.Measurement.device.like(f"%{keyword}%")) |
-            (models.Measurement.lot_no.like(f"%{keyword}%")) |
-            (models.Measurement.wafer_no.like(f"%{keyword}%"))
+            search_index.contains_condition(db, "device", keyword) |
+            search_index.contains_condition(db, "lot_no", keyword) |
+            search_index.contains_condition(db, "wafer_no", keyword)
         )
     
+    return query
+
+def get_measurements(db: Session, target_id: int = None, process_id: int = None,
+                     product_group_id: int = None, device: str = None, 
+                     lot_no: str = None, start_date: datetime = None, 
+                     end_date: datetime = None, equipment_id: int = None,
+                     keyword: str = None):
+    
+    query = _filter_measurements(
+        db.query(models.Measurement),
+        target_id=target_id, process_id=process_id, product_group_id=product_group_id,
+        device=device, lot_no=lot_no, start_date=start_date, end_date=end_date,
+        equipment_id=equipment_id, keyword=keyword
+    )
+    
     # 최신 데이터 순으로 정렬
     query = query.order_by(models.Measurement.created_at.desc())
     
     return query.all()
 
+# 페이지 조회에서 정렬 가능한 컬럼 (조회 화면 테이블의 열)
+MEASUREMENT_SORT_COLUMNS = {
+    "created_at": models.Measurement.created_at,
+    "device": models.Measurement.device,
+    "lot_no": models.Measurement.lot_no,
+    "wafer_no": models.Measurement.wafer_no,
+    "avg_value": models.Measurement.avg_value,
+    "std_dev": models.Measurement.std_dev
+}
+
+# 실수 정렬 컬럼의 커서 비교 허용 오차 (저장 정밀도 소수점 3자리의 절반)
+# MySQL FLOAT는 단정밀도라 커서의 값과 정확히 일치하지 않으므로 같은 값은 범위로 비교
+MEASUREMENT_FLOAT_SORT_TOLERANCE = 0.0005
+
+# 전체 개수 계산 상한 (초과 시 추정치로 표시)
+MEASUREMENT_COUNT_LIMIT = 10000
+
+def encode_measurement_cursor(sort: str, order: str, value, measurement_id: int) -> str:
+    """마지막 행의 (정렬 값, ID)를 커서 문자열로 변환"""
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    payload = json.dumps({"s": sort, "o": order, "v": value, "id": measurement_id}, ensure_ascii=False)
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+def decode_measurement_cursor(cursor: str, sort: str, order: str):
+    """커서 문자열을 (정렬 값, ID)로 변환 (정렬 조건이 다르거나 형식이 잘못되면 ValueError)"""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8"))
+        value, measurement_id = payload["v"], int(payload["id"])
+    except (ValueError, KeyError, TypeError):
+        raise ValueError("Invalid cursor")
+    
+    if payload.get("s") != sort or payload.get("o") != order:
+        raise ValueError("Cursor does not match the requested sort")
+    
+    if sort == "created_at":
+        value = datetime.fromisoformat(value)
+    return value, measurement_id
+
+def get_measurements_page(db: Session, target_id: int = None, process_id: int = None,
+                          product_group_id: int = None, device: str = None,
+                          lot_no: str = None, start_date: datetime = None,
+                          end_date: datetime = None, equipment_id: int = None,
+                          keyword: str = None, sort: str = "created_at", order: str = "desc",
+                          limit: int = 100, cursor: str = None, include_total: bool = True):
+    """
+    측정 데이터 페이지 조회 (정렬 컬럼과 ID 기준 키셋 페이지네이션)
+    커서 이후의 행만 인덱스 순서대로 limit개 조회하므로 뒤쪽 페이지도 첫 페이지와 비용이 같음
+    전체 개수는 MEASUREMENT_COUNT_LIMIT까지만 세고, 넘으면 추정치로 표시
+    """
+    if sort not in MEASUREMENT_SORT_COLUMNS:
+        raise ValueError(f"Invalid sort. Must be one of: {', '.join(MEASUREMENT_SORT_COLUMNS)}")
+    if order not in ("asc", "desc"):
+        raise ValueError("Invalid order. Use 'asc' or 'desc'")
+    
+    sort_column = MEASUREMENT_SORT_COLUMNS[sort]
+    id_column = models.Measurement.id
+    
+    query = _filter_measurements(
+        db.query(models.Measurement),
+        target_id=target_id, process_id=process_id, product_group_id=product_group_id,
+        device=device, lot_no=lot_no, start_date=start_date, end_date=end_date,
+        equipment_id=equipment_id, keyword=keyword
+    )
+    
+    # 전체 개수 (상한까지만 계산)
+    total_count = None
+    total_is_estimate = False
+    if include_total:
+        limited = query.with_entities(id_column).limit(MEASUREMENT_COUNT_LIMIT + 1).subquery()
+        total_count = db.query(func.count()).select_from(limited).scalar()
+        if total_count > MEASUREMENT_COUNT_LIMIT:
+            total_count = MEASUREMENT_COUNT_LIMIT
+            total_is_estimate = True
+    
+    # 커서 이후의 행만 조회
+    if cursor:
+        last_value, last_id = decode_measurement_cursor(cursor, sort, order)
+        if isinstance(last_value, float):
+            lower = last_value - MEASUREMENT_FLOAT_SORT_TOLERANCE
+            upper = last_value + MEASUREMENT_FLOAT_SORT_TOLERANCE
+            same_value = sort_column.between(lower, upper)
+        else:
+            lower = upper = last_value
+            same_value = sort_column == last_value
+        if order == "desc":
+            query = query.filter(or_(
+                sort_column < lower,
+                and_(same_value, id_column < last_id)
+            ))
+        else:
+            query = query.filter(or_(
+                sort_column > upper,
+                and_(same_value, id_column > last_id)
+            ))
+    
+    if order == "desc":
+        query = query.order_by(sort_column.desc(), id_column.desc())
+    else:
+        query = query.order_by(sort_column.asc(), id_column.asc())
+    
+    # 다음 페이지 존재 여부 확인을 위해 1개 더 조회
+    rows = query.limit(limit + 1).all()
+    has_more = len(rows) > limit
+    items = rows[:limit]
+    
+    next_cursor = None
+    if has_more:
+        last = items[-1]
+        last_value = getattr(last, sort)
+        if isinstance(last_value, float):
+            last_value = round(last_value, 3)
+        next_cursor = encode_measurement_cursor(sort, order, last_value, last.id)
+    
+    return {
+        "items": items,
+        "next_cursor": next_cursor,
+        "has_more": has_more,
+        "limit": limit,
+        "sort": sort,
+        "order": order,
+        "total_count": total_count,
+        "total_is_estimate": total_is_estimate
+    }
+
 # 측정 데이터 업데이트 함수 수정
 def update_measurement(db: Session, measurement_id: int, measurement_data: measurement.MeasurementCreate):
     db_measurement = db.query(models.Measurement).filter(models.Measurement.id == measurement_id).first()
     
     if db_measurement:
+        previous_target_id = db_measurement.target_id
+        
         # 업데이트할 필드 설정
         for key, value in measurement_data.dict(exclude_unset=True).items():
             setattr(db_measurement, key, value)
@@ -265,14 +441,27 @@ def update_measurement(db: Session, measurement_id: int, measurement_data: measu
         db_measurement.range_value = round(db_measurement.max_value - db_measurement.min_value, 3)
         db_measurement.std_dev = round(statistics.stdev(values), 3) if len(values) > 1 else 0
         
+        # 과거 데이터가 바뀌었으므로 실시간 SPC 상태는 다음 입력 시 재구성
+        spc_monitor.reset_state(db, previous_target_id)
+        if db_measurement.target_id != previous_target_id:
+            spc_monitor.reset_state(db, db_measurement.target_id)
+        
+        # 변경된 값을 검색 색인에 추가
+        search_index.index_measurements(db, [db_measurement])
+        
+        # 해당 일자의 일별 집계 재계산 (타겟이 바뀐 경우 이전 타겟도 재계산)
+        db.flush()
+        rollups.rebuild_for_days(db, db_measurement.target_id, [db_measurement.created_at])
+        if db_measurement.target_id != previous_target_id:
+            rollups.rebuild_for_days(db, previous_target_id, [db_measurement.created_at])
+        
+        result_cache.bump_data_version(db, previous_target_id, db_measurement.target_id)
         db.commit()
+        result_cache.invalidate(previous_target_id, db_measurement.target_id)
         db.refresh(db_measurement)
 
         # SPEC 체크 및 알림 생성
-        active_spec = db.query(models.Spec).filter(
-            models.Spec.target_id == db_measurement.target_id,
-            models.Spec.is_active == True
-        ).first()
+        active_spec = spec_cache.get_active_spec(db, db_measurement.target_id)
 
         if active_spec:
             # SPEC 범위를 벗어난 값이 있는지 확인
@@ -284,9 +473,8 @@ def update_measurement(db: Session, measurement_id: int, measurement_data: measu
                 db_measurement.value_right
             ]
             
-            # SPEC 범위를 벗어난 값이 있는 경우 알림 생성
+            # SPEC 범위를 벗어난 값이 있는 경우 알림 요청 (커밋 후 큐에 추가, 발송은 백그라운드에서 처리)
             if any(v < active_spec.lsl or v > active_spec.usl for v in values):
-                from ..services import notification_service
                 notification_service.create_spec_violation_notification(
                     db=db,
                     measurement=db_measurement,
@@ -298,8 +486,18 @@ def update_measurement(db: Session, measurement_id: int, measurement_data: measu
 def delete_measurement(db: Session, measurement_id: int):
     db_measurement = db.query(models.Measurement).filter(models.Measurement.id == measurement_id).first()
     if db_measurement:
+        target_id = db_measurement.target_id
+        created_at = db_measurement.created_at
+        spc_monitor.reset_state(db, target_id)
         db.delete(db_measurement)
+        
+        # 해당 일자의 일별 집계 재계산
+        db.flush()
+        rollups.rebuild_for_days(db, target_id, [created_at])
+        
+        result_cache.bump_data_version(db, target_id)
         db.commit()
+        result_cache.invalidate(target_id)
         return True
     return False
 
@@ -312,10 +510,7 @@ def check_spec_status(db: Session, measurement_id: int):
         return None
     
     # 현재 활성화된 SPEC 찾기
-    db_spec = db.query(models.Spec).filter(
-        models.Spec.target_id == db_measurement.target_id,
-        models.Spec.is_active == True
-    ).first()
+    db_spec = spec_cache.get_active_spec(db, db_measurement.target_id)
     
     if not db_spec:
         return {"spec_found": False}
@@ -364,7 +559,10 @@ def create_spec(db: Session, spec_data: spec.SpecCreate):
     )
     
     db.add(db_spec)
+    version = spec_cache.bump_version(db)
     db.commit()
+    spec_cache.invalidate(spec_data.target_id, version=version)
+    result_cache.invalidate(spec_data.target_id)
     db.refresh(db_spec)
     return db_spec
 
@@ -385,22 +583,24 @@ def get_spec(db: Session, spec_id: int):
     return db.query(models.Spec).filter(models.Spec.id == spec_id).first()
 
 def get_active_spec(db: Session, target_id: int):
-    return db.query(models.Spec).filter(
-        models.Spec.target_id == target_id,
-        models.Spec.is_active == True
-    ).first()
+    return spec_cache.get_active_spec(db, target_id)
 
 def update_spec(db: Session, spec_id: int, spec_data: spec.SpecCreate):
     db_spec = db.query(models.Spec).filter(models.Spec.id == spec_id).first()
     
     if db_spec:
+        previous_target_id = db_spec.target_id
+        
         # 업데이트할 필드 설정
         db_spec.target_id = spec_data.target_id
         db_spec.lsl = spec_data.lsl
         db_spec.usl = spec_data.usl
         db_spec.reason = spec_data.reason
         
+        version = spec_cache.bump_version(db)
         db.commit()
+        spec_cache.invalidate(previous_target_id, spec_data.target_id, version=version)
+        result_cache.invalidate(previous_target_id, spec_data.target_id)
         db.refresh(db_spec)
     
     return db_spec
@@ -417,7 +617,10 @@ def activate_spec(db: Session, spec_id: int):
         
         # 현재 SPEC 활성화
         db_spec.is_active = True
+        version = spec_cache.bump_version(db)
         db.commit()
+        spec_cache.invalidate(target_id, version=version)
+        result_cache.invalidate(target_id)
         db.refresh(db_spec)
     
     return db_spec
@@ -425,8 +628,12 @@ def activate_spec(db: Session, spec_id: int):
 def delete_spec(db: Session, spec_id: int):
     db_spec = db.query(models.Spec).filter(models.Spec.id == spec_id).first()
     if db_spec:
+        target_id = db_spec.target_id
         db.delete(db_spec)
+        version = spec_cache.bump_version(db)
         db.commit()
+        spec_cache.invalidate(target_id, version=version)
+        result_cache.invalidate(target_id)
         return True
     return False
 
@@ -456,7 +663,9 @@ def create_equipment(db: Session, equipment: equipment.EquipmentCreate):
         is_active=equipment.is_active
     )
     db.add(db_equipment)
+    hierarchy.bump_version(db)
     db.commit()
+    hierarchy.invalidate()
     db.refresh(db_equipment)
     return db_equipment
 
@@ -475,7 +684,9 @@ def update_equipment(db: Session, equipment_id: int, equipment: equipment.Equipm
         db_equipment.description = equipment.description
         db_equipment.is_active = equipment.is_active
         
+        hierarchy.bump_version(db)
         db.commit()
+        hierarchy.invalidate()
         db.refresh(db_equipment)
     return db_equipment
 
@@ -493,8 +704,21 @@ def delete_equipment(db: Session, equipment_id: int):
         if measurements_count > 0:
             return False  # 측정 데이터가 참조 중이면 삭제 불가
         
+        # 아직 완료되지 않은 가져오기 작업에서 참조 중인지 확인 (이어서 가져올 데이터가 장비를 사용)
+        pending_jobs_count = db.query(models.ImportJob).filter(
+            models.ImportJob.status != "completed",
+            (models.ImportJob.coating_equipment_id == equipment_id) |
+            (models.ImportJob.exposure_equipment_id == equipment_id) |
+            (models.ImportJob.development_equipment_id == equipment_id)
+        ).count()
+        
+        if pending_jobs_count > 0:
+            return False
+        
         db.delete(db_equipment)
+        hierarchy.bump_version(db)
         db.commit()
+        hierarchy.invalidate()
         return True
     return False
 
@@ -502,10 +726,77 @@ def check_duplicate_measurement(db: Session, target_id: int, lot_no: str, wafer_
     """
     동일한 타겟, LOT NO, WAFER NO 조합의 측정 데이터가 이미 존재하는지 확인
     """
-    existing = db.query(models.Measurement).filter(
+    existing = db.query(models.Measurement.id).filter(
         models.Measurement.target_id == target_id,
         models.Measurement.lot_no == lot_no,
         models.Measurement.wafer_no == wafer_no
     ).first()
     
     return existing is not None
+
+def find_existing_lot_wafers(db: Session, target_id: int, lot_nos, chunk_size: int = 1000) -> set:
+    """
+    주어진 LOT NO 목록 중 해당 타겟에 이미 존재하는 (LOT NO, WAFER NO) 조합을 한 번에 조회
+    MySQL 기본 정렬 규칙과 같이 대소문자를 구분하지 않도록 소문자로 반환
+    """
+    lot_nos = sorted({str(lot_no) for lot_no in lot_nos})
+    existing = set()
+
+    # IN 목록이 너무 길어지지 않도록 나누어 조회 (타겟 + LOT NO + WAFER NO 인덱스 사용)
+    for i in range(0, len(lot_nos), chunk_size):
+        rows = db.query(models.Measurement.lot_no, models.Measurement.wafer_no).filter(
+            models.Measurement.target_id == target_id,
+            models.Measurement.lot_no.in_(lot_nos[i:i + chunk_size])
+        ).all()
+        existing.update((row.lot_no.lower(), row.wafer_no.lower()) for row in rows)
+
+    return existing
+
+# 추가한 행을 다시 조회할 때 IN 목록의 최대 LOT NO 수
+INSERTED_LOOKUP_CHUNK_SIZE = 1000
+
+def insert_measurements(db: Session, target_id: int, rows: list):
+    """
+    통계치까지 계산된 측정 데이터 행(dict) 목록을 한 번의 executemany로 추가 (일괄 업로드용)
+    SPC 판정 상태, 일별 집계, 검색 색인도 같은 트랜잭션에서 갱신하며 커밋은 호출한 쪽에서 수행
+    반환값: 추가된 행의 (id, device, lot_no, wafer_no, avg_value) 목록 (입력 순서)
+    """
+    if not rows:
+        return []
+
+    db.execute(insert(models.Measurement), [dict(row, target_id=target_id) for row in rows])
+
+    # MySQL은 RETURNING을 지원하지 않으므로 추가한 행을 (타겟, LOT NO, WAFER NO)로 다시 조회
+    # 호출한 쪽에서 이미 있는 조합과 파일 안의 중복을 제외하므로 조합마다 추가한 행은 하나
+    # (격리 수준이 READ COMMITTED이거나 동시에 추가되어도 ID 범위와 무관하게 찾음)
+    lot_nos = sorted({str(row["lot_no"]) for row in rows})
+    found = {}
+    for i in range(0, len(lot_nos), INSERTED_LOOKUP_CHUNK_SIZE):
+        candidates = db.query(
+            models.Measurement.id,
+            models.Measurement.device,
+            models.Measurement.lot_no,
+            models.Measurement.wafer_no,
+            models.Measurement.avg_value
+        ).filter(
+            models.Measurement.target_id == target_id,
+            models.Measurement.lot_no.in_(lot_nos[i:i + INSERTED_LOOKUP_CHUNK_SIZE])
+        ).order_by(models.Measurement.id).all()
+        # 같은 조합이 여러 개이면 (중복 검사 이후 다른 트랜잭션이 추가한 경우) 가장 나중에 추가된 행
+        found.update(((row.lot_no.lower(), row.wafer_no.lower()), row) for row in candidates)
+
+    inserted = [found[(str(row["lot_no"]).lower(), str(row["wafer_no"]).lower())] for row in rows]
+
+    # 실시간 SPC 판정 상태 갱신 (입력 순서대로 반영)
+    spc_monitor.record_measurements(db, target_id, inserted)
+
+    # 추가된 일자의 일별 집계 재계산
+    rollups.rebuild_for_measurements(db, target_id, [row.id for row in inserted])
+
+    # 검색 색인에 DEVICE / LOT NO / WAFER NO 추가
+    search_index.index_measurements(db, inserted)
+
+    # 이전 분석 결과 삭제 (커밋 전에 다시 계산된 결과는 워터마크가 달라 사용되지 않음)
+    result_cache.invalidate(target_id)
+
+    return inserted
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Boolean, Text
+from sqlalchemy import Column, Integer, String, Float, Double, Date, DateTime, ForeignKey, Boolean, Text, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -85,6 +85,20 @@ class Equipment(Base):
 # Measurement 클래스 수정 부분
 class Measurement(Base):
     __tablename__ = "measurements"
+    __table_args__ = (
+        # 분석 쿼리 (타겟 + 기간 조회): spc, statistics, distribution, reports
+        Index("ix_measurements_target_created", "target_id", "created_at"),
+        # 측정 데이터 목록 (타겟 조건 없이 입력 시각 + ID 순 키셋 페이지 조회)
+        Index("ix_measurements_created_id", "created_at", "id"),
+        # 중복 검사 (타겟 + LOT NO + WAFER NO), ID만 조회하면 커버링 인덱스로 처리
+        Index("ix_measurements_target_lot_wafer", "target_id", "lot_no", "wafer_no"),
+        # 장비 필터 (세 장비 컬럼의 OR 조건은 index merge로 처리)
+        Index("ix_measurements_coating_equipment", "coating_equipment_id"),
+        Index("ix_measurements_exposure_equipment", "exposure_equipment_id"),
+        Index("ix_measurements_development_equipment", "development_equipment_id"),
+        # DEVICE 검색 (검색 색인에서 찾은 값 목록으로 IN 조회)
+        Index("ix_measurements_device", "device"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     target_id = Column(Integer, ForeignKey("targets.id"), nullable=False)
@@ -151,6 +165,213 @@ class SPCRuleChange(Base):
     # 관계 설정
     spc_rule = relationship("SPCRule", back_populates="rule_changes")
 
+# SPC 실시간 판정 상태 테이블 (타겟별 Nelson Rule 누적 카운터)
+class SPCDetectorState(Base):
+    __tablename__ = "spc_detector_states"
+
+    id = Column(Integer, primary_key=True, index=True)
+    target_id = Column(Integer, ForeignKey("targets.id", ondelete="CASCADE"), nullable=False, unique=True)
+    
+    # 판정 기준 관리 한계선
+    cl = Column(Float, nullable=True)
+    ucl = Column(Float, nullable=True)
+    lcl = Column(Float, nullable=True)
+    limits_source = Column(String(20), nullable=True)  # 한계선 출처 (stored: 활성 고정 한계선, baseline: 최근 기준 기간으로 산출)
+    limits_version = Column(Integer, nullable=True)  # 고정 한계선 버전 (stored인 경우)
+    limits_computed_at = Column(DateTime, nullable=True)  # 한계선 산출 시각 (baseline은 오래되면 다시 산출)
+    
+    sample_count = Column(Integer, nullable=False, default=0)
+    last_measurement_id = Column(Integer, nullable=True)
+    last_value = Column(Float, nullable=True)
+    last_increasing = Column(Boolean, nullable=True)  # 직전 증감 방향 (True: 증가, False: 감소 또는 동일)
+    
+    # 규칙별 연속 카운터
+    run_above = Column(Integer, nullable=False, default=0)  # Rule 2: 중심선 위
+    run_below = Column(Integer, nullable=False, default=0)  # Rule 2: 중심선 아래
+    run_increasing = Column(Integer, nullable=False, default=0)  # Rule 3: 연속 증가
+    run_decreasing = Column(Integer, nullable=False, default=0)  # Rule 3: 연속 감소
+    run_alternating = Column(Integer, nullable=False, default=0)  # Rule 4: 연속 방향 전환
+    run_zone_a_upper = Column(Integer, nullable=False, default=0)  # Rule 5
+    run_zone_a_lower = Column(Integer, nullable=False, default=0)  # Rule 5
+    run_zone_b_upper = Column(Integer, nullable=False, default=0)  # Rule 6
+    run_zone_b_lower = Column(Integer, nullable=False, default=0)  # Rule 6
+    run_zone_c = Column(Integer, nullable=False, default=0)  # Rule 7
+    run_outside_c = Column(Integer, nullable=False, default=0)  # Rule 8
+    
+    active_rules = Column(Integer, nullable=False, default=0)  # 직전 포인트에서 위반된 규칙 (비트마스크)
+    recent_values = Column(Text, nullable=True)  # 최근 포인트 버퍼 (JSON: [측정 ID, LOT NO, 값])
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+# 관리 한계선 테이블 (Phase I 기준 기간으로 산출해 고정한 타겟/시계열별 관리 한계선, 버전 관리)
+class ControlLimit(Base):
+    __tablename__ = "control_limits"
+    __table_args__ = (
+        UniqueConstraint("target_id", "version", "series", name="uq_control_limits_target_version_series"),
+        Index("ix_control_limits_target_active", "target_id", "is_active"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    target_id = Column(Integer, ForeignKey("targets.id", ondelete="CASCADE"), nullable=False)
+    version = Column(Integer, nullable=False)  # 타겟별 버전 (같은 버전의 시계열 6개가 한 세트)
+    series = Column(String(10), nullable=False)  # avg, top, center, bottom, left, right
+
+    # 저장된 값 그대로 판정에 사용하므로 배정밀도로 저장
+    cl = Column(Double, nullable=False)
+    ucl = Column(Double, nullable=False)
+    lcl = Column(Double, nullable=False)
+    sigma_level = Column(Integer, nullable=False, default=3)
+
+    # Phase I 기준 기간
+    phase1_start = Column(DateTime, nullable=False)
+    phase1_end = Column(DateTime, nullable=False)
+    sample_count = Column(Integer, nullable=False)
+
+    is_active = Column(Boolean, nullable=False, default=True)  # 현재 Phase II 판정에 사용하는 버전인지 여부
+    reason = Column(String(255), nullable=True)  # 산출 사유
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+# SPC 알림 테이블 (입력 시점에 감지된 Nelson Rule 위반)
+class SPCAlert(Base):
+    __tablename__ = "spc_alerts"
+    __table_args__ = (
+        Index("ix_spc_alerts_target_rule", "target_id", "rule"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    target_id = Column(Integer, ForeignKey("targets.id", ondelete="CASCADE"), nullable=False)
+    rule = Column(Integer, nullable=False)
+    description = Column(String(255), nullable=False)
+    start_measurement_id = Column(Integer, nullable=True)
+    end_measurement_id = Column(Integer, nullable=True)
+    start_lot_no = Column(String(100), nullable=True)
+    end_lot_no = Column(String(100), nullable=True)
+    point_count = Column(Integer, nullable=False, default=1)  # 병합된 run에 포함된 포인트 수
+    last_value = Column(Float, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+# 측정 데이터 일별 집계 테이블 (타겟별/일자별 개수, 합계, 제곱합, 최소, 최대)
+class MeasurementDailyRollup(Base):
+    __tablename__ = "measurement_daily_rollups"
+    __table_args__ = (
+        UniqueConstraint("target_id", "day", name="uq_measurement_daily_rollups_target_day"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    target_id = Column(Integer, ForeignKey("targets.id", ondelete="CASCADE"), nullable=False)
+    day = Column(Date, nullable=False)
+    sample_count = Column(Integer, nullable=False, default=0)
+    
+    # 평균값 (avg_value)
+    avg_sum = Column(Double, nullable=False, default=0)
+    avg_sumsq = Column(Double, nullable=False, default=0)
+    avg_min = Column(Float, nullable=True)
+    avg_max = Column(Float, nullable=True)
+    
+    # 상단 (value_top)
+    top_sum = Column(Double, nullable=False, default=0)
+    top_sumsq = Column(Double, nullable=False, default=0)
+    top_min = Column(Float, nullable=True)
+    top_max = Column(Float, nullable=True)
+    
+    # 중앙 (value_center)
+    center_sum = Column(Double, nullable=False, default=0)
+    center_sumsq = Column(Double, nullable=False, default=0)
+    center_min = Column(Float, nullable=True)
+    center_max = Column(Float, nullable=True)
+    
+    # 하단 (value_bottom)
+    bottom_sum = Column(Double, nullable=False, default=0)
+    bottom_sumsq = Column(Double, nullable=False, default=0)
+    bottom_min = Column(Float, nullable=True)
+    bottom_max = Column(Float, nullable=True)
+    
+    # 좌측 (value_left)
+    left_sum = Column(Double, nullable=False, default=0)
+    left_sumsq = Column(Double, nullable=False, default=0)
+    left_min = Column(Float, nullable=True)
+    left_max = Column(Float, nullable=True)
+    
+    # 우측 (value_right)
+    right_sum = Column(Double, nullable=False, default=0)
+    right_sumsq = Column(Double, nullable=False, default=0)
+    right_min = Column(Float, nullable=True)
+    right_max = Column(Float, nullable=True)
+    
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+# 검색어 사전 테이블 (DEVICE / LOT NO / WAFER NO의 고유 값)
+class SearchTerm(Base):
+    __tablename__ = "search_terms"
+    __table_args__ = (
+        UniqueConstraint("field", "value", name="uq_search_terms_field_value"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    field = Column(String(20), nullable=False)  # device, lot_no, wafer_no
+    value = Column(String(100), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # 관계 설정
+    grams = relationship("SearchTermGram", back_populates="term", cascade="all, delete-orphan")
+
+# 검색어 트라이그램 색인 테이블 (부분 문자열 검색용)
+class SearchTermGram(Base):
+    __tablename__ = "search_term_grams"
+    __table_args__ = (
+        # 트라이그램으로 검색어 찾기 (gram -> term_id 커버링 인덱스)
+        Index("ix_search_term_grams_gram_term", "gram", "term_id"),
+    )
+
+    term_id = Column(Integer, ForeignKey("search_terms.id", ondelete="CASCADE"), primary_key=True)
+    gram = Column(String(3), primary_key=True)  # 소문자 3글자
+
+    # 관계 설정
+    term = relationship("SearchTerm", back_populates="grams")
+
+# 캐시 버전 테이블 (프로세스별 캐시가 다른 워커 프로세스의 변경을 감지하기 위한 버전)
+class CacheVersion(Base):
+    __tablename__ = "cache_versions"
+
+    name = Column(String(50), primary_key=True)  # 캐시 이름 (specs 등)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+# 대용량 파일 가져오기 작업 테이블 (청크 단위 커밋 진행 상황, 중단 시 이어서 처리)
+class ImportJob(Base):
+    __tablename__ = "import_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    target_id = Column(Integer, ForeignKey("targets.id", ondelete="CASCADE"), nullable=False)
+    # 완료된 작업의 장비 정보는 이력이므로 장비 삭제 시 비움 (미완료 작업이 참조하는 장비는 crud.delete_equipment에서 삭제 거부)
+    coating_equipment_id = Column(Integer, ForeignKey("equipments.id", ondelete="SET NULL"), nullable=True)
+    exposure_equipment_id = Column(Integer, ForeignKey("equipments.id", ondelete="SET NULL"), nullable=True)
+    development_equipment_id = Column(Integer, ForeignKey("equipments.id", ondelete="SET NULL"), nullable=True)
+    author = Column(String(100), nullable=False)
+
+    filename = Column(String(255), nullable=False)
+    file_type = Column(String(10), nullable=False)  # csv, excel
+    spool_path = Column(String(500), nullable=False)  # 업로드 파일을 저장한 임시 파일 경로
+    status = Column(String(20), nullable=False, default="pending")  # pending, running, completed, failed
+
+    # 진행 상황 (청크 커밋과 같은 트랜잭션에서 갱신)
+    rows_processed = Column(Integer, nullable=False, default=0)  # 처리한 데이터 행 수 (이어서 처리할 위치)
+    imported_count = Column(Integer, nullable=False, default=0)
+    duplicate_count = Column(Integer, nullable=False, default=0)
+    error_count = Column(Integer, nullable=False, default=0)
+    errors = Column(Text, nullable=True)  # 행별 오류 (JSON, 앞에서부터 최대 MAX_STORED_ERRORS개)
+    error_message = Column(Text, nullable=True)  # 작업 실패 사유
+
+    # 실행 중인 작업자 (여러 서버 프로세스가 같은 작업을 동시에 실행하지 않도록 조건부 UPDATE로 선점)
+    worker = Column(String(100), nullable=True)  # 호스트명:PID
+    heartbeat_at = Column(DateTime, nullable=True)  # 선점 / 청크 커밋 시각 (오래되면 다른 작업자가 이어서 실행)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)  # 작업자가 처음 처리를 시작한 시각
+    finished_at = Column(DateTime(timezone=True), nullable=True)  # 완료 또는 실패 시각
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
 # 보고서 테이블
 class Report(Base):
     __tablename__ = "reports"
@@ -1,7 +1,9 @@
 from fastapi import FastAPI, Request
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from .database import models, database
+from .services import import_jobs, notification_service
 # 라우터 임포트 방식 변경
 import backend.routers.product_groups as product_groups_router
 import backend.routers.processes as processes_router
@@ -19,6 +21,8 @@ from backend.routers import distribution as distribution_router
 from backend.routers import report_downloads
 # 벌크 데이터 추가
 from backend.routers import bulk_upload as bulk_upload_router
+# 기준 정보 스냅샷
+from backend.routers import hierarchy as hierarchy_router
 
 # 정적 파일 서빙을 위한 import 추가
 from fastapi.staticfiles import StaticFiles
@@ -26,6 +30,9 @@ from fastapi.responses import FileResponse
 from pathlib import Path
 
 # 데이터베이스 테이블 생성
+# (기존 테이블에 추가된 인덱스는 create_all로 반영되지 않으므로 backend/utils/migrate_indexes.py 실행)
+# (일별 집계 테이블 도입 전의 측정 데이터는 backend/utils/backfill_rollups.py로 집계)
+# (검색 색인 도입 전의 측정 데이터는 backend/utils/backfill_search_index.py로 색인)
 models.Base.metadata.create_all(bind=database.engine)
 
 app = FastAPI(title="DICD 측정 관리 시스템", 
@@ -39,8 +46,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Last-Modified"],  # 조건부 조회 재검증용 (services/conditional.py)
 )
 
+# 응답 압축 (Accept-Encoding: gzip을 보낸 클라이언트, 1KB 이상 응답)
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=6)
+
 # 라우터 등록
 app.include_router(product_groups_router.router)
 app.include_router(processes_router.router)
@@ -57,6 +68,21 @@ app.include_router(distribution_router.router)
 # 보고서 다운로드 라우터 등록
 app.include_router(report_downloads.router)
 app.include_router(bulk_upload_router.router)
+app.include_router(hierarchy_router.router)
+
+# 가져오기 작업 큐: 재시작 전에 완료되지 않은 작업을 이어서 처리
+@app.on_event("startup")
+def resume_import_jobs():
+    import_jobs.resume_unfinished_jobs()
+
+@app.on_event("shutdown")
+def stop_import_jobs():
+    import_jobs.shutdown()
+
+# SPEC 위반 알림: 종료 전에 모아 둔 알림 발송
+@app.on_event("shutdown")
+def stop_notifications():
+    notification_service.shutdown()
 
 # 프론트엔드 파일 경로 설정
 frontend_dir = Path(__file__).parent.parent / "frontend"
@@ -1,8 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException, File, UploadFile, Form
+from fastapi import APIRouter, Depends, HTTPException, File, UploadFile, Form, Query
 from sqlalchemy.orm import Session
 from typing import Optional
 from ..database import database
-from ..services import bulk_import
+from ..services import bulk_import, import_jobs
 from fastapi.responses import Response
 
 router = APIRouter(
@@ -36,6 +36,92 @@ async def upload_measurement_data(
     
     return result
 
+@router.post("/stream")
+async def upload_measurement_data_streaming(
+    file: UploadFile = File(...),
+    target_id: int = Form(...),
+    author: str = Form(...),
+    coating_equipment_id: Optional[int] = Form(None),
+    exposure_equipment_id: Optional[int] = Form(None),
+    development_equipment_id: Optional[int] = Form(None),
+    db: Session = Depends(database.get_db)
+):
+    """
+    대용량 측정 데이터 파일 업로드 (디스크에 저장 후 작업 큐에서 청크 단위로 가져오기, 완료될 때까지 대기)
+    중단되면 반환된 job_id로 /jobs/{job_id}/resume을 호출하여 이어서 진행
+    """
+    job = await bulk_import.create_import_job(
+        db=db,
+        file=file,
+        target_id=target_id,
+        author=author,
+        coating_equipment_id=coating_equipment_id,
+        exposure_equipment_id=exposure_equipment_id,
+        development_equipment_id=development_equipment_id
+    )
+    job_id = job.id
+    
+    # 대기하는 동안 이전 읽기 스냅샷을 유지하지 않도록 트랜잭션 종료
+    db.commit()
+    
+    # 같은 타겟의 다른 작업과 순서대로 실행되도록 작업 큐를 거쳐 실행
+    import_jobs.submit(job_id)
+    await import_jobs.wait(job_id)
+    
+    return import_jobs.get_job_status(db, job_id)
+
+@router.post("/jobs", status_code=202)
+async def create_import_job(
+    file: UploadFile = File(...),
+    target_id: int = Form(...),
+    author: str = Form(...),
+    coating_equipment_id: Optional[int] = Form(None),
+    exposure_equipment_id: Optional[int] = Form(None),
+    development_equipment_id: Optional[int] = Form(None),
+    db: Session = Depends(database.get_db)
+):
+    """
+    측정 데이터 파일을 작업 큐에 등록하고 바로 작업 ID 반환
+    진행 상황은 /jobs/{job_id}로 조회
+    """
+    job = await bulk_import.create_import_job(
+        db=db,
+        file=file,
+        target_id=target_id,
+        author=author,
+        coating_equipment_id=coating_equipment_id,
+        exposure_equipment_id=exposure_equipment_id,
+        development_equipment_id=development_equipment_id
+    )
+    import_jobs.submit(job.id)
+    
+    return import_jobs.get_job_status(db, job.id)
+
+@router.get("/jobs")
+def get_import_jobs(limit: int = Query(20, ge=1, le=100), db: Session = Depends(database.get_db)):
+    """
+    최근 가져오기 작업 목록
+    """
+    return import_jobs.get_recent_jobs(db, limit=limit)
+
+@router.get("/jobs/{job_id}")
+def get_import_job(job_id: int, db: Session = Depends(database.get_db)):
+    """
+    가져오기 작업 진행 상황 (처리한 행 수, 오류 행, 처리량, 대기 순서)
+    """
+    return import_jobs.get_job_status(db, job_id)
+
+@router.post("/jobs/{job_id}/resume", status_code=202)
+def resume_import_job(job_id: int, db: Session = Depends(database.get_db)):
+    """
+    중단되거나 실패한 가져오기 작업을 처리한 행 다음부터 이어서 진행 (작업 큐에 다시 추가)
+    """
+    job = import_jobs.get_job_status(db, job_id)
+    if job["status"] != "completed":
+        import_jobs.submit(job_id)
+    
+    return import_jobs.get_job_status(db, job_id)
+
 @router.get("/template/excel")
 async def download_excel_template():
     """
@@ -1,9 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.orm import Session
 from typing import Dict, Any, Optional
 from datetime import datetime, timedelta
 from ..database import database
-from ..services import distribution
+from ..services import distribution, response_format, result_cache, conditional
+from ..services.sections import parse_sections
 
 router = APIRouter(
     prefix="/api/distribution",
@@ -14,15 +15,23 @@ router = APIRouter(
 # 변경 후
 @router.get("/analyze/{target_id}", response_model=Dict[str, Any])
 def analyze_distribution(
+    request: Request,
     target_id: int,
     days: Optional[int] = Query(30, description="분석할 기간(일)"),
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
+    format: Optional[str] = Query(None, description="응답 형식 (json, msgpack), 지정하지 않으면 Accept 헤더로 결정"),
+    sections: Optional[str] = Query(None, description="계산할 항목 (histogram, stats, position_analysis 중 쉼표로 구분, 지정하지 않으면 전체)"),
     db: Session = Depends(database.get_db)
 ):
     """
     특정 타겟에 대한 분포 분석 수행
+    If-None-Match가 현재 ETag(측정 데이터 워터마크 + 활성 SPEC)와 같으면 분석 없이 304 반환
     """
+    if format not in (None, "json", "msgpack"):
+        raise HTTPException(status_code=400, detail="Invalid format. Use 'json' or 'msgpack'")
+    selected_sections = parse_sections(sections, distribution.DISTRIBUTION_SECTIONS)
+    
     # 사용자 지정 날짜 처리
     custom_start_date = None
     custom_end_date = None
@@ -35,16 +44,29 @@ def analyze_distribution(
             custom_end_date = custom_end_date.replace(hour=23, minute=59, second=59)
         except ValueError:
             raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD")
+    else:
+        custom_start_date = datetime.now() - timedelta(days=days)
+    
+    # 응답 검증자 (분석 전에 판정)
+    watermark = result_cache.get_watermark(db, target_id, custom_start_date, custom_end_date)
+    etag = conditional.make_etag(
+        "distribution", target_id, watermark, selected_sections, response_format.wants_msgpack(request, format)
+    )
+    headers = conditional.validator_headers(etag, conditional.watermark_modified(watermark))
+    if conditional.is_not_modified(request, etag):
+        return conditional.not_modified(headers)
     
     result = distribution.get_distribution_analysis(
         db, 
         target_id=target_id, 
         days=days,
         start_date=custom_start_date,
-        end_date=custom_end_date
+        end_date=custom_end_date,
+        watermark=watermark,
+        sections=selected_sections
     )
     
     if result["sample_count"] == 0:
         raise HTTPException(status_code=404, detail="No measurement data found for this target in the specified period")
     
-    return result
\ No newline at end of file
+    return response_format.render(request, result, format, headers)
\ No newline at end of file
@@ -1,7 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from ..database import crud, database
+from ..services import conditional
 from ..schemas import equipment
 
 router = APIRouter(
@@ -21,14 +22,22 @@ def create_equipment(
 
 @router.get("/", response_model=List[equipment.Equipment])
 def read_equipments(
+    request: Request,
+    response: Response,
     type: Optional[str] = Query(None, description="장비 타입으로 필터링 (코팅, 노광, 현상)"),
     db: Session = Depends(database.get_db)
 ):
+    not_modified = conditional.evaluate(request, response, conditional.master_data_etag(db))
+    if not_modified:
+        return not_modified
     equipments = crud.get_equipments(db, type=type)
     return equipments
 
 @router.get("/{equipment_id}", response_model=equipment.Equipment)
-def read_equipment(equipment_id: int, db: Session = Depends(database.get_db)):
+def read_equipment(request: Request, response: Response, equipment_id: int, db: Session = Depends(database.get_db)):
+    not_modified = conditional.evaluate(request, response, conditional.master_data_etag(db))
+    if not_modified:
+        return not_modified
     db_equipment = crud.get_equipment(db, equipment_id=equipment_id)
     if db_equipment is None:
         raise HTTPException(status_code=404, detail="Equipment not found")
@@ -0,0 +1,26 @@
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm import Session
+from ..database import database
+from ..services import conditional, hierarchy
+
+router = APIRouter(
+    prefix="/api/hierarchy",
+    tags=["hierarchy"],
+    responses={404: {"description": "Not found"}},
+)
+
+@router.get("")
+def get_hierarchy(request: Request, db: Session = Depends(database.get_db)):
+    """
+    제품군 > 공정 > 타겟 트리와 장비 목록을 한 번에 반환
+    If-None-Match가 현재 ETag와 같으면 304 반환
+    """
+    snapshot = hierarchy.get_snapshot(db)
+    headers = conditional.validator_headers(snapshot["etag"])
+    headers["X-Hierarchy-Version"] = str(snapshot["version"])
+
+    if conditional.is_not_modified(request, snapshot["etag"]):
+        return conditional.not_modified(headers)
+
+    return JSONResponse(content=snapshot["data"], headers=headers)
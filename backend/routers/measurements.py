@@ -3,6 +3,7 @@ from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import datetime, timedelta
 from ..database import crud, models, database
+from ..services import search_index, batch_ingest, spc
 from ..schemas import measurement
 
 router = APIRouter(
@@ -17,6 +18,35 @@ def create_measurement(
 ):
     return crud.create_measurement(db=db, measurement_data=measurement_data)
 
+@router.post("/batch", response_model=measurement.MeasurementBatchResult)
+def create_measurements_batch(
+    batch: measurement.MeasurementBatchCreate, db: Session = Depends(database.get_db)
+):
+    """
+    LOT 단위 웨이퍼 측정 데이터 일괄 입력 (한 트랜잭션, 웨이퍼별 입력/중복/SPEC 판정 결과 반환)
+    """
+    return batch_ingest.ingest_measurements(db, batch.measurements)
+
+def _parse_date_range(days: Optional[int], start_date: Optional[str], end_date: Optional[str]):
+    """조회 기간 계산 (start_date/end_date가 모두 있으면 우선, 없으면 최근 days일)"""
+    start_datetime = None
+    end_datetime = None
+    
+    # 문자열 날짜가 제공된 경우 datetime으로 변환
+    if start_date and end_date:
+        try:
+            start_datetime = datetime.strptime(start_date, "%Y-%m-%d")
+            end_datetime = datetime.strptime(end_date, "%Y-%m-%d")
+            # 종료일은 해당 일자의 마지막 시간으로 설정
+            end_datetime = end_datetime.replace(hour=23, minute=59, second=59)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD")
+    elif days:
+        # 기존 로직: 일수 기준으로 시작 날짜 계산
+        start_datetime = datetime.now() - timedelta(days=days)
+    
+    return start_datetime, end_datetime
+
 # backend/routers/measurements.py 파일의 read_measurements 함수 업데이트
 
 @router.get("/", response_model=List[measurement.Measurement])
@@ -31,24 +61,13 @@ def read_measurements(
     end_date: Optional[str] = None,    # 문자열로 날짜 받기 추가
     equipment_id: Optional[int] = None,
     keyword: Optional[str] = None,
+    max_points: Optional[int] = Query(None, ge=10, description="추이 차트용 최대 점 수 (target_id 필요, LTTB 다운샘플링, 규칙/SPEC 위반 점은 항상 포함)"),
     db: Session = Depends(database.get_db)
 ):
-    # 날짜 처리 로직 수정
-    start_datetime = None
+    if max_points is not None and target_id is None:
+        raise HTTPException(status_code=400, detail="max_points requires target_id")
     
-    # 문자열 날짜가 제공된 경우 datetime으로 변환
-    if start_date and end_date:
-        try:
-            start_datetime = datetime.strptime(start_date, "%Y-%m-%d")
-            end_datetime = datetime.strptime(end_date, "%Y-%m-%d")
-            # 종료일은 해당 일자의 마지막 시간으로 설정
-            end_datetime = end_datetime.replace(hour=23, minute=59, second=59)
-        except ValueError:
-            raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD")
-    elif days:
-        # 기존 로직: 일수 기준으로 시작 날짜 계산
-        start_datetime = datetime.now() - timedelta(days=days)
-        end_datetime = None
+    start_datetime, end_datetime = _parse_date_range(days, start_date, end_date)
     
     measurements = crud.get_measurements(
         db, 
@@ -58,12 +77,68 @@ def read_measurements(
         device=device, 
         lot_no=lot_no, 
         start_date=start_datetime,  # 변환된 datetime 사용
-        end_date=end_datetime if 'end_datetime' in locals() else None,  # 변환된 datetime 사용
+        end_date=end_datetime,  # 변환된 datetime 사용
         equipment_id=equipment_id,
         keyword=keyword,
     )
+    
+    if max_points is not None:
+        measurements = spc.downsample_measurements(db, target_id, measurements, max_points)
     return measurements
 
+# 페이지 단위 조회 (/{measurement_id}보다 먼저 등록)
+@router.get("/page", response_model=measurement.MeasurementPage)
+def read_measurements_page(
+    target_id: Optional[int] = None,
+    process_id: Optional[int] = None,
+    product_group_id: Optional[int] = None,
+    device: Optional[str] = None,
+    lot_no: Optional[str] = None,
+    days: Optional[int] = Query(14, description="최근 일수 (기본 2주)"),
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    equipment_id: Optional[int] = None,
+    keyword: Optional[str] = None,
+    sort: str = Query("created_at", description="정렬 컬럼 (created_at, device, lot_no, wafer_no, avg_value, std_dev)"),
+    order: str = Query("desc", description="정렬 방향 (asc, desc)"),
+    limit: int = Query(100, ge=1, le=500, description="페이지 크기"),
+    cursor: Optional[str] = Query(None, description="이전 페이지 응답의 next_cursor"),
+    include_total: bool = Query(True, description="전체 개수 계산 여부 (다음 페이지 조회 시 false 권장)"),
+    db: Session = Depends(database.get_db)
+):
+    start_datetime, end_datetime = _parse_date_range(days, start_date, end_date)
+    
+    try:
+        return crud.get_measurements_page(
+            db,
+            target_id=target_id,
+            process_id=process_id,
+            product_group_id=product_group_id,
+            device=device,
+            lot_no=lot_no,
+            start_date=start_datetime,
+            end_date=end_datetime,
+            equipment_id=equipment_id,
+            keyword=keyword,
+            sort=sort,
+            order=order,
+            limit=limit,
+            cursor=cursor,
+            include_total=include_total
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+# LOT NO 자동완성 (/{measurement_id}보다 먼저 등록)
+@router.get("/lot-suggestions", response_model=List[str])
+def suggest_lot_nos(
+    q: str = Query(..., min_length=1, description="LOT NO 일부"),
+    target_id: Optional[int] = Query(None, description="타겟 ID (지정 시 해당 타겟의 LOT NO만)"),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(database.get_db)
+):
+    return search_index.suggest_lot_nos(db, q, target_id=target_id, limit=limit)
+
 @router.get("/{measurement_id}", response_model=measurement.MeasurementWithSpec)
 def read_measurement(measurement_id: int, db: Session = Depends(database.get_db)):
     db_measurement = crud.get_measurement(db, measurement_id=measurement_id)
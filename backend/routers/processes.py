@@ -1,7 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
 from typing import List
 from ..database import crud, models, database
+from ..services import conditional
 from ..schemas import process
 
 router = APIRouter(
@@ -18,13 +19,21 @@ def create_process(
 
 @router.get("/", response_model=List[process.Process])
 def read_processes(
+    request: Request,
+    response: Response,
     product_group_id: int = None, db: Session = Depends(database.get_db)
 ):
+    not_modified = conditional.evaluate(request, response, conditional.master_data_etag(db))
+    if not_modified:
+        return not_modified
     processes = crud.get_processes(db, product_group_id=product_group_id)
     return processes
 
 @router.get("/{process_id}", response_model=process.Process)
-def read_process(process_id: int, db: Session = Depends(database.get_db)):
+def read_process(request: Request, response: Response, process_id: int, db: Session = Depends(database.get_db)):
+    not_modified = conditional.evaluate(request, response, conditional.master_data_etag(db))
+    if not_modified:
+        return not_modified
     db_process = crud.get_process(db, process_id=process_id)
     if db_process is None:
         raise HTTPException(status_code=404, detail="Process not found")
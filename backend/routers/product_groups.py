@@ -1,7 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
 from typing import List
 from ..database import crud, models, database
+from ..services import conditional
 from ..schemas import product_group
 
 router = APIRouter(
@@ -17,12 +18,18 @@ def create_product_group(
     return crud.create_product_group(db=db, product_group=product_group)
 
 @router.get("/", response_model=List[product_group.ProductGroup])
-def read_product_groups(db: Session = Depends(database.get_db)):
+def read_product_groups(request: Request, response: Response, db: Session = Depends(database.get_db)):
+    not_modified = conditional.evaluate(request, response, conditional.master_data_etag(db))
+    if not_modified:
+        return not_modified
     product_groups = crud.get_product_groups(db)
     return product_groups
 
 @router.get("/{product_group_id}", response_model=product_group.ProductGroup)
-def read_product_group(product_group_id: int, db: Session = Depends(database.get_db)):
+def read_product_group(request: Request, response: Response, product_group_id: int, db: Session = Depends(database.get_db)):
+    not_modified = conditional.evaluate(request, response, conditional.master_data_etag(db))
+    if not_modified:
+        return not_modified
     db_product_group = crud.get_product_group(db, product_group_id=product_group_id)
     if db_product_group is None:
         raise HTTPException(status_code=404, detail="Product group not found")
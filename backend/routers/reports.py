@@ -33,25 +33,20 @@ def generate_weekly_report(
         except ValueError:
             raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD")
     
-    # 타겟 존재 여부 확인
-    target = db.query(models.Target).filter(models.Target.id == target_id).first()
-    if not target:
-        raise HTTPException(status_code=404, detail="Target not found")
+    # 타겟 / 공정 / 제품군 이름 조회 (타겟이 없으면 404)
+    report_target = reports.get_report_target(db, target_id)
     
     # 보고서 생성
-    buffer = reports.generate_weekly_report(db, target_id, report_date)
+    buffer = reports.generate_weekly_report(db, target_id, report_date, report_target=report_target)
     
     # 날짜 범위 계산 (월요일~일요일 기준)
-    days_since_monday = report_date.weekday()
-    start_date = report_date - timedelta(days=days_since_monday, weeks=1)
-    end_date = start_date + timedelta(days=6)
-    
-    # 프로세스 및 제품군 정보 조회
-    process = db.query(models.Process).filter(models.Process.id == target.process_id).first()
-    product_group = db.query(models.ProductGroup).filter(models.ProductGroup.id == process.product_group_id).first()
+    start_date, end_date = reports.weekly_report_period(report_date)
     
     # 파일 이름 설정
-    filename = f"weekly_report_{product_group.name}_{process.name}_{target.name}_{start_date.strftime('%Y%m%d')}.pdf"
+    filename = (
+        f"weekly_report_{report_target['product_group']}_{report_target['process']}_{report_target['target']}_"
+        f"{start_date.strftime('%Y%m%d')}.pdf"
+    )
     
     # 보고서 정보 저장 (백그라운드 작업)
     def save_report_info():
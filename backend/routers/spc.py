@@ -1,9 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.orm import Session
 from typing import Dict, Any, List, Optional
 from datetime import datetime, timedelta
 from ..database import database
-from ..services import spc
+from ..services import spc, spc_monitor, control_limits, response_format, result_cache, conditional
+from ..services.sections import parse_sections
+from ..schemas import control_limit
 
 router = APIRouter(
     prefix="/api/spc",
@@ -13,15 +15,27 @@ router = APIRouter(
 
 @router.get("/analyze/{target_id}", response_model=Dict[str, Any])
 def analyze_spc_data(
+    request: Request,
     target_id: int,
     days: Optional[int] = Query(30, description="분석할 기간(일)"),
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
+    limits: str = Query("stored", description="관리 한계선 (stored: 고정 한계선이 있으면 사용, window: 조회 기간으로 계산)"),
+    format: Optional[str] = Query(None, description="응답 형식 (json, msgpack), 지정하지 않으면 Accept 헤더로 결정"),
+    max_points: Optional[int] = Query(None, ge=10, description="차트용 시계열 최대 점 수 (LTTB 다운샘플링, 규칙/SPEC 위반 점은 항상 포함)"),
+    sections: Optional[str] = Query(None, description="계산할 항목 (control_limits, patterns, position_patterns, capability 중 쉼표로 구분, 지정하지 않으면 전체)"),
     db: Session = Depends(database.get_db)
 ):
     """
     특정 타겟에 대한 SPC 분석 수행
+    If-None-Match가 현재 ETag(측정 데이터 워터마크 + 활성 SPEC + 고정 한계선 버전)와 같으면 분석 없이 304 반환
     """
+    if limits not in ("stored", "window"):
+        raise HTTPException(status_code=400, detail="Invalid limits. Use 'stored' or 'window'")
+    if format not in (None, "json", "msgpack"):
+        raise HTTPException(status_code=400, detail="Invalid format. Use 'json' or 'msgpack'")
+    selected_sections = parse_sections(sections, spc.SPC_SECTIONS)
+    
     # 사용자 지정 날짜 처리
     custom_start_date = None
     custom_end_date = None
@@ -34,17 +48,126 @@ def analyze_spc_data(
             custom_end_date = custom_end_date.replace(hour=23, minute=59, second=59)
         except ValueError:
             raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD")
+    else:
+        custom_start_date = datetime.now() - timedelta(days=days)
+    
+    # 응답 검증자 (분석 전에 판정)
+    watermark = result_cache.get_watermark(db, target_id, custom_start_date, custom_end_date)
+    active_limits = control_limits.get_active_limits(db, target_id) if limits == "stored" else None
+    etag = conditional.make_etag(
+        "spc", target_id, watermark, limits,
+        active_limits["version"] if active_limits else None,
+        max_points, selected_sections, response_format.wants_msgpack(request, format)
+    )
+    headers = conditional.validator_headers(etag, conditional.watermark_modified(watermark))
+    if conditional.is_not_modified(request, etag):
+        return conditional.not_modified(headers)
     
     result = spc.analyze_spc(
         db, 
         target_id=target_id, 
         days=days,
         start_date=custom_start_date,
-        end_date=custom_end_date
+        end_date=custom_end_date,
+        limit_mode=limits,
+        max_points=max_points,
+        watermark=watermark,
+        sections=selected_sections
     )
     
     if result["sample_count"] == 0:
         raise HTTPException(status_code=404, detail="No measurement data found for this target in the specified period")
     
+    return response_format.render(request, result, format, headers)
+
+
+
+@router.get("/limits/{target_id}", response_model=Dict[str, Any])
+def get_control_limits(target_id: int, db: Session = Depends(database.get_db)):
+    """
+    타겟의 활성 고정 관리 한계선(Phase II) 조회
+    """
+    result = control_limits.get_active_limits(db, target_id)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Active control limits not found for this target")
+    return result
+
+@router.get("/limits/{target_id}/versions", response_model=List[Dict[str, Any]])
+def get_control_limit_versions(target_id: int, db: Session = Depends(database.get_db)):
+    """
+    타겟의 관리 한계선 버전 이력
+    """
+    return control_limits.get_limit_versions(db, target_id)
+
+@router.post("/limits/{target_id}", response_model=Dict[str, Any], status_code=201)
+def establish_control_limits(
+    target_id: int,
+    limit_data: control_limit.ControlLimitCreate,
+    db: Session = Depends(database.get_db)
+):
+    """
+    Phase I 기준 기간의 데이터로 관리 한계선을 산출하여 새 버전으로 저장하고 활성화
+    """
+    start_date = datetime.combine(limit_data.start_date, datetime.min.time())
+    end_date = datetime.combine(limit_data.end_date, datetime.min.time()).replace(hour=23, minute=59, second=59)
+    
+    result = control_limits.establish_control_limits(
+        db,
+        target_id=target_id,
+        start_date=start_date,
+        end_date=end_date,
+        reason=limit_data.reason
+    )
+    db.commit()
+    return result
+
+@router.put("/limits/{target_id}/versions/{version}/activate", response_model=Dict[str, Any])
+def activate_control_limits(target_id: int, version: int, db: Session = Depends(database.get_db)):
+    """
+    이전 버전의 관리 한계선을 다시 활성화
+    """
+    result = control_limits.activate_version(db, target_id, version)
+    db.commit()
     return result
 
+@router.delete("/limits/{target_id}", response_model=bool)
+def release_control_limits(target_id: int, db: Session = Depends(database.get_db)):
+    """
+    고정 관리 한계선 해제 (조회 기간 기준 계산으로 되돌림)
+    """
+    released = control_limits.release_limits(db, target_id)
+    if not released:
+        raise HTTPException(status_code=404, detail="Active control limits not found for this target")
+    db.commit()
+    return True
+
+@router.get("/alerts", response_model=List[Dict[str, Any]])
+def get_spc_alerts(
+    target_id: Optional[int] = None,
+    days: Optional[int] = Query(None, description="최근 일수"),
+    limit: int = Query(100, ge=1, le=1000, description="최대 조회 건수"),
+    db: Session = Depends(database.get_db)
+):
+    """
+    측정 데이터 입력 시점에 감지된 SPC 규칙 위반 알림 조회
+    """
+    return spc_monitor.get_alerts(db, target_id=target_id, days=days, limit=limit)
+
+@router.get("/state/{target_id}", response_model=Dict[str, Any])
+def get_spc_state(target_id: int, db: Session = Depends(database.get_db)):
+    """
+    타겟의 실시간 SPC 판정 상태 조회
+    """
+    result = spc_monitor.get_state_summary(db, target_id)
+    if result is None:
+        raise HTTPException(status_code=404, detail="SPC state not found for this target")
+    return result
+
+@router.post("/state/{target_id}/rebuild", response_model=Dict[str, Any])
+def rebuild_spc_state(target_id: int, db: Session = Depends(database.get_db)):
+    """
+    최근 데이터로 실시간 SPC 판정 상태 재구성
+    """
+    spc_monitor.rebuild_state(db, target_id)
+    db.commit()
+    return spc_monitor.get_state_summary(db, target_id)
@@ -1,7 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from ..database import crud, models, database
+from ..services import conditional
 from ..schemas import spec
 
 router = APIRouter(
@@ -18,22 +19,33 @@ def create_spec(
 
 @router.get("/", response_model=List[spec.Spec])
 def read_specs(
+    request: Request,
+    response: Response,
     target_id: Optional[int] = None,
     is_active: Optional[bool] = None,
     db: Session = Depends(database.get_db)
 ):
+    not_modified = conditional.evaluate(request, response, conditional.spec_etag(db))
+    if not_modified:
+        return not_modified
     specs = crud.get_specs(db, target_id=target_id, is_active=is_active)
     return specs
 
 @router.get("/{spec_id}", response_model=spec.Spec)
-def read_spec(spec_id: int, db: Session = Depends(database.get_db)):
+def read_spec(request: Request, response: Response, spec_id: int, db: Session = Depends(database.get_db)):
+    not_modified = conditional.evaluate(request, response, conditional.spec_etag(db))
+    if not_modified:
+        return not_modified
     db_spec = crud.get_spec(db, spec_id=spec_id)
     if db_spec is None:
         raise HTTPException(status_code=404, detail="Spec not found")
     return db_spec
 
 @router.get("/target/{target_id}/active", response_model=spec.Spec)
-def read_active_spec(target_id: int, db: Session = Depends(database.get_db)):
+def read_active_spec(request: Request, response: Response, target_id: int, db: Session = Depends(database.get_db)):
+    not_modified = conditional.evaluate(request, response, conditional.spec_etag(db))
+    if not_modified:
+        return not_modified
     db_spec = crud.get_active_spec(db, target_id=target_id)
     if db_spec is None:
         raise HTTPException(status_code=404, detail="Active spec not found for this target")
@@ -1,9 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
 from typing import Dict, Any, Optional
 from datetime import datetime, timedelta
 from ..database import database
-from ..services import statistics
+from ..services import statistics, result_cache, response_format, conditional
 
 router = APIRouter(
     prefix="/api/statistics",
@@ -13,30 +13,81 @@ router = APIRouter(
 
 @router.get("/target/{target_id}", response_model=Dict[str, Any])
 def get_target_statistics(
+    request: Request,
     target_id: int,
     days: Optional[int] = Query(14, description="최근 일수 (기본 2주)"),
+    mode: str = Query("rows", description="계산 방식 (rows: 원시 데이터로 계산, 집계가 완료된 타겟의 일 단위 기간은 일별 집계 사용, pushdown: DB 집계, rollup: 일별 집계 합산)"),
+    format: Optional[str] = Query(None, description="응답 형식 (json, msgpack), 지정하지 않으면 Accept 헤더로 결정"),
     db: Session = Depends(database.get_db)
 ):
+    """
+    특정 타겟에 대한 공정 통계
+    If-None-Match가 현재 ETag(측정 데이터 워터마크 + 활성 SPEC)와 같으면 계산 없이 304 반환
+    """
+    if mode not in ("rows", "pushdown", "rollup"):
+        raise HTTPException(status_code=400, detail="Invalid mode. Use 'rows', 'pushdown' or 'rollup'")
+    if format not in (None, "json", "msgpack"):
+        raise HTTPException(status_code=400, detail="Invalid format. Use 'json' or 'msgpack'")
+    
     # 시작 날짜 계산
     start_date = None
     if days:
         start_date = datetime.now() - timedelta(days=days)
     
+    # 응답 검증자 (계산 전에 판정)
+    watermark = result_cache.get_watermark(db, target_id, start_date)
+    etag = conditional.make_etag("statistics", target_id, watermark, mode, response_format.wants_msgpack(request, format))
+    headers = conditional.validator_headers(etag, conditional.watermark_modified(watermark))
+    if conditional.is_not_modified(request, etag):
+        return conditional.not_modified(headers)
+    
     # 통계 계산
-    result = statistics.get_process_statistics(
-        db, 
-        target_id=target_id, 
-        start_date=start_date
-    )
+    if mode == "rows":
+        result = statistics.get_process_statistics(db, target_id=target_id, start_date=start_date, watermark=watermark)
+    else:
+        calculate = {
+            "pushdown": statistics.get_process_statistics_pushdown,
+            "rollup": statistics.get_process_statistics_from_rollups
+        }[mode]
+        result = calculate(
+            db, 
+            target_id=target_id, 
+            start_date=start_date
+        )
     
     # 결과가 비어있는 경우
     if result["sample_count"] == 0:
         raise HTTPException(status_code=404, detail="No measurement data found for this target")
     
-    return result
+    return response_format.render(request, result, format, headers)
+
+@router.get("/heatmap", response_model=Dict[str, Any])
+def get_cpk_heatmap(
+    days: Optional[int] = Query(14, description="최근 일수 (기본 2주)"),
+    product_group_id: Optional[int] = Query(None, description="제품군 ID (지정 시 해당 제품군만)"),
+    db: Session = Depends(database.get_db)
+):
+    # 시작 날짜 계산
+    start_date = None
+    if days:
+        start_date = datetime.now() - timedelta(days=days)
+    
+    items = statistics.get_cpk_heatmap(
+        db,
+        start_date=start_date,
+        product_group_id=product_group_id
+    )
+    
+    return {
+        "days": days,
+        "product_group_id": product_group_id,
+        "items": items
+    }
 
 @router.get("/boxplot/{target_id}", response_model=Dict[str, Any])
 def get_boxplot_statistics(
+    request: Request,
+    response: Response,
     target_id: int,
     group_by: str = Query(..., description="그룹화 기준 (equipment, device)"),
     days: Optional[int] = Query(30, description="최근 일수"),
@@ -61,6 +112,15 @@ def get_boxplot_statistics(
         # 일수 기준으로 시작 날짜 계산
         start_datetime = datetime.now() - timedelta(days=days)
     
+    # 응답 검증자 (장비명/DEVICE별 그룹이므로 기준 정보 스냅샷도 포함)
+    watermark = result_cache.get_watermark(db, target_id, start_datetime, end_datetime)
+    etag = conditional.make_etag(
+        "boxplot", target_id, watermark, group_by, conditional.master_data_etag(db)
+    )
+    headers = conditional.validator_headers(etag, conditional.watermark_modified(watermark))
+    if conditional.is_not_modified(request, etag):
+        return conditional.not_modified(headers)
+    
     # 통계 계산
     result = statistics.get_boxplot_data(
         db, 
@@ -74,4 +134,12 @@ def get_boxplot_statistics(
     if not result or len(result["groups"]) == 0:
         raise HTTPException(status_code=404, detail="No measurement data found for boxplot analysis")
     
-    return result
\ No newline at end of file
+    response.headers.update(headers)
+    return result
+
+@router.get("/cache", response_model=Dict[str, Any])
+def get_result_cache_stats():
+    """
+    분석 결과 캐시 사용 현황 (적중, 미스, 동시 요청 병합 횟수)
+    """
+    return result_cache.get_stats()
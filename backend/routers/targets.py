@@ -1,7 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
 from typing import List
 from ..database import crud, models, database
+from ..services import conditional
 from ..schemas import target
 
 router = APIRouter(
@@ -18,13 +19,21 @@ def create_target(
 
 @router.get("/", response_model=List[target.Target])
 def read_targets(
+    request: Request,
+    response: Response,
     process_id: int = None, db: Session = Depends(database.get_db)
 ):
+    not_modified = conditional.evaluate(request, response, conditional.master_data_etag(db))
+    if not_modified:
+        return not_modified
     targets = crud.get_targets(db, process_id=process_id)
     return targets
 
 @router.get("/{target_id}", response_model=target.Target)
-def read_target(target_id: int, db: Session = Depends(database.get_db)):
+def read_target(request: Request, response: Response, target_id: int, db: Session = Depends(database.get_db)):
+    not_modified = conditional.evaluate(request, response, conditional.master_data_etag(db))
+    if not_modified:
+        return not_modified
     db_target = crud.get_target(db, target_id=target_id)
     if db_target is None:
         raise HTTPException(status_code=404, detail="Target not found")
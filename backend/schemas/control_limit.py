@@ -0,0 +1,22 @@
+from typing import Optional
+from pydantic import BaseModel, validator
+from datetime import date
+
+class ControlLimitCreate(BaseModel):
+    start_date: date  # Phase I 기준 기간 시작일
+    end_date: date  # Phase I 기준 기간 종료일 (해당 일자 포함)
+    sigma_level: int = 3
+    reason: Optional[str] = None  # 산출 사유
+    
+    @validator('end_date')
+    def validate_end_date_not_before_start_date(cls, v, values):
+        if 'start_date' in values and v < values['start_date']:
+            raise ValueError('end_date must not be earlier than start_date')
+        return v
+    
+    @validator('sigma_level')
+    def validate_sigma_level(cls, v):
+        # Nelson Rule 구간(Zone A/B/C)은 (UCL-CL)/3을 1-시그마로 보므로 3-시그마 한계선만 허용
+        if v != 3:
+            raise ValueError('sigma_level must be 3 (Nelson rule zones assume 3-sigma limits)')
+        return v
@@ -67,4 +67,50 @@ class Measurement(BaseModel):
         orm_mode = True
 
 class MeasurementWithSpec(Measurement):
-    spec_status: Dict[str, Any]  # LSL, USL, 상태 등
\ No newline at end of file
+    spec_status: Dict[str, Any]  # LSL, USL, 상태 등
+
+class MeasurementPage(BaseModel):
+    items: List[Measurement]
+    next_cursor: Optional[str] = None  # 다음 페이지 커서 (없으면 마지막 페이지)
+    has_more: bool
+    limit: int
+    sort: str
+    order: str
+    total_count: Optional[int] = None  # 전체 개수 (total_is_estimate이면 상한값)
+    total_is_estimate: bool = False
+
+# 한 번에 입력할 수 있는 최대 측정 데이터 수
+MAX_BATCH_SIZE = 500
+
+class MeasurementBatchCreate(BaseModel):
+    measurements: List[MeasurementCreate]
+    
+    @validator('measurements')
+    def validate_batch_size(cls, v):
+        if not v:
+            raise ValueError('At least one measurement is required')
+        if len(v) > MAX_BATCH_SIZE:
+            raise ValueError(f'At most {MAX_BATCH_SIZE} measurements can be submitted at once')
+        return v
+
+class MeasurementBatchItemResult(BaseModel):
+    index: int  # 요청 목록에서의 위치
+    target_id: int
+    lot_no: str
+    wafer_no: str
+    status: str  # created, duplicate
+    measurement_id: Optional[int] = None
+    avg_value: float
+    min_value: float
+    max_value: float
+    range_value: float
+    std_dev: float
+    spec_found: bool
+    all_in_spec: Optional[bool] = None  # SPEC이 없으면 None
+    out_of_spec_points: List[str] = []  # SPEC을 벗어난 측정 위치 (top, center, bottom, left, right)
+
+class MeasurementBatchResult(BaseModel):
+    created_count: int
+    duplicate_count: int
+    out_of_spec_count: int
+    results: List[MeasurementBatchItemResult]
@@ -0,0 +1,125 @@
+"""
+DICD 측정 관리 시스템 - 측정 데이터 일괄 입력 서비스
+계측 장비가 LOT 단위로 여러 웨이퍼의 측정 데이터를 한 번에 입력할 때 사용합니다.
+
+모든 웨이퍼의 통계치를 행렬 연산으로 계산하고, 중복 검사와 활성 SPEC 조회는 타겟별로 한 번씩,
+추가는 타겟별 한 번의 executemany로 처리하여 한 트랜잭션으로 커밋합니다.
+"""
+
+from typing import Dict, Any, List
+import numpy as np
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+from ..database import crud, models
+from ..schemas import measurement
+from . import bulk_import, spec_cache, notification_service
+
+# SPEC 판정 위치 (VALUE_COLUMNS 순서)
+POINT_NAMES = ["top", "center", "bottom", "left", "right"]
+
+def ingest_measurements(db: Session, items: List[measurement.MeasurementCreate]) -> Dict[str, Any]:
+    """
+    측정 데이터 목록을 한 트랜잭션으로 추가하고 웨이퍼별 결과 반환
+    이미 있거나 요청 안에서 반복되는 타겟 + LOT NO + WAFER NO 조합은 건너뜀 (status: duplicate)
+    """
+    target_ids = sorted({item.target_id for item in items})
+    found_ids = {
+        row.id for row in db.query(models.Target.id).filter(models.Target.id.in_(target_ids)).all()
+    }
+    missing_ids = [target_id for target_id in target_ids if target_id not in found_ids]
+    if missing_ids:
+        raise HTTPException(status_code=404, detail=f"Target not found: {', '.join(map(str, missing_ids))}")
+
+    # 타겟별 활성 SPEC (캐시)
+    specs = {}
+    for target_id in target_ids:
+        spec = spec_cache.get_active_spec(db, target_id)
+        if spec is not None:
+            specs[target_id] = spec
+
+    # 통계치 계산 (웨이퍼 x 측정 위치 행렬)
+    values = np.array([
+        [getattr(item, column) for column in bulk_import.VALUE_COLUMNS] for item in items
+    ], dtype=float)
+    derived = bulk_import.calculate_derived_values(values)
+
+    results = []
+    for index, item in enumerate(items):
+        results.append({
+            "index": index,
+            "target_id": item.target_id,
+            "lot_no": item.lot_no,
+            "wafer_no": item.wafer_no,
+            "status": "created",
+            "measurement_id": None,
+            **{column: float(derived[column][index]) for column in derived},
+            "spec_found": False,
+            "all_in_spec": None,
+            "out_of_spec_points": []
+        })
+
+    # SPEC 판정
+    for target_id, spec in specs.items():
+        indexes = [i for i, item in enumerate(items) if item.target_id == target_id]
+        out_of_spec = (values[indexes] < spec.lsl) | (values[indexes] > spec.usl)
+        for row, index in enumerate(indexes):
+            results[index]["spec_found"] = True
+            results[index]["all_in_spec"] = not out_of_spec[row].any()
+            results[index]["out_of_spec_points"] = [
+                POINT_NAMES[point] for point in np.nonzero(out_of_spec[row])[0]
+            ]
+
+    # 타겟별 중복 검사 후 추가
+    for target_id in target_ids:
+        indexes = [i for i, item in enumerate(items) if item.target_id == target_id]
+        existing = crud.find_existing_lot_wafers(db, target_id, [items[i].lot_no for i in indexes])
+
+        rows = []
+        row_indexes = []
+        seen = set(existing)
+        for index in indexes:
+            item = items[index]
+            key = (item.lot_no.lower(), item.wafer_no.lower())
+            if key in seen:
+                results[index]["status"] = "duplicate"
+                continue
+            seen.add(key)
+
+            row = {
+                "coating_equipment_id": item.coating_equipment_id,
+                "exposure_equipment_id": item.exposure_equipment_id,
+                "development_equipment_id": item.development_equipment_id,
+                "device": item.device,
+                "lot_no": item.lot_no,
+                "wafer_no": item.wafer_no,
+                "exposure_time": item.exposure_time,
+                "author": item.author
+            }
+            for column in bulk_import.VALUE_COLUMNS:
+                row[column] = getattr(item, column)
+            for column in derived:
+                row[column] = results[index][column]
+            rows.append(row)
+            row_indexes.append(index)
+
+        inserted = crud.insert_measurements(db, target_id, rows)
+        for index, inserted_row in zip(row_indexes, inserted):
+            results[index]["measurement_id"] = inserted_row.id
+
+    db.commit()
+
+    # 커밋 후 SPEC 위반 알림 요청 (발송은 백그라운드에서 처리)
+    for index, item in enumerate(items):
+        result = results[index]
+        if result["status"] == "created" and result["all_in_spec"] is False:
+            notification_service.enqueue_spec_violation(result["measurement_id"], item, specs[item.target_id])
+
+    return {
+        "created_count": sum(1 for result in results if result["status"] == "created"),
+        "duplicate_count": sum(1 for result in results if result["status"] == "duplicate"),
+        "out_of_spec_count": sum(
+            1 for result in results if result["status"] == "created" and result["all_in_spec"] is False
+        ),
+        "results": results
+    }
@@ -4,15 +4,18 @@ DICD 측정 관리 시스템 - 벌크 데이터 가져오기 서비스
 """
 
 import io
+import os
+import json
+import tempfile
+import openpyxl
 import pandas as pd
 import numpy as np
 from sqlalchemy.orm import Session
 from fastapi import UploadFile, HTTPException
-from typing import Dict, List, Any, Tuple, Optional
+from typing import Dict, Iterator, List, Any, Tuple, Optional
 from datetime import datetime
 
-from ..database import models
-from ..schemas import measurement
+from ..database import models, crud
 
 async def validate_file_extension(file: UploadFile) -> str:
     """
@@ -28,6 +31,12 @@ async def validate_file_extension(file: UploadFile) -> str:
     else:
         raise HTTPException(status_code=400, detail="지원되지 않는 파일 형식입니다. CSV 또는 Excel 파일만 업로드해주세요.")
 
+# 필수 열 (업로드 파일에 반드시 있어야 하는 열)
+REQUIRED_COLUMNS = ['device', 'lot_no', 'wafer_no', 'value_top', 'value_center', 'value_bottom', 'value_left', 'value_right']
+
+# 측정값 열 (통계치 계산 순서)
+VALUE_COLUMNS = ['value_top', 'value_center', 'value_bottom', 'value_left', 'value_right']
+
 async def process_bulk_import(
     db: Session, 
     file: UploadFile, 
@@ -39,6 +48,7 @@ async def process_bulk_import(
 ) -> Dict[str, Any]:
     """
     업로드된 파일 처리 및 데이터 일괄 가져오기
+    검증, 중복 검사, 통계치 계산은 열 단위로 한 번에 처리하고 한 번의 executemany로 추가
     """
     # 파일 확장자 확인
     file_type = await validate_file_extension(file)
@@ -54,102 +64,16 @@ async def process_bulk_import(
             df = pd.read_excel(io.BytesIO(content))
         
         # 필수 열 확인
-        required_columns = ['device', 'lot_no', 'wafer_no', 'value_top', 'value_center', 'value_bottom', 'value_left', 'value_right']
-        missing_columns = [col for col in required_columns if col not in df.columns]
-        
-        if missing_columns:
-            raise HTTPException(
-                status_code=400, 
-                detail=f"업로드 파일에 필수 열이 누락되었습니다: {', '.join(missing_columns)}"
-            )
+        check_required_columns(df.columns)
         
-        # 데이터 검증 및 가공
-        validated_data, errors = validate_measurement_data(df, target_id)
-        
-        # 검증된 데이터가 없으면 오류 반환
-        if not validated_data:
-            raise HTTPException(
-                status_code=400,
-                detail="유효한 데이터가 없습니다. 모든 행에 오류가 있습니다."
-            )
-        
-        # 중복 검사
-        duplicates = check_duplicates(db, validated_data)
-        
-        # 측정 데이터 생성
-        imported_count = 0
-        for row in validated_data:
-            # 중복 항목 건너뛰기
-            lot_wafer_key = f"{row['lot_no']}_{row['wafer_no']}"
-            if lot_wafer_key in duplicates:
-                errors.append({
-                    "row": row.get("original_row", "알 수 없음"),
-                    "error": f"중복된 LOT_NO ({row['lot_no']})와 WAFER_NO ({row['wafer_no']})의 조합입니다. 건너뜁니다."
-                })
-                continue
-            
-            # 데이터 준비
-            measurement_data = measurement.MeasurementCreate(
-                target_id=target_id,
-                coating_equipment_id=coating_equipment_id,
-                exposure_equipment_id=exposure_equipment_id,
-                development_equipment_id=development_equipment_id,
-                device=row['device'],
-                lot_no=row['lot_no'],
-                wafer_no=row['wafer_no'],
-                exposure_time=row.get('exposure_time'),
-                value_top=row['value_top'],
-                value_center=row['value_center'],
-                value_bottom=row['value_bottom'],
-                value_left=row['value_left'],
-                value_right=row['value_right'],
-                author=author
-            )
-            
-            # 측정값의 통계치 계산
-            values = [
-                measurement_data.value_top,
-                measurement_data.value_center,
-                measurement_data.value_bottom,
-                measurement_data.value_left,
-                measurement_data.value_right
-            ]
-            
-            avg_value = sum(values) / len(values)
-            min_value = min(values)
-            max_value = max(values)
-            range_value = max_value - min_value
-            
-            # 표준편차 계산 (샘플이 5개이므로 Bessel's correction 적용)
-            mean = sum(values) / len(values)
-            sum_sq_diff = sum((x - mean) ** 2 for x in values)
-            std_dev = (sum_sq_diff / (len(values) - 1)) ** 0.5 if len(values) > 1 else 0
-            
-            # 데이터베이스 객체 생성
-            db_measurement = models.Measurement(
-                target_id=measurement_data.target_id,
-                coating_equipment_id=measurement_data.coating_equipment_id,
-                exposure_equipment_id=measurement_data.exposure_equipment_id,
-                development_equipment_id=measurement_data.development_equipment_id,
-                device=measurement_data.device,
-                lot_no=measurement_data.lot_no,
-                wafer_no=measurement_data.wafer_no,
-                exposure_time=measurement_data.exposure_time,
-                value_top=measurement_data.value_top,
-                value_center=measurement_data.value_center,
-                value_bottom=measurement_data.value_bottom,
-                value_left=measurement_data.value_left,
-                value_right=measurement_data.value_right,
-                avg_value=round(avg_value, 3),
-                min_value=round(min_value, 3),
-                max_value=round(max_value, 3),
-                range_value=round(range_value, 3),
-                std_dev=round(std_dev, 3),
-                author=measurement_data.author
-            )
-            
-            db.add(db_measurement)
-            imported_count += 1
+        # 검증, 중복 검사 후 일괄 추가 (검증된 데이터가 없으면 오류 반환)
+        result = import_dataframe(
+            db, df, target_id, author,
+            coating_equipment_id=coating_equipment_id,
+            exposure_equipment_id=exposure_equipment_id,
+            development_equipment_id=development_equipment_id,
+            require_valid_rows=True
+        )
         
         # 변경 사항 커밋
         db.commit()
@@ -157,107 +81,451 @@ async def process_bulk_import(
         # 결과 반환
         return {
             "success": True,
-            "imported_count": imported_count,
+            "imported_count": result["imported_count"],
             "total_rows": len(df),
-            "errors": errors,
-            "duplicate_count": len(duplicates)
+            "errors": result["errors"],
+            "duplicate_count": result["duplicate_count"]
         }
     
+    except HTTPException:
+        raise
     except pd.errors.ParserError:
         raise HTTPException(status_code=400, detail="파일 형식이 올바르지 않습니다. 올바른 CSV 또는 Excel 파일인지 확인해주세요.")
     except Exception as e:
+        db.rollback()
         raise HTTPException(status_code=500, detail=f"파일 처리 중 오류가 발생했습니다: {str(e)}")
 
-def validate_measurement_data(df: pd.DataFrame, target_id: int) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+# ---------------------------------------------------------------------------
+# 스트리밍 가져오기 (대용량 파일)
+# 업로드 파일을 디스크에 저장한 뒤 CHUNK_SIZE 행씩 읽어 청크마다 커밋하므로
+# 파일 크기와 관계없이 메모리 사용량이 일정합니다. 진행 상황은 import_jobs 테이블에
+# 청크와 같은 트랜잭션으로 기록되므로 중단된 작업은 처리한 행 다음부터 이어서 진행합니다.
+# ---------------------------------------------------------------------------
+
+# 한 번에 읽고 커밋하는 행 수
+CHUNK_SIZE = 5000
+
+# 업로드 파일 저장 시 읽기 단위 (바이트)
+SPOOL_BLOCK_SIZE = 1024 * 1024
+
+# 작업에 보관하는 행별 오류 최대 개수 (전체 개수는 error_count)
+MAX_STORED_ERRORS = 1000
+
+# 업로드 파일 임시 저장 경로
+IMPORT_SPOOL_DIR = os.path.join(tempfile.gettempdir(), "dicd_imports")
+
+async def create_import_job(
+    db: Session,
+    file: UploadFile,
+    target_id: int,
+    author: str,
+    coating_equipment_id: Optional[int] = None,
+    exposure_equipment_id: Optional[int] = None,
+    development_equipment_id: Optional[int] = None
+) -> models.ImportJob:
     """
-    데이터프레임의 각 행을 검증하고 변환합니다
+    업로드 파일을 디스크에 나누어 저장하고 가져오기 작업 생성
     """
-    validated_data = []
-    errors = []
+    file_type = await validate_file_extension(file)
     
-    for idx, row in df.iterrows():
+    os.makedirs(IMPORT_SPOOL_DIR, exist_ok=True)
+    suffix = os.path.splitext(file.filename)[1].lower()
+    fd, spool_path = tempfile.mkstemp(suffix=suffix, dir=IMPORT_SPOOL_DIR)
+    
+    try:
+        with os.fdopen(fd, "wb") as spool:
+            while True:
+                block = await file.read(SPOOL_BLOCK_SIZE)
+                if not block:
+                    break
+                spool.write(block)
+        
+        # 필수 열 확인 (헤더만 읽음)
+        check_required_columns(_read_header(spool_path, file_type))
+    except Exception as e:
+        os.remove(spool_path)
+        if isinstance(e, HTTPException):
+            raise
+        raise HTTPException(status_code=400, detail="파일 형식이 올바르지 않습니다. 올바른 CSV 또는 Excel 파일인지 확인해주세요.")
+    
+    job = models.ImportJob(
+        target_id=target_id,
+        coating_equipment_id=coating_equipment_id,
+        exposure_equipment_id=exposure_equipment_id,
+        development_equipment_id=development_equipment_id,
+        author=author,
+        filename=file.filename,
+        file_type=file_type,
+        spool_path=spool_path,
+        status="pending"
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    
+    return job
+
+def _read_header(path: str, file_type: str) -> List[str]:
+    """
+    파일의 열 이름 목록
+    """
+    if file_type == 'csv':
+        return list(pd.read_csv(path, encoding='utf-8-sig', nrows=0).columns)
+    
+    if path.lower().endswith('.xlsx'):
+        workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
         try:
-            # 원본 행 번호 저장 (1부터 시작하는 행 번호)
-            original_row = idx + 2  # 헤더 포함하여 +2
-            
-            # 누락된 필수 값 확인
-            for field in ['device', 'lot_no', 'wafer_no', 'value_top', 'value_center', 'value_bottom', 'value_left', 'value_right']:
-                if pd.isna(row[field]):
-                    raise ValueError(f"필수 필드 '{field}'가 누락되었습니다")
-            
-            # 필드 타입 변환 및 유효성 검사
-            processed_row = {
-                "original_row": original_row,
-                "target_id": target_id,
-                "device": str(row['device']).strip(),
-                "lot_no": str(row['lot_no']).strip(),
-                "wafer_no": str(row['wafer_no']).strip(),
-            }
-            
-            # wafer_no 유효성 검사 (01~50)
-            try:
-                wafer_no_int = int(processed_row['wafer_no'])
-                if wafer_no_int < 1 or wafer_no_int > 50:
-                    raise ValueError("WAFER NO는 01~50 사이의 값이어야 합니다")
-            except ValueError:
-                raise ValueError("WAFER NO는 유효한 숫자여야 합니다")
-            
-            # 숫자 필드 처리
-            for field in ['value_top', 'value_center', 'value_bottom', 'value_left', 'value_right']:
-                try:
-                    # NaN 값이면 오류
-                    if pd.isna(row[field]):
-                        raise ValueError(f"'{field}' 값이 누락되었습니다")
-                    
-                    value = float(row[field])
-                    processed_row[field] = round(value, 3)  # 소수점 3자리로 반올림
-                except (ValueError, TypeError):
-                    raise ValueError(f"'{field}'가 유효한 숫자 형식이 아닙니다: {row[field]}")
+            header = next(workbook.active.iter_rows(max_row=1, values_only=True), ())
+        finally:
+            workbook.close()
+        return [str(value) for value in header if value is not None]
+    
+    return list(pd.read_excel(path, nrows=0).columns)
+
+def _iter_chunks(path: str, file_type: str, chunk_size: int) -> Iterator[pd.DataFrame]:
+    """
+    파일을 chunk_size 행씩 읽어 데이터프레임으로 반환
+    인덱스는 파일 전체에서의 데이터 행 위치 (0부터, 빈 행 제외)
+    """
+    if file_type == 'csv':
+        start = 0
+        with pd.read_csv(path, encoding='utf-8-sig', chunksize=chunk_size) as reader:
+            for chunk in reader:
+                chunk.index = pd.RangeIndex(start, start + len(chunk))
+                start += len(chunk)
+                yield chunk
+        return
+    
+    if not path.lower().endswith('.xlsx'):
+        # openpyxl은 .xls를 읽지 못하므로 전체를 읽은 뒤 나눔 (.xls는 최대 65,536행)
+        df = pd.read_excel(path)
+        for start in range(0, len(df), chunk_size):
+            yield df.iloc[start:start + chunk_size]
+        return
+    
+    # 읽기 전용 모드는 행을 순서대로 읽으며 시트 전체를 메모리에 올리지 않음
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = next(rows, ())
+        columns = [str(value) if value is not None else f"Unnamed: {i}" for i, value in enumerate(header)]
+        
+        start = 0
+        buffer = []
+        for values in rows:
+            # 빈 행 제외 (pandas.read_excel과 같음)
+            if all(value is None for value in values):
+                continue
+            buffer.append(values[:len(columns)])
+            if len(buffer) == chunk_size:
+                yield pd.DataFrame(buffer, columns=columns, index=pd.RangeIndex(start, start + len(buffer)))
+                start += len(buffer)
+                buffer = []
+        if buffer:
+            yield pd.DataFrame(buffer, columns=columns, index=pd.RangeIndex(start, start + len(buffer)))
+    finally:
+        workbook.close()
+
+def _isoformat(value):
+    return value.isoformat() if value else None
+
+def job_result(job: models.ImportJob) -> Dict[str, Any]:
+    """
+    가져오기 작업의 진행 상황과 결과 (처리량은 처음 시작한 시각부터 계산)
+    """
+    elapsed = None
+    rows_per_second = None
+    if job.started_at:
+        elapsed = ((job.finished_at or datetime.now()) - job.started_at).total_seconds()
+        if elapsed > 0:
+            rows_per_second = round(job.rows_processed / elapsed, 1)
+    
+    return {
+        "success": job.status == "completed",
+        "job_id": job.id,
+        "status": job.status,
+        "filename": job.filename,
+        "target_id": job.target_id,
+        "imported_count": job.imported_count,
+        "total_rows": job.rows_processed,
+        "errors": json.loads(job.errors or "[]"),
+        "error_count": job.error_count,
+        "duplicate_count": job.duplicate_count,
+        "error_message": job.error_message,
+        "created_at": _isoformat(job.created_at),
+        "started_at": _isoformat(job.started_at),
+        "finished_at": _isoformat(job.finished_at),
+        "elapsed_seconds": round(elapsed, 1) if elapsed is not None else None,
+        "rows_per_second": rows_per_second
+    }
+
+def run_import_job(db: Session, job_id: int, chunk_size: int = CHUNK_SIZE) -> Dict[str, Any]:
+    """
+    가져오기 작업 실행 (처리한 행 다음부터 이어서 진행), 청크마다 데이터와 진행 상황을 함께 커밋
+    """
+    job = db.query(models.ImportJob).filter(models.ImportJob.id == job_id).first()
+    if job is None:
+        raise HTTPException(status_code=404, detail="가져오기 작업을 찾을 수 없습니다")
+    if job.status == "completed":
+        return job_result(job)
+    if not os.path.exists(job.spool_path):
+        raise HTTPException(status_code=410, detail="업로드 파일이 남아 있지 않아 작업을 이어서 진행할 수 없습니다")
+    
+    job.status = "running"
+    job.error_message = None
+    job.finished_at = None
+    if job.started_at is None:
+        job.started_at = datetime.now()
+    db.commit()
+    
+    try:
+        for chunk in _iter_chunks(job.spool_path, job.file_type, chunk_size):
+            # 이미 커밋된 행 건너뛰기
+            if chunk.index[-1] < job.rows_processed:
+                continue
+            chunk = chunk[chunk.index >= job.rows_processed]
             
-            # 선택적 필드 처리
-            if 'exposure_time' in row and not pd.isna(row['exposure_time']):
-                try:
-                    processed_row['exposure_time'] = int(row['exposure_time'])
-                except (ValueError, TypeError):
-                    raise ValueError(f"'exposure_time'이 유효한 정수 형식이 아닙니다: {row['exposure_time']}")
+            result = import_dataframe(
+                db, chunk, job.target_id, job.author,
+                coating_equipment_id=job.coating_equipment_id,
+                exposure_equipment_id=job.exposure_equipment_id,
+                development_equipment_id=job.development_equipment_id
+            )
             
-            validated_data.append(processed_row)
+            job.rows_processed += len(chunk)
+            job.heartbeat_at = datetime.now()
+            job.imported_count += result["imported_count"]
+            job.duplicate_count += result["duplicate_count"]
+            job.error_count += len(result["errors"])
+            stored_errors = json.loads(job.errors or "[]")
+            if result["errors"] and len(stored_errors) < MAX_STORED_ERRORS:
+                stored_errors.extend(result["errors"][:MAX_STORED_ERRORS - len(stored_errors)])
+                job.errors = json.dumps(stored_errors, ensure_ascii=False)
             
-        except ValueError as ve:
-            errors.append({
-                "row": original_row,
-                "error": str(ve)
-            })
-        except Exception as e:
-            errors.append({
-                "row": original_row,
-                "error": f"처리 중 오류 발생: {str(e)}"
-            })
+            db.commit()
+    except Exception as e:
+        # 실패한 청크만 롤백되며 이전 청크까지는 커밋된 상태로 남음
+        db.rollback()
+        job.status = "failed"
+        job.error_message = str(e)
+        job.finished_at = datetime.now()
+        db.commit()
+        return job_result(job)
+    
+    job.status = "completed"
+    job.finished_at = datetime.now()
+    db.commit()
+    
+    # 완료된 작업의 업로드 파일 삭제
+    os.remove(job.spool_path)
+    
+    return job_result(job)
+
+def check_required_columns(columns) -> None:
+    """
+    필수 열 확인 (누락 시 400 오류)
+    """
+    missing_columns = [col for col in REQUIRED_COLUMNS if col not in columns]
     
-    return validated_data, errors
+    if missing_columns:
+        raise HTTPException(
+            status_code=400, 
+            detail=f"업로드 파일에 필수 열이 누락되었습니다: {', '.join(missing_columns)}"
+        )
 
-def check_duplicates(db: Session, validated_data: List[Dict[str, Any]]) -> Dict[str, bool]:
+def import_dataframe(
+    db: Session,
+    df: pd.DataFrame,
+    target_id: int,
+    author: str,
+    coating_equipment_id: Optional[int] = None,
+    exposure_equipment_id: Optional[int] = None,
+    development_equipment_id: Optional[int] = None,
+    require_valid_rows: bool = False
+) -> Dict[str, Any]:
     """
-    이미 존재하는 LOT_NO + WAFER_NO 조합을 확인합니다
+    데이터프레임 검증, 중복 검사, 통계치 계산 후 일괄 추가 (커밋은 호출한 쪽에서 수행)
+    행 번호는 데이터프레임 인덱스 + 2 (헤더 포함)
+    반환값: imported_count, errors, duplicate_count
     """
-    # 모든 LOT_NO와 WAFER_NO 조합 추출
-    lot_wafer_pairs = [(item['lot_no'], item['wafer_no'], item['target_id']) for item in validated_data]
+    # 데이터 검증 및 가공
+    validated, errors = validate_measurement_data(df, target_id)
     
-    # 중복 저장을 위한 딕셔너리
-    duplicates = {}
+    # 검증된 데이터가 없으면 오류 반환
+    if validated.empty and require_valid_rows:
+        raise HTTPException(
+            status_code=400,
+            detail="유효한 데이터가 없습니다. 모든 행에 오류가 있습니다."
+        )
     
-    for lot_no, wafer_no, target_id in lot_wafer_pairs:
-        # 데이터베이스에서 중복 확인
-        existing = db.query(models.Measurement).filter(
-            models.Measurement.target_id == target_id,
-            models.Measurement.lot_no == lot_no,
-            models.Measurement.wafer_no == wafer_no
-        ).first()
-        
-        if existing:
-            duplicates[f"{lot_no}_{wafer_no}"] = True
+    # 중복 검사 (DB에 이미 있는 LOT_NO + WAFER_NO 조합을 한 번에 조회)
+    duplicated = check_duplicates(db, target_id, validated)
+    for row in validated[duplicated].itertuples(index=False):
+        errors.append({
+            "row": row.original_row,
+            "error": f"중복된 LOT_NO ({row.lot_no})와 WAFER_NO ({row.wafer_no})의 조합입니다. 건너뜁니다."
+        })
+    duplicate_count = len(validated.loc[duplicated, ['lot_no', 'wafer_no']].drop_duplicates())
+    
+    # 측정값의 통계치 계산 후 행 목록 생성
+    rows = build_measurement_rows(
+        validated[~duplicated],
+        author=author,
+        coating_equipment_id=coating_equipment_id,
+        exposure_equipment_id=exposure_equipment_id,
+        development_equipment_id=development_equipment_id
+    )
+    
+    # 일괄 추가 (SPC 판정 상태, 일별 집계, 검색 색인도 같은 트랜잭션에서 갱신)
+    inserted = crud.insert_measurements(db, target_id, rows)
+    
+    return {
+        "imported_count": len(inserted),
+        "errors": errors,
+        "duplicate_count": duplicate_count
+    }
+
+def round3(values: np.ndarray) -> np.ndarray:
+    """
+    소수점 3자리 반올림 (단건 입력의 round(value, 3)과 같은 결과)
+    np.round는 1000을 곱한 값을 반올림하므로 .5 경계 근처의 값만 파이썬 round로 다시 계산
+    """
+    values = np.asarray(values, dtype=float)
+    rounded = np.round(values, 3)
+    scaled = values * 1000
+    near_half = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    for index in zip(*np.nonzero(near_half)):
+        rounded[index] = round(float(values[index]), 3)
+    return rounded
+
+def _set_row_errors(row_errors: pd.Series, mask: pd.Series, messages) -> None:
+    """
+    아직 오류가 없는 행 중 mask에 해당하는 행에 오류 메시지 기록 (행마다 첫 번째 오류만 보고)
+    messages는 문자열 또는 행별 메시지 Series
+    """
+    mask = mask & row_errors.isna()
+    if not mask.any():
+        return
+    if isinstance(messages, pd.Series):
+        row_errors[mask] = messages[mask]
+    else:
+        row_errors[mask] = messages
+
+def validate_measurement_data(df: pd.DataFrame, target_id: int) -> Tuple[pd.DataFrame, List[Dict[str, Any]]]:
+    """
+    데이터프레임을 열 단위로 검증하고 변환합니다
+    행마다 첫 번째 오류만 보고하며, 검사 순서는 누락 필드 > WAFER NO > 측정값 > exposure_time
+    반환값: (검증된 행의 데이터프레임, 오류 목록)
+    """
+    # 원본 행 번호 (헤더 포함하여 +2)
+    original_row = pd.Series(df.index + 2, index=df.index)
+    row_errors = pd.Series(None, index=df.index, dtype=object)
+    
+    # 누락된 필수 값 확인
+    for field in REQUIRED_COLUMNS:
+        _set_row_errors(row_errors, df[field].isna(), f"필수 필드 '{field}'가 누락되었습니다")
+    
+    # 필드 타입 변환
+    validated = pd.DataFrame({
+        "original_row": original_row,
+        "target_id": target_id,
+        "device": df['device'].astype(str).str.strip(),
+        "lot_no": df['lot_no'].astype(str).str.strip(),
+        "wafer_no": df['wafer_no'].astype(str).str.strip(),
+    }, index=df.index)
+    
+    # wafer_no 유효성 검사 (01~50의 정수)
+    wafer_no_int = pd.to_numeric(
+        validated['wafer_no'].where(validated['wafer_no'].str.fullmatch(r'[+-]?\d+')),
+        errors='coerce'
+    )
+    _set_row_errors(row_errors, ~wafer_no_int.between(1, 50), "WAFER NO는 유효한 숫자여야 합니다")
+    
+    # 숫자 필드 처리 (소수점 3자리로 반올림)
+    for field in VALUE_COLUMNS:
+        values = pd.to_numeric(df[field], errors='coerce').astype(float)
+        invalid = ~np.isfinite(values)
+        if invalid.any():
+            messages = df[field].astype(str).radd(f"'{field}'가 유효한 숫자 형식이 아닙니다: ")
+            _set_row_errors(row_errors, invalid, messages)
+        validated[field] = round3(values.to_numpy())
+    
+    # 선택적 필드 처리
+    if 'exposure_time' in df.columns:
+        exposure_time = pd.to_numeric(df['exposure_time'], errors='coerce').astype(float)
+        invalid = df['exposure_time'].notna() & ~np.isfinite(exposure_time)
+        if invalid.any():
+            messages = df['exposure_time'].astype(str).radd("'exposure_time'이 유효한 정수 형식이 아닙니다: ")
+            _set_row_errors(row_errors, invalid, messages)
+        validated['exposure_time'] = np.trunc(exposure_time)
+    else:
+        validated['exposure_time'] = np.nan
+    
+    failed = row_errors.notna()
+    errors = [
+        {"row": int(row), "error": message}
+        for row, message in zip(original_row[failed], row_errors[failed])
+    ]
+    
+    return validated[~failed], errors
+
+def check_duplicates(db: Session, target_id: int, validated: pd.DataFrame) -> pd.Series:
+    """
+    이미 존재하는 LOT_NO + WAFER_NO 조합에 해당하는 행 표시 (한 번의 집합 조회)
+    파일 안에서 같은 조합이 반복되면 첫 행만 추가하도록 이후 행도 중복으로 표시
+    (청크 단위로 나누어 가져와도 같은 결과가 되도록)
+    """
+    keys = pd.MultiIndex.from_arrays([validated['lot_no'].str.lower(), validated['wafer_no'].str.lower()])
+    duplicated = keys.duplicated()
+    
+    existing = crud.find_existing_lot_wafers(db, target_id, validated['lot_no'].unique())
+    if existing:
+        duplicated |= keys.isin(list(existing))
+    
+    return pd.Series(duplicated, index=validated.index)
+
+def calculate_derived_values(values: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    측정값 행렬(n x 5)의 행별 평균, 최소, 최대, 범위, 표준편차 계산 (소수점 3자리로 반올림)
+    표준편차는 샘플이 5개이므로 Bessel's correction 적용
+    """
+    min_value = values.min(axis=1)
+    max_value = values.max(axis=1)
+    return {
+        "avg_value": round3(values.mean(axis=1)),
+        "min_value": round3(min_value),
+        "max_value": round3(max_value),
+        "range_value": round3(max_value - min_value),
+        "std_dev": round3(values.std(axis=1, ddof=1))
+    }
+
+def build_measurement_rows(
+    validated: pd.DataFrame,
+    author: str,
+    coating_equipment_id: Optional[int] = None,
+    exposure_equipment_id: Optional[int] = None,
+    development_equipment_id: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """
+    검증된 데이터프레임에 통계치를 더해 measurements 테이블 행(dict) 목록으로 변환
+    """
+    if validated.empty:
+        return []
+    
+    frame = validated[['device', 'lot_no', 'wafer_no'] + VALUE_COLUMNS].copy()
+    for column, values in calculate_derived_values(frame[VALUE_COLUMNS].to_numpy(dtype=float)).items():
+        frame[column] = values
+    
+    # 비어 있는 exposure_time은 NULL
+    frame['exposure_time'] = validated['exposure_time'].astype('Int64').astype(object).where(
+        validated['exposure_time'].notna(), None
+    )
+    frame['coating_equipment_id'] = coating_equipment_id
+    frame['exposure_equipment_id'] = exposure_equipment_id
+    frame['development_equipment_id'] = development_equipment_id
+    frame['author'] = author
     
-    return duplicates
+    return frame.to_dict('records')
 
 def create_template_dataframe() -> pd.DataFrame:
     """
@@ -0,0 +1,93 @@
+"""
+DICD 측정 관리 시스템 - 조건부 조회 (ETag / Last-Modified)
+조회 API의 응답에 검증자(ETag, Last-Modified)를 붙이고, 클라이언트가 보낸 If-None-Match가
+현재 ETag와 같으면 분석이나 조회를 실행하지 않고 304를 반환합니다.
+브라우저는 Cache-Control: no-cache인 응답을 보관했다가 다음 요청에 If-None-Match를 자동으로 보냅니다.
+
+ETag는 응답 내용을 결정하는 값(데이터 워터마크, 버전, 요청 파라미터)의 해시입니다.
+- 분석(SPC / 분포 / 공정 통계): result_cache.get_watermark()의 측정 데이터 워터마크와 활성 SPEC
+- SPEC: spec_cache의 DB 버전(cache_versions) + 기준 정보 스냅샷 ETag (타겟 삭제 시 SPEC도 삭제됨)
+- 기준 정보(제품군 / 공정 / 타겟 / 장비): hierarchy 스냅샷 ETag (조회마다 cache_versions의 버전을 확인하므로
+  다른 워커 프로세스의 변경도 바로 반영)
+
+If-Modified-Since는 판정에 사용하지 않습니다. 측정 데이터 삭제나 과거 날짜로 가져온 데이터는
+최종 수정 시각을 바꾸지 않으므로 ETag만으로 판정합니다 (Last-Modified는 참고용).
+"""
+
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from typing import Any, Dict, Optional, Tuple
+from fastapi import Request, Response
+from sqlalchemy.orm import Session
+
+from . import hierarchy, spec_cache
+
+def make_etag(*parts: Any) -> str:
+    """
+    응답 내용을 결정하는 값들의 해시로 ETag 생성
+    """
+    return '"' + hashlib.sha1(repr(parts).encode("utf-8")).hexdigest() + '"'
+
+def http_date(value: datetime) -> str:
+    """
+    HTTP 날짜 형식 (시간대 정보가 없는 값은 서버 로컬 시각으로 간주)
+    """
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+def watermark_modified(watermark: Tuple) -> Optional[datetime]:
+    """
+    측정 데이터 워터마크의 최종 입력/수정 시각 (데이터가 없으면 None)
+    """
+    times = [value for value in watermark[3:5] if value is not None]
+    return max(times) if times else None
+
+def validator_headers(etag: str, last_modified: Optional[datetime] = None) -> Dict[str, str]:
+    """
+    응답 검증자 헤더 (캐시는 허용하되 사용할 때마다 ETag로 재검증)
+    """
+    headers = {
+        "ETag": etag,
+        "Cache-Control": "no-cache"
+    }
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+    return headers
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    """
+    If-None-Match에 현재 ETag(또는 *)가 있으면 True (W/ 약한 비교)
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    etags = [tag.strip() for tag in if_none_match.split(",")]
+    if "*" in etags:
+        return True
+    return etag in (tag[2:] if tag.startswith("W/") else tag for tag in etags)
+
+def not_modified(headers: Dict[str, str]) -> Response:
+    return Response(status_code=304, headers=headers)
+
+def evaluate(request: Request, response: Response, etag: str,
+             last_modified: Optional[datetime] = None) -> Optional[Response]:
+    """
+    response_model을 반환하는 라우터용: 검증자 헤더를 응답에 설정하고 변경이 없으면 304 응답 반환
+    """
+    headers = validator_headers(etag, last_modified)
+    if is_not_modified(request, etag):
+        return not_modified(headers)
+    response.headers.update(headers)
+    return None
+
+def master_data_etag(db: Session) -> str:
+    """
+    기준 정보(제품군 / 공정 / 타겟 / 장비) 조회 응답의 ETag
+    """
+    return hierarchy.get_snapshot(db)["etag"]
+
+def spec_etag(db: Session) -> str:
+    """
+    SPEC 조회 응답의 ETag
+    """
+    return make_etag("specs", spec_cache.get_version(db), master_data_etag(db))
@@ -0,0 +1,180 @@
+"""
+DICD 측정 관리 시스템 - 고정 관리 한계선 서비스 (Phase I / Phase II)
+
+Phase I: 사용자가 고른 기준 기간의 데이터로 타겟의 평균값 + 위치별 시계열 관리 한계선을 한 번 산출하여
+control_limits 테이블에 새 버전으로 저장합니다. 이전 버전은 비활성화되며 이력으로 남습니다.
+
+Phase II: 활성 버전이 있으면 SPC 분석(spc.analyze_spc)과 실시간 판정(spc_monitor)이
+조회 기간과 무관하게 저장된 한계선을 그대로 사용하므로 규칙 판정이 요청마다 달라지지 않습니다.
+활성 버전이 없으면 기존처럼 조회 기간의 데이터로 한계선을 계산합니다.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from fastapi import HTTPException
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from ..database import models
+from . import statistics as stats_service
+from . import result_cache
+from .dataset import load_measurement_dataset, SERIES
+
+# Phase I 기준 기간의 최소 샘플 수
+MIN_PHASE1_SAMPLES = 20
+
+# 관리 한계선 시그마 수준 (Nelson Rule 판정과 실시간 판정은 (UCL-CL)/3을 1-시그마로 사용)
+SIGMA_LEVEL = 3
+
+def _rows_to_dict(rows: List[models.ControlLimit]) -> Dict[str, Any]:
+    """
+    한 버전의 시계열별 행을 하나의 결과로 변환
+    """
+    first = rows[0]
+    return {
+        "target_id": first.target_id,
+        "version": first.version,
+        "is_active": first.is_active,
+        "sigma_level": first.sigma_level,
+        "phase1_start": first.phase1_start.isoformat(),
+        "phase1_end": first.phase1_end.isoformat(),
+        "sample_count": first.sample_count,
+        "reason": first.reason,
+        "created_at": first.created_at.isoformat() if first.created_at else None,
+        "limits": {
+            row.series: {"cl": row.cl, "ucl": row.ucl, "lcl": row.lcl}
+            for row in rows
+        }
+    }
+
+def get_active_limits(db: Session, target_id: int) -> Optional[Dict[str, Any]]:
+    """
+    타겟의 활성(Phase II) 관리 한계선 (없으면 None)
+    """
+    rows = db.query(models.ControlLimit).filter(
+        models.ControlLimit.target_id == target_id,
+        models.ControlLimit.is_active == True
+    ).all()
+
+    if not rows:
+        return None
+    return _rows_to_dict(rows)
+
+def get_limit_versions(db: Session, target_id: int) -> List[Dict[str, Any]]:
+    """
+    타겟의 관리 한계선 버전 이력 (최신 버전부터)
+    """
+    rows = db.query(models.ControlLimit).filter(
+        models.ControlLimit.target_id == target_id
+    ).order_by(models.ControlLimit.version.desc()).all()
+
+    versions: Dict[int, List[models.ControlLimit]] = {}
+    for row in rows:
+        versions.setdefault(row.version, []).append(row)
+
+    return [_rows_to_dict(version_rows) for version_rows in versions.values()]
+
+def _refresh_monitor(db: Session, target_id: int):
+    """
+    실시간 판정 상태를 새 한계선 기준으로 재구성 (변경 사항을 먼저 flush)하고 이전 SPC 분석 결과 삭제
+    """
+    # 순환 참조 방지 (spc_monitor가 이 모듈을 사용)
+    from . import spc_monitor
+
+    db.flush()
+    spc_monitor.rebuild_state(db, target_id)
+    result_cache.invalidate(target_id)
+
+def establish_control_limits(
+    db: Session,
+    target_id: int,
+    start_date: datetime,
+    end_date: datetime,
+    reason: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Phase I 기준 기간의 데이터로 시계열별 관리 한계선을 산출하여 새 버전으로 저장하고 활성화
+    커밋은 호출한 쪽에서 수행
+    """
+    target = db.query(models.Target.id).filter(models.Target.id == target_id).first()
+    if target is None:
+        raise HTTPException(status_code=404, detail="Target not found")
+
+    dataset = load_measurement_dataset(db, target_id, start_date=start_date, end_date=end_date)
+    if dataset["count"] < MIN_PHASE1_SAMPLES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"기준 기간의 측정 데이터가 부족합니다 (최소 {MIN_PHASE1_SAMPLES}개, 현재 {dataset['count']}개)"
+        )
+
+    kernel = stats_service.calculate_series_statistics(dataset["matrix"], sigma_level=SIGMA_LEVEL)
+
+    # 같은 타겟의 이전 버전 비활성화
+    db.query(models.ControlLimit).filter(
+        models.ControlLimit.target_id == target_id,
+        models.ControlLimit.is_active == True
+    ).update({"is_active": False})
+
+    last_version = db.query(func.max(models.ControlLimit.version)).filter(
+        models.ControlLimit.target_id == target_id
+    ).scalar()
+    version = (last_version or 0) + 1
+
+    rows = []
+    for i, name in enumerate(SERIES):
+        # 조회 기간으로 계산할 때와 같은 반올림 (spc.control_limits_at)
+        row = models.ControlLimit(
+            target_id=target_id,
+            version=version,
+            series=name,
+            cl=round(float(kernel["cl"][i]), 3),
+            ucl=round(float(kernel["ucl"][i]), 3),
+            lcl=round(float(kernel["lcl"][i]), 3),
+            sigma_level=SIGMA_LEVEL,
+            phase1_start=start_date,
+            phase1_end=end_date,
+            sample_count=dataset["count"],
+            is_active=True,
+            reason=reason
+        )
+        db.add(row)
+        rows.append(row)
+
+    _refresh_monitor(db, target_id)
+    return _rows_to_dict(rows)
+
+def activate_version(db: Session, target_id: int, version: int) -> Dict[str, Any]:
+    """
+    이전 버전의 관리 한계선을 다시 활성화
+    커밋은 호출한 쪽에서 수행
+    """
+    rows = db.query(models.ControlLimit).filter(
+        models.ControlLimit.target_id == target_id,
+        models.ControlLimit.version == version
+    ).all()
+    if not rows:
+        raise HTTPException(status_code=404, detail="Control limit version not found")
+
+    db.query(models.ControlLimit).filter(
+        models.ControlLimit.target_id == target_id,
+        models.ControlLimit.version != version
+    ).update({"is_active": False})
+    for row in rows:
+        row.is_active = True
+
+    _refresh_monitor(db, target_id)
+    return _rows_to_dict(rows)
+
+def release_limits(db: Session, target_id: int) -> bool:
+    """
+    활성 버전을 비활성화하여 조회 기간 기준 계산(Phase I)으로 되돌림, 비활성화한 버전이 있으면 True
+    커밋은 호출한 쪽에서 수행
+    """
+    updated = db.query(models.ControlLimit).filter(
+        models.ControlLimit.target_id == target_id,
+        models.ControlLimit.is_active == True
+    ).update({"is_active": False})
+
+    if updated:
+        _refresh_monitor(db, target_id)
+    return bool(updated)
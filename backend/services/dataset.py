@@ -0,0 +1,101 @@
+"""
+DICD 측정 관리 시스템 - 측정 데이터셋 로더
+분석 서비스(spc, statistics, distribution)가 공통으로 사용하는 컬럼 단위 데이터 로더입니다.
+ORM 객체를 만들지 않고 필요한 컬럼만 조회하여 시계열별 float64 배열로 반환합니다.
+"""
+
+from datetime import datetime
+from typing import Dict, Any, Optional, Sequence
+import numpy as np
+from sqlalchemy.orm import Session
+
+from ..database import models
+
+# 측정 위치
+POSITIONS = ("top", "center", "bottom", "left", "right")
+
+# 분석 대상 시계열 (평균값 + 위치별 값)
+SERIES = ("avg",) + POSITIONS
+
+SERIES_COLUMNS = {
+    "avg": models.Measurement.avg_value,
+    "top": models.Measurement.value_top,
+    "center": models.Measurement.value_center,
+    "bottom": models.Measurement.value_bottom,
+    "left": models.Measurement.value_left,
+    "right": models.Measurement.value_right
+}
+
+def empty_dataset(extra_columns: Sequence[str] = ()) -> Dict[str, Any]:
+    dataset = {
+        "count": 0,
+        "ids": np.zeros(0, dtype=np.int64),
+        "dates": [],
+        "lot_nos": [],
+        "matrix": np.zeros((0, len(SERIES)), dtype=np.float64),
+        "series": {name: np.zeros(0, dtype=np.float64) for name in SERIES}
+    }
+    for column in extra_columns:
+        dataset[column] = []
+    return dataset
+
+def load_measurement_dataset(
+    db: Session,
+    target_id: int,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    extra_columns: Sequence[str] = ()
+) -> Dict[str, Any]:
+    """
+    타겟의 기간 내 측정 데이터를 측정 일시 순으로 조회
+
+    반환값:
+        count: 샘플 수
+        ids: 측정 ID (int64 배열)
+        dates: 측정 일시 목록
+        lot_nos: LOT NO 목록
+        matrix: 시계열 값 행렬 (n × 6, 열 순서는 SERIES)
+        series: 시계열 이름("avg", "top", ...) -> float64 배열 (matrix의 열)
+        extra_columns에 지정한 컬럼은 같은 이름의 키로 목록 반환 (예: "device")
+    """
+    columns = [
+        models.Measurement.id,
+        models.Measurement.created_at,
+        models.Measurement.lot_no
+    ]
+    columns.extend(SERIES_COLUMNS[name] for name in SERIES)
+    columns.extend(getattr(models.Measurement, column) for column in extra_columns)
+
+    query = db.query(*columns).filter(models.Measurement.target_id == target_id)
+
+    if start_date:
+        query = query.filter(models.Measurement.created_at >= start_date)
+    if end_date:
+        query = query.filter(models.Measurement.created_at <= end_date)
+
+    # (target_id, created_at) 인덱스 순서 그대로 조회 (동일 일시는 ID 순)
+    rows = query.order_by(models.Measurement.created_at.asc(), models.Measurement.id.asc()).all()
+
+    if not rows:
+        return empty_dataset(extra_columns)
+
+    # 행 단위 결과를 컬럼 단위로 전치
+    column_values = list(zip(*rows))
+    offset = 3 + len(SERIES)
+    
+    # 열 우선(Fortran) 순서이므로 각 시계열 열이 연속된 메모리
+    matrix = np.array(column_values[3:offset], dtype=np.float64).T
+
+    dataset = {
+        "count": len(rows),
+        "ids": np.array(column_values[0], dtype=np.int64),
+        "dates": list(column_values[1]),
+        "lot_nos": list(column_values[2]),
+        "matrix": matrix,
+        "series": {name: matrix[:, i] for i, name in enumerate(SERIES)}
+    }
+
+    for i, column in enumerate(extra_columns):
+        dataset[column] = list(column_values[offset + i])
+
+    return dataset
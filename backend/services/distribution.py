@@ -1,15 +1,25 @@
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime, timedelta
 import numpy as np
 from sqlalchemy.orm import Session
 from ..database import models
+from .dataset import load_measurement_dataset, POSITIONS
+from . import spec_cache, result_cache
+from . import statistics as stats_service
+from .sections import parse_sections
 import math
 
+# 분포 분석 결과에서 선택할 수 있는 항목 (평균값 values와 spec은 항상 포함)
+#   histogram: 평균값의 히스토그램과 정규분포 곡선 (histogram, normal_pdf)
+#   stats: 평균값의 분포 통계값 (distribution_stats)
+#   position_analysis: 위치별 히스토그램 / 정규분포 곡선 / 분포 통계값
+DISTRIBUTION_SECTIONS = ("histogram", "stats", "position_analysis")
+
 def calculate_histogram(values: List[float], bins: int = None) -> Dict[str, Any]:
     """
     히스토그램 데이터 계산 (최적의 bin 크기 사용)
     """
-    if not values or len(values) < 2:
+    if len(values) < 2:
         return {
             "bins": [],
             "counts": [],
@@ -41,7 +51,7 @@ def calculate_normal_pdf(values: List[float], bins: int = 200) -> Dict[str, Any]
     """
     정규분포 확률밀도함수(PDF) 계산 (더 부드러운 곡선용 포인트 증가)
     """
-    if not values or len(values) < 2:
+    if len(values) < 2:
         return {
             "x": [],
             "y": []
@@ -71,11 +81,12 @@ def calculate_normal_pdf(values: List[float], bins: int = 200) -> Dict[str, Any]
     
     return result
 
-def calculate_distribution_statistics(values: List[float]) -> Dict[str, Any]:
+def distribution_statistics_at(kernel: Dict[str, Any], column: int) -> Dict[str, Any]:
     """
-    분포 관련 통계값 계산 (왜도, 첨도 등)
+    statistics.calculate_series_statistics 결과에서 한 열의 분포 통계값 (왜도, 첨도 등)
     """
-    if not values or len(values) < 3:  # 왜도는 최소 3개 이상의 데이터 필요
+    n = kernel["count"]
+    if n < 3:  # 왜도는 최소 3개 이상의 데이터 필요
         return {
             "mean": None,
             "median": None,
@@ -85,25 +96,13 @@ def calculate_distribution_statistics(values: List[float]) -> Dict[str, Any]:
             "normality_test": None
         }
     
-    # 기본 통계값 계산
-    mean = np.mean(values)
-    median = np.median(values)
-    std_dev = np.std(values, ddof=1)
-    
-    # 왜도 계산 (Skewness)
-    n = len(values)
-    m3 = sum([(x - mean) ** 3 for x in values]) / n
-    skewness = m3 / (std_dev ** 3)
-    
-    # 첨도 계산 (Kurtosis)
-    m4 = sum([(x - mean) ** 4 for x in values]) / n
-    kurtosis = m4 / (std_dev ** 4) - 3  # 정규분포의 첨도가 0이 되도록 조정 (Excess Kurtosis)
+    skewness = float(kernel["skewness"][column])
+    kurtosis = float(kernel["kurtosis"][column])
     
     # D'Agostino-Pearson 정규성 검정 간소화 버전
     # 왜도와 첨도를 기반으로 근사값 계산
     k2 = n * (skewness**2 / 6 + kurtosis**2 / 24)
     p_value = np.exp(-0.5 * k2) if k2 < 100 else 0  # 간단한 근사 계산
-    # calculate_distribution_statistics 함수 내에서
     normality = {
         "test": "D'Agostino-Pearson (approximation)",
         "statistic": float(k2),  # NumPy 값을 Python float로 변환
@@ -112,47 +111,60 @@ def calculate_distribution_statistics(values: List[float]) -> Dict[str, Any]:
     }
     
     return {
-        "mean": round(mean, 3),
-        "median": round(median, 3),
-        "std_dev": round(std_dev, 3),
+        "mean": round(float(kernel["avg"][column]), 3),
+        "median": round(float(kernel["median"][column]), 3),
+        "std_dev": round(float(kernel["std_dev"][column]), 3),
         "skewness": round(skewness, 3),
         "kurtosis": round(kurtosis, 3),
         "normality_test": normality
     }
 
+def calculate_distribution_statistics(values: List[float]) -> Dict[str, Any]:
+    """
+    분포 관련 통계값 계산 (왜도, 첨도 등)
+    """
+    return distribution_statistics_at(stats_service.calculate_series_statistics(values), 0)
+
 # 변경 후
 def get_distribution_analysis(
     db: Session, 
     target_id: int, 
     days: int = 30, 
     start_date: Optional[datetime] = None,
-    end_date: Optional[datetime] = None
+    end_date: Optional[datetime] = None,
+    watermark: Optional[Tuple] = None,
+    sections=None
 ) -> Dict[str, Any]:
     """
-    특정 타겟에 대한 분포 분석 수행
+    특정 타겟에 대한 분포 분석 수행 (같은 데이터에 대한 반복 조회는 result_cache의 결과 사용)
+    watermark: 같은 기간으로 이미 구한 result_cache.get_watermark() 값 (없으면 조회)
+    sections: 계산할 항목 (DISTRIBUTION_SECTIONS 중 쉼표로 구분한 문자열 또는 목록, 지정하지 않으면 전체)
     """
+    sections = parse_sections(sections, DISTRIBUTION_SECTIONS)
+    now = datetime.now()
 
     # 시작 날짜와 종료 날짜 설정
     if not start_date:
-        start_date = datetime.now() - timedelta(days=days)
+        start_date = now - timedelta(days=days)
 
-    
-    # 측정 데이터 쿼리
-    query = db.query(models.Measurement).filter(
-        models.Measurement.target_id == target_id,
-        models.Measurement.created_at >= start_date
+    return result_cache.get_or_compute(
+        "distribution",
+        target_id,
+        result_cache.window_key(start_date, end_date, now),
+        (sections,),
+        watermark or result_cache.get_watermark(db, target_id, start_date, end_date),
+        lambda: _distribution_analysis(db, target_id, start_date, end_date, sections)
     )
-    
-    # 종료 날짜가 지정된 경우 추가 필터링
-    if end_date:
-        query = query.filter(models.Measurement.created_at <= end_date)
-    
-    query = query.order_by(models.Measurement.created_at.asc())
-    
-    measurements = query.all()
 
+def _distribution_analysis(db: Session, target_id: int, start_date: datetime, end_date: Optional[datetime],
+                           sections: Tuple[str, ...] = DISTRIBUTION_SECTIONS) -> Dict[str, Any]:
+    """
+    분포 분석 계산 (sections의 항목만 계산)
+    """
+    # 측정 데이터 조회 (필요한 컬럼만 배열로 로드)
+    dataset = load_measurement_dataset(db, target_id, start_date=start_date, end_date=end_date)
     
-    if not measurements:
+    if dataset["count"] == 0:
         return {
             "target_id": target_id,
             "sample_count": 0,
@@ -160,47 +172,52 @@ def get_distribution_analysis(
         }
     
     # 평균값 추출
-    values = [m.avg_value for m in measurements]
-    
-    # 위치별 값 추출
-    position_values = {
-        "top": [m.value_top for m in measurements],
-        "center": [m.value_center for m in measurements],
-        "bottom": [m.value_bottom for m in measurements],
-        "left": [m.value_left for m in measurements],
-        "right": [m.value_right for m in measurements]
-    }
+    values = dataset["series"]["avg"]
+    with_positions = "position_analysis" in sections
     
-    # 히스토그램 계산
     # 빈(bin) 개수는 데이터 수의 제곱근을 반올림하여 결정 (스터지스 공식 변형)
     bins = max(5, min(20, round(math.sqrt(len(values)))))
-    histogram = calculate_histogram(values, bins=bins)
     
-    # 정규분포 PDF 계산
-    normal_pdf = calculate_normal_pdf(values)
+    # 분포 통계값을 한 번에 계산 (위치별 항목을 요청하면 평균값 + 위치별 값 (n × 6) 행렬, 아니면 평균값만)
+    kernel = None
+    if with_positions:
+        kernel = stats_service.calculate_series_statistics(dataset["matrix"])
+    elif "stats" in sections:
+        kernel = stats_service.calculate_series_statistics(dataset["matrix"][:, :1])
     
-    # 분포 통계값 계산
-    distribution_stats = calculate_distribution_statistics(values)
+    result = {
+        "target_id": target_id,
+        "sample_count": dataset["count"],
+        "values": values
+    }
+    
+    if "histogram" in sections:
+        # 히스토그램 / 정규분포 PDF 계산
+        result["histogram"] = calculate_histogram(values, bins=bins)
+        result["normal_pdf"] = calculate_normal_pdf(values)
+    
+    if "stats" in sections:
+        result["distribution_stats"] = distribution_statistics_at(kernel, 0)
     
     # 위치별 분포 분석
-    position_analysis = {}
-    for position, pos_values in position_values.items():
-        position_analysis[position] = {
-            "histogram": calculate_histogram(pos_values, bins=bins),
-            "normal_pdf": calculate_normal_pdf(pos_values),
-            "stats": calculate_distribution_statistics(pos_values)
-        }
+    if with_positions:
+        position_analysis = {}
+        for i, position in enumerate(POSITIONS, start=1):
+            pos_values = dataset["series"][position]
+            position_analysis[position] = {
+                "histogram": calculate_histogram(pos_values, bins=bins),
+                "normal_pdf": calculate_normal_pdf(pos_values),
+                "stats": distribution_statistics_at(kernel, i)
+            }
+        result["position_analysis"] = position_analysis
     
     # SPEC 정보 가져오기
-    active_spec = db.query(models.Spec).filter(
-        models.Spec.target_id == target_id,
-        models.Spec.is_active == True
-    ).first()
+    active_spec = spec_cache.get_active_spec(db, target_id)
     
     spec_info = None
     if active_spec:
         # SPEC 기준 규격값 내 비율 계산
-        in_spec_ratio = sum(1 for v in values if active_spec.lsl <= v <= active_spec.usl) / len(values)
+        in_spec_ratio = np.count_nonzero((values >= active_spec.lsl) & (values <= active_spec.usl)) / len(values)
         
         spec_info = {
             "lsl": active_spec.lsl,
@@ -226,17 +243,6 @@ def get_distribution_analysis(
         else:
             return obj
 
-    # 결과를 반환하기 전에 변환 적용
-    result = {
-        "target_id": target_id,
-        "sample_count": len(measurements),
-        "values": values,
-        "histogram": histogram,
-        "normal_pdf": normal_pdf,
-        "distribution_stats": distribution_stats,
-        "position_analysis": position_analysis
-    }
-
     if spec_info:
         result["spec"] = spec_info
 
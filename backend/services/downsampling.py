@@ -0,0 +1,94 @@
+"""
+DICD 측정 관리 시스템 - 차트용 시계열 다운샘플링
+장기간 추이 / SPC / 모니터링 차트에 차트 폭보다 훨씬 많은 점을 보내지 않도록
+LTTB(Largest-Triangle-Three-Buckets)로 모양이 유지되는 점만 고릅니다.
+
+차트는 날짜 라벨을 카테고리 축으로 그리므로 x 좌표는 점의 순서(인덱스)를 사용합니다.
+Nelson 규칙 위반 / SPEC 위반 점처럼 반드시 보여야 하는 점은 keep으로 넘기면 항상 포함됩니다.
+"""
+
+from typing import Iterable, Optional
+import numpy as np
+
+# LTTB로 고르는 최소 점 수 (처음 / 끝 + 버킷 1개)
+MIN_LTTB_POINTS = 3
+
+def lttb_indices(values, max_points: int) -> np.ndarray:
+    """
+    LTTB로 고른 점의 인덱스 (오름차순, 처음과 마지막 점 포함)
+    """
+    y = np.asarray(values, dtype=float)
+    n = len(y)
+    if max_points >= n or n <= 2:
+        return np.arange(n)
+    max_points = max(max_points, MIN_LTTB_POINTS)
+
+    # 처음 / 마지막 점을 제외한 구간을 max_points - 2개 버킷으로 분할
+    edges = np.linspace(1, n - 1, max_points - 1).astype(int)
+    x = np.arange(n, dtype=float)
+
+    # 버킷별 평균 (다음 버킷의 평균점을 세 번째 꼭짓점으로 사용)
+    sums = np.concatenate(([0.0], np.cumsum(y)))
+    bucket_sizes = edges[1:] - edges[:-1]
+    mean_x = (edges[:-1] + edges[1:] - 1) / 2.0
+    mean_y = (sums[edges[1:]] - sums[edges[:-1]]) / bucket_sizes
+
+    selected = np.empty(max_points, dtype=int)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+
+    for bucket in range(max_points - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        if bucket + 1 < max_points - 2:
+            next_x, next_y = mean_x[bucket + 1], mean_y[bucket + 1]
+        else:
+            next_x, next_y = x[-1], y[-1]
+
+        # 직전에 고른 점, 버킷 내 후보, 다음 버킷 평균점이 이루는 삼각형 넓이(의 2배)가 가장 큰 후보 선택
+        areas = np.abs(
+            (x[a] - next_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (next_y - y[a])
+        )
+        a = start + int(np.argmax(areas))
+        selected[bucket + 1] = a
+
+    return selected
+
+def select_indices(values, max_points: int, keep: Optional[Iterable[int]] = None) -> np.ndarray:
+    """
+    keep의 점은 모두 포함하고 남은 개수만큼 LTTB로 고른 점의 인덱스 (오름차순)
+    keep이 max_points보다 많으면 결과도 max_points보다 많을 수 있음
+    """
+    n = len(values)
+    keep_indices = np.zeros(0, dtype=int)
+    if keep is not None:
+        keep_indices = np.unique(np.fromiter(keep, dtype=int))
+        keep_indices = keep_indices[(keep_indices >= 0) & (keep_indices < n)]
+
+    if max_points >= n:
+        return np.arange(n)
+
+    budget = max(max_points - len(keep_indices), MIN_LTTB_POINTS)
+    return np.union1d(lttb_indices(values, budget), keep_indices)
+
+def run_indices(runs: Iterable[dict]) -> np.ndarray:
+    """
+    Nelson 규칙 위반 구간(start, end)에 포함된 모든 점의 인덱스
+    """
+    ranges = [np.arange(run["start"], run["end"] + 1) for run in runs]
+    if not ranges:
+        return np.zeros(0, dtype=int)
+    return np.concatenate(ranges)
+
+def out_of_spec_indices(lsl: float, usl: float, *series) -> np.ndarray:
+    """
+    어느 시계열이든 SPEC을 벗어난 점의 인덱스
+    """
+    mask = None
+    for values in series:
+        array = np.asarray(values, dtype=float)
+        out = (array < lsl) | (array > usl)
+        mask = out if mask is None else (mask | out)
+    if mask is None:
+        return np.zeros(0, dtype=int)
+    return np.flatnonzero(mask)
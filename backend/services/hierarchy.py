@@ -0,0 +1,142 @@
+"""
+DICD 측정 관리 시스템 - 기준 정보 스냅샷 서비스
+제품군 > 공정 > 타겟 계층과 장비 목록을 하나의 스냅샷으로 만들어 프로세스 내에 보관합니다.
+
+crud.py의 제품군/공정/타겟/장비 생성, 수정, 삭제 함수는 같은 트랜잭션에서 bump_version()으로
+cache_versions 테이블의 버전을 올리고, 커밋 후 invalidate()로 스냅샷을 지웁니다.
+조회할 때마다 DB의 버전을 확인하므로 다른 워커 프로세스의 변경도 바로 반영되며,
+스냅샷 내용의 해시를 ETag로 사용하므로 클라이언트는 변경이 없을 때 304 응답만 받습니다.
+
+crud.py를 거치지 않고 기준 정보를 직접 변경한 경우(유틸리티 스크립트 등)에 대비하여
+SNAPSHOT_MAX_AGE초가 지나면 버전이 같아도 스냅샷을 다시 만듭니다.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from typing import Dict, Any
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..database import models
+
+CACHE_NAME = "hierarchy"
+
+# 버전 변경 없이 직접 변경된 기준 정보를 반영하기 위한 스냅샷 최대 유지 시간(초)
+SNAPSHOT_MAX_AGE = 60
+
+_lock = threading.Lock()
+_generation = 0  # 로컬 무효화 횟수 (생성 중에 무효화되었으면 스냅샷을 보관하지 않음)
+_snapshot = None
+
+def get_version(db: Session) -> int:
+    """
+    기준 정보 변경 버전 (제품군 / 공정 / 타겟 / 장비 생성, 수정, 삭제 시 증가)
+    """
+    row = db.query(models.CacheVersion.version).filter(models.CacheVersion.name == CACHE_NAME).first()
+    return row.version if row else 0
+
+def bump_version(db: Session) -> int:
+    """
+    기준 정보 변경을 다른 워커 프로세스에 알리기 위해 버전 증가 후 새 버전 반환
+    커밋은 호출한 쪽의 트랜잭션에서 수행하고, 커밋 후 invalidate() 호출
+    """
+    query = db.query(models.CacheVersion).filter(models.CacheVersion.name == CACHE_NAME)
+    if not query.update({"version": models.CacheVersion.version + 1}, synchronize_session=False):
+        try:
+            with db.begin_nested():
+                db.add(models.CacheVersion(name=CACHE_NAME, version=1))
+        except IntegrityError:
+            # 다른 요청이 동시에 처음 버전 행을 추가한 경우
+            query.update({"version": models.CacheVersion.version + 1}, synchronize_session=False)
+    return get_version(db)
+
+def invalidate():
+    """
+    기준 정보가 변경되었음을 알림 (다음 조회 시 스냅샷 재생성)
+    """
+    global _generation, _snapshot
+    with _lock:
+        _generation += 1
+        _snapshot = None
+
+def _isoformat(value):
+    return value.isoformat() if value else None
+
+def _base_fields(row) -> Dict[str, Any]:
+    return {
+        "id": row.id,
+        "name": row.name,
+        "description": row.description,
+        "created_at": _isoformat(row.created_at),
+        "updated_at": _isoformat(row.updated_at)
+    }
+
+def build_hierarchy(db: Session) -> Dict[str, Any]:
+    """
+    제품군 > 공정 > 타겟 트리와 장비 목록 조회 (테이블별 한 번씩, ID 순)
+    각 항목의 필드는 개별 조회 API의 응답과 같음
+    """
+    product_groups = []
+    processes_by_group = {}
+    targets_by_process = {}
+
+    for group in db.query(models.ProductGroup).order_by(models.ProductGroup.id).all():
+        item = _base_fields(group)
+        item["processes"] = processes_by_group.setdefault(group.id, [])
+        product_groups.append(item)
+
+    for process in db.query(models.Process).order_by(models.Process.id).all():
+        item = _base_fields(process)
+        item["product_group_id"] = process.product_group_id
+        item["targets"] = targets_by_process.setdefault(process.id, [])
+        processes_by_group.setdefault(process.product_group_id, []).append(item)
+
+    for target in db.query(models.Target).order_by(models.Target.id).all():
+        item = _base_fields(target)
+        item["process_id"] = target.process_id
+        targets_by_process.setdefault(target.process_id, []).append(item)
+
+    equipments = []
+    for equipment in db.query(models.Equipment).order_by(models.Equipment.id).all():
+        item = _base_fields(equipment)
+        item["type"] = equipment.type
+        item["is_active"] = equipment.is_active
+        equipments.append(item)
+
+    return {
+        "product_groups": product_groups,
+        "equipments": equipments
+    }
+
+def get_snapshot(db: Session) -> Dict[str, Any]:
+    """
+    현재 스냅샷 반환 (없거나, DB 버전이 바뀌었거나, 만료되었으면 다시 생성)
+    반환값: version, etag, data
+    """
+    global _snapshot
+    version = get_version(db)
+    with _lock:
+        snapshot = _snapshot
+        generation = _generation
+
+    if (snapshot is not None and snapshot["version"] == version
+            and time.monotonic() - snapshot["built_at"] < SNAPSHOT_MAX_AGE):
+        return snapshot
+
+    data = build_hierarchy(db)
+    body = json.dumps(data, ensure_ascii=False, sort_keys=True)
+    snapshot = {
+        "version": version,
+        "etag": '"' + hashlib.sha1(body.encode("utf-8")).hexdigest() + '"',
+        "built_at": time.monotonic(),
+        "data": data
+    }
+
+    with _lock:
+        # 생성 중에 변경이 있었으면 보관하지 않음 (다음 조회 시 다시 생성)
+        if _generation == generation:
+            _snapshot = snapshot
+
+    return snapshot
@@ -0,0 +1,185 @@
+"""
+DICD 측정 관리 시스템 - 가져오기 작업 큐
+업로드 요청은 파일을 디스크에 저장하고 작업을 등록한 뒤 바로 작업 ID를 반환하며,
+실제 가져오기는 MAX_WORKERS개의 작업자 스레드가 등록 순서대로 처리합니다.
+여러 사용자가 동시에 업로드해도 DB에 동시에 쓰는 작업 수는 MAX_WORKERS개를 넘지 않으며,
+같은 타겟의 작업은 SPC 판정 상태와 일별 집계를 순서대로 갱신하도록 한 번에 하나씩 실행합니다.
+
+작업 진행 상황은 import_jobs 테이블에 청크마다 커밋되므로 서버가 재시작되면
+resume_unfinished_jobs()가 완료되지 않은 작업을 처리한 행 다음부터 다시 큐에 넣습니다.
+
+서버 프로세스가 여러 개여도 작업은 한 번만 실행되도록 작업자는 실행 직전에
+조건부 UPDATE로 작업을 선점합니다 (대기 중이거나, 실행 중이지만 CLAIM_TIMEOUT 동안
+진행이 없는 작업만 선점). 실행 중에는 청크를 커밋할 때마다 heartbeat_at을 갱신합니다.
+"""
+
+import asyncio
+import os
+import socket
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, Any, List
+from fastapi import HTTPException
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+
+from ..database import database, models
+from . import bulk_import
+
+# 동시에 실행하는 가져오기 작업 수
+MAX_WORKERS = 2
+
+# 진행(청크 커밋)이 없으면 작업자가 중단된 것으로 보고 다른 작업자가 이어서 실행하는 시간
+CLAIM_TIMEOUT = timedelta(minutes=10)
+
+# 이 서버 프로세스의 작업자 식별자
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="import-job")
+
+# 큐에 있거나 실행 중인 작업 ID (같은 작업이 두 번 실행되지 않도록)
+_lock = threading.Lock()
+_queued = []
+_active = set()
+_futures = {}
+
+# 타겟별 실행 잠금
+_target_locks = defaultdict(threading.Lock)
+
+def submit(job_id: int) -> bool:
+    """
+    작업을 큐에 추가 (이미 큐에 있거나 실행 중이면 False)
+    """
+    with _lock:
+        if job_id in _active:
+            return False
+        _active.add(job_id)
+        _queued.append(job_id)
+        _futures[job_id] = _executor.submit(_run, job_id)
+
+    return True
+
+async def wait(job_id: int):
+    """
+    큐에 추가한 작업이 끝날 때까지 대기 (이벤트 루프를 막지 않음)
+    """
+    with _lock:
+        future = _futures.get(job_id)
+    if future is not None:
+        await asyncio.wrap_future(future)
+
+def _stale_claim():
+    """
+    선점되지 않았거나 CLAIM_TIMEOUT 동안 진행이 없는 실행 중 작업 조건
+    """
+    return and_(
+        models.ImportJob.status == "running",
+        or_(
+            models.ImportJob.heartbeat_at.is_(None),
+            models.ImportJob.heartbeat_at < datetime.now() - CLAIM_TIMEOUT
+        )
+    )
+
+def _claim(db: Session, job_id: int) -> bool:
+    """
+    작업 선점 (다른 작업자가 실행 중이거나 완료된 작업이면 False)
+    """
+    claimed = db.query(models.ImportJob).filter(
+        models.ImportJob.id == job_id,
+        or_(models.ImportJob.status.in_(["pending", "failed"]), _stale_claim())
+    ).update({
+        "status": "running",
+        "worker": WORKER_ID,
+        "heartbeat_at": datetime.now()
+    }, synchronize_session=False)
+    db.commit()
+    return claimed == 1
+
+def _run(job_id: int):
+    """
+    작업자 스레드에서 작업 실행 (요청과 별도의 세션 사용)
+    """
+    with _lock:
+        _queued.remove(job_id)
+
+    db = database.SessionLocal()
+    try:
+        job = db.query(models.ImportJob).filter(models.ImportJob.id == job_id).first()
+        if job is None:
+            return
+        with _lock:
+            target_lock = _target_locks[job.target_id]
+        # 잠금을 기다리는 동안 이전 읽기 스냅샷을 유지하지 않도록 트랜잭션 종료
+        db.commit()
+
+        with target_lock:
+            # 타겟 잠금을 얻은 뒤 선점 (잠금을 기다리는 동안 진행이 없어 다른 작업자가 가져가지 않도록)
+            if not _claim(db, job_id):
+                return
+            bulk_import.run_import_job(db, job_id)
+    except Exception as e:
+        # 작업을 시작하지 못한 경우 (업로드 파일 없음 등) 실패로 기록
+        db.rollback()
+        job = db.query(models.ImportJob).filter(models.ImportJob.id == job_id).first()
+        if job is not None:
+            job.status = "failed"
+            job.error_message = e.detail if isinstance(e, HTTPException) else str(e)
+            db.commit()
+    finally:
+        db.close()
+        with _lock:
+            _active.discard(job_id)
+            _futures.pop(job_id, None)
+
+def get_job_status(db: Session, job_id: int) -> Dict[str, Any]:
+    """
+    작업 진행 상황 (처리한 행 수, 오류 행, 처리량, 대기 순서)
+    """
+    job = db.query(models.ImportJob).filter(models.ImportJob.id == job_id).first()
+    if job is None:
+        raise HTTPException(status_code=404, detail="가져오기 작업을 찾을 수 없습니다")
+
+    result = bulk_import.job_result(job)
+    with _lock:
+        result["queue_position"] = _queued.index(job_id) + 1 if job_id in _queued else None
+
+    return result
+
+def get_recent_jobs(db: Session, limit: int = 20) -> List[Dict[str, Any]]:
+    """
+    최근 작업 목록 (행별 오류 제외)
+    """
+    jobs = db.query(models.ImportJob).order_by(models.ImportJob.id.desc()).limit(limit).all()
+    results = []
+    for job in jobs:
+        result = bulk_import.job_result(job)
+        result.pop("errors")
+        results.append(result)
+    return results
+
+def resume_unfinished_jobs() -> int:
+    """
+    서버 시작 시 완료되지 않은 작업을 다시 큐에 추가, 추가한 작업 수 반환
+    다른 서버 프로세스가 실행 중인 작업(진행이 CLAIM_TIMEOUT 이내)은 제외하며,
+    대기 중인 작업은 여러 작업자가 큐에 넣어도 먼저 선점한 작업자만 실행
+    """
+    db = database.SessionLocal()
+    try:
+        job_ids = [
+            row.id for row in db.query(models.ImportJob.id).filter(
+                or_(models.ImportJob.status == "pending", _stale_claim())
+            ).order_by(models.ImportJob.id).all()
+        ]
+    finally:
+        db.close()
+
+    return sum(1 for job_id in job_ids if submit(job_id))
+
+def shutdown():
+    """
+    서버 종료 시 대기 중인 작업 취소
+    (실행 중인 작업이 중단되어도 재시작 시 마지막으로 커밋한 청크 다음부터 이어서 처리)
+    """
+    _executor.shutdown(wait=False, cancel_futures=True)
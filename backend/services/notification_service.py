@@ -0,0 +1,259 @@
+"""
+DICD 측정 관리 시스템 - SPEC 위반 알림 서비스
+측정 데이터 입력/수정이 커밋된 후 SPEC 위반을 큐에 넣기만 하고 바로 반환하므로
+알림 발송이 입력 요청의 응답 시간에 영향을 주지 않습니다.
+
+백그라운드 스레드가 큐에서 위반을 꺼내 BATCH_INTERVAL초 동안 모은 뒤
+보고서 수신자(report_recipients)의 활성 주소로 한 번에 발송합니다.
+같은 타겟 + LOT의 위반은 DEDUP_WINDOW초 동안 한 번만 알립니다.
+
+발송 방법은 set_sender()로 바꿀 수 있으며 기본값은 로컬 SMTP 서버(LocalSMTPSender)입니다.
+"""
+
+import queue
+import smtplib
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from email.message import EmailMessage
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy.orm import Session
+
+from ..database import database, models
+
+# 위반을 모아서 발송하는 주기(초)
+BATCH_INTERVAL = 10
+
+# 같은 타겟 + LOT의 위반을 다시 알리지 않는 시간(초)
+DEDUP_WINDOW = 30 * 60
+
+# 큐 최대 길이 (가득 차면 새 위반은 버림)
+MAX_QUEUE_SIZE = 10000
+
+# 로컬 SMTP 설정
+SMTP_HOST = "localhost"
+SMTP_PORT = 25
+SENDER_ADDRESS = "dicd-noreply@localhost"
+
+# SPEC 판정 위치
+POINTS = [
+    ("top", "value_top"),
+    ("center", "value_center"),
+    ("bottom", "value_bottom"),
+    ("left", "value_left"),
+    ("right", "value_right")
+]
+
+@dataclass(frozen=True)
+class SpecViolation:
+    measurement_id: Optional[int]
+    target_id: int
+    device: str
+    lot_no: str
+    wafer_no: str
+    lsl: float
+    usl: float
+    out_of_spec: Tuple[Tuple[str, float], ...]  # (위치, 측정값)
+    detected_at: datetime
+
+class LocalSMTPSender:
+    """
+    로컬 SMTP 서버로 메일 발송
+    """
+    def __init__(self, host: str = SMTP_HOST, port: int = SMTP_PORT, sender: str = SENDER_ADDRESS):
+        self.host = host
+        self.port = port
+        self.sender = sender
+
+    def send(self, recipients: List[str], subject: str, body: str):
+        message = EmailMessage()
+        message["From"] = self.sender
+        message["To"] = ", ".join(recipients)
+        message["Subject"] = subject
+        message.set_content(body)
+
+        with smtplib.SMTP(self.host, self.port, timeout=10) as smtp:
+            smtp.send_message(message)
+
+class LogSender:
+    """
+    메일 대신 콘솔에 출력 (개발용)
+    """
+    def send(self, recipients: List[str], subject: str, body: str):
+        print(f"[알림] 수신자: {', '.join(recipients)}\n제목: {subject}\n{body}")
+
+_sender = LocalSMTPSender()
+
+_queue: "queue.Queue[Optional[SpecViolation]]" = queue.Queue(maxsize=MAX_QUEUE_SIZE)
+_worker: Optional[threading.Thread] = None
+_worker_lock = threading.Lock()
+
+# 타겟 + LOT별 마지막 발송 시각 (time.monotonic)
+_last_sent: Dict[Tuple[int, str], float] = {}
+
+def set_sender(sender):
+    """
+    발송 방법 변경 (send(recipients, subject, body) 메서드가 있는 객체)
+    """
+    global _sender
+    _sender = sender
+
+def _ensure_worker():
+    global _worker
+    with _worker_lock:
+        if _worker is None or not _worker.is_alive():
+            _worker = threading.Thread(target=_run, name="spec-violation-notifier", daemon=True)
+            _worker.start()
+
+def enqueue_spec_violation(measurement_id: Optional[int], measurement: Any, spec: Any) -> bool:
+    """
+    측정 데이터(속성: target_id, device, lot_no, wafer_no, value_*)의 SPEC 위반을 큐에 추가
+    위반이 없거나 큐가 가득 차면 False
+    """
+    out_of_spec = tuple(
+        (point, getattr(measurement, column)) for point, column in POINTS
+        if getattr(measurement, column) < spec.lsl or getattr(measurement, column) > spec.usl
+    )
+    if not out_of_spec:
+        return False
+
+    violation = SpecViolation(
+        measurement_id=measurement_id,
+        target_id=measurement.target_id,
+        device=measurement.device,
+        lot_no=measurement.lot_no,
+        wafer_no=measurement.wafer_no,
+        lsl=spec.lsl,
+        usl=spec.usl,
+        out_of_spec=out_of_spec,
+        detected_at=datetime.now()
+    )
+
+    _ensure_worker()
+    try:
+        _queue.put_nowait(violation)
+    except queue.Full:
+        print(f"SPEC 위반 알림 큐가 가득 차 알림을 건너뜁니다: 타겟 {violation.target_id}, LOT {violation.lot_no}")
+        return False
+    return True
+
+def create_spec_violation_notification(db: Session, measurement: models.Measurement, spec: Any) -> bool:
+    """
+    커밋된 측정 데이터의 SPEC 위반 알림 요청 (큐에 추가만 하고 바로 반환)
+    """
+    return enqueue_spec_violation(measurement.id, measurement, spec)
+
+def _run():
+    """
+    큐에서 위반을 꺼내 BATCH_INTERVAL초 단위로 모아서 발송
+    """
+    batch: List[SpecViolation] = []
+    deadline = None
+
+    while True:
+        timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+        try:
+            violation = _queue.get(timeout=timeout)
+        except queue.Empty:
+            violation = False
+
+        if violation is None:
+            # 종료 요청: 모아 둔 위반을 발송하고 종료
+            _deliver(batch)
+            _queue.task_done()
+            return
+
+        if violation:
+            batch.append(violation)
+            _queue.task_done()
+            if deadline is None:
+                deadline = time.monotonic() + BATCH_INTERVAL
+
+        if deadline is not None and time.monotonic() >= deadline:
+            _deliver(batch)
+            batch = []
+            deadline = None
+
+def _load_recipients() -> List[str]:
+    db = database.SessionLocal()
+    try:
+        rows = db.query(models.ReportRecipient.email).filter(
+            models.ReportRecipient.is_active == True
+        ).distinct().all()
+        return sorted(row.email for row in rows)
+    finally:
+        db.close()
+
+def _deliver(batch: List[SpecViolation]):
+    """
+    타겟 + LOT별로 묶고 최근에 알린 LOT은 제외한 뒤 한 번에 발송
+    """
+    now = time.monotonic()
+    groups: Dict[Tuple[int, str], List[SpecViolation]] = {}
+    for violation in batch:
+        key = (violation.target_id, violation.lot_no.lower())
+        last_sent = _last_sent.get(key)
+        if last_sent is not None and now - last_sent < DEDUP_WINDOW:
+            continue
+        groups.setdefault(key, []).append(violation)
+
+    if not groups:
+        return
+
+    try:
+        recipients = _load_recipients()
+        if not recipients:
+            print(f"SPEC 위반 알림 수신자가 없어 {len(groups)}건의 LOT 알림을 건너뜁니다")
+            return
+
+        subject, body = _format_message(groups)
+        _sender.send(recipients, subject, body)
+    except Exception as e:
+        # 발송에 실패한 LOT은 기록하지 않으므로 다음 위반 때 다시 알림
+        print(f"SPEC 위반 알림 발송 실패: {e}")
+        return
+
+    for key in groups:
+        _last_sent[key] = now
+
+    # 만료된 기록 정리
+    for key in [key for key, sent_at in _last_sent.items() if now - sent_at >= DEDUP_WINDOW]:
+        del _last_sent[key]
+
+def _format_message(groups: Dict[Tuple[int, str], List[SpecViolation]]) -> Tuple[str, str]:
+    lots = [violations[0].lot_no for violations in groups.values()]
+    wafer_count = sum(len(violations) for violations in groups.values())
+    subject = f"[DICD] SPEC 위반 {len(lots)}개 LOT ({', '.join(lots[:3])}{' 외' if len(lots) > 3 else ''})"
+
+    lines = [f"SPEC을 벗어난 측정 데이터가 {len(lots)}개 LOT, {wafer_count}개 웨이퍼에서 발견되었습니다.", ""]
+    for violations in groups.values():
+        first = violations[0]
+        lines.append(
+            f"- 타겟 {first.target_id} / DEVICE {first.device} / LOT {first.lot_no} "
+            f"(LSL {first.lsl}, USL {first.usl})"
+        )
+        for violation in violations:
+            points = ", ".join(f"{point} {value}" for point, value in violation.out_of_spec)
+            lines.append(
+                f"    WAFER {violation.wafer_no} (측정 ID {violation.measurement_id}): {points} "
+                f"[{violation.detected_at:%Y-%m-%d %H:%M:%S}]"
+            )
+
+    return subject, "\n".join(lines)
+
+def shutdown(timeout: float = 5.0):
+    """
+    서버 종료 시 모아 둔 위반을 발송하고 작업 스레드 종료
+    """
+    global _worker
+    with _worker_lock:
+        worker = _worker
+        _worker = None
+    if worker is None or not worker.is_alive():
+        return
+    try:
+        _queue.put(None, timeout=timeout)
+    except queue.Full:
+        return
+    worker.join(timeout)
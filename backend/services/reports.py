@@ -1,6 +1,6 @@
 import os
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 import base64
 from io import BytesIO
 from sqlalchemy.orm import Session
@@ -17,52 +17,76 @@ from reportlab.graphics.charts.barcharts import VerticalBarChart
 from reportlab.graphics.charts.piecharts import Pie
 
 from ..database import models
-from . import statistics, spc
+from . import statistics, spc, spec_cache
+from .dataset import load_measurement_dataset
 
-def generate_weekly_report(db: Session, target_id: int, report_date: Optional[datetime] = None) -> BytesIO:
+# 보고서 측정 데이터 표에 필요한 추가 컬럼 (평균값, 측정 일시, LOT NO는 데이터셋 기본 컬럼)
+REPORT_COLUMNS = ("wafer_no", "min_value", "max_value", "range_value", "std_dev")
+
+def weekly_report_period(report_date: datetime) -> Tuple[datetime, datetime]:
+    """
+    보고서 기준일의 지난주 기간 (월요일 00:00:00 ~ 일요일 23:59:59)
+    """
+    monday = report_date.replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=report_date.weekday(), weeks=1)
+    return monday, monday + timedelta(days=6, hours=23, minutes=59, seconds=59)
+
+def get_report_target(db: Session, target_id: int) -> Dict[str, str]:
+    """
+    보고서 제목 / 파일 이름에 사용할 타겟, 공정, 제품군 이름 (한 번의 조인 조회)
+    """
+    row = db.query(
+        models.Target.name,
+        models.Process.name,
+        models.ProductGroup.name
+    ).join(
+        models.Process, models.Process.id == models.Target.process_id
+    ).join(
+        models.ProductGroup, models.ProductGroup.id == models.Process.product_group_id
+    ).filter(models.Target.id == target_id).first()
+
+    if row is None:
+        raise HTTPException(status_code=404, detail="Target not found")
+
+    return {
+        "target": row[0],
+        "process": row[1],
+        "product_group": row[2]
+    }
+
+def _format_value(value) -> str:
+    return f"{value:.3f}" if value is not None else "N/A"
+
+def generate_weekly_report(db: Session, target_id: int, report_date: Optional[datetime] = None,
+                           report_target: Optional[Dict[str, str]] = None) -> BytesIO:
     """
     주간 보고서 생성
+    보고서 기간의 측정 데이터를 한 번만 조회하여 요약 표, 공정 통계, SPC 분석, 추이 차트에 함께 사용
+    report_target: 라우터에서 이미 조회한 get_report_target() 결과 (없으면 조회)
     """
     # 보고서 날짜 설정 (기본: 현재 날짜)
     if report_date is None:
         report_date = datetime.now()
     
     # 주간 날짜 범위 계산 (월요일~일요일 기준)
-    end_date = report_date
-    days_since_monday = report_date.weekday()
-    start_date = report_date - timedelta(days=days_since_monday, weeks=1)
-    end_date = start_date + timedelta(days=6)
+    start_date, end_date = weekly_report_period(report_date)
     
     # 타겟 정보 조회
-    target = db.query(models.Target).filter(models.Target.id == target_id).first()
-    if not target:
-        raise HTTPException(status_code=404, detail="Target not found")
-    
-    process = db.query(models.Process).filter(models.Process.id == target.process_id).first()
-    product_group = db.query(models.ProductGroup).filter(models.ProductGroup.id == process.product_group_id).first()
+    if report_target is None:
+        report_target = get_report_target(db, target_id)
     
     # 활성 SPEC 정보 조회
-    spec = db.query(models.Spec).filter(
-        models.Spec.target_id == target_id,
-        models.Spec.is_active == True
-    ).first()
-    
-    # 측정 데이터 조회
-    measurements = db.query(models.Measurement).filter(
-        models.Measurement.target_id == target_id,
-        models.Measurement.created_at >= start_date,
-        models.Measurement.created_at <= end_date
-    ).order_by(models.Measurement.created_at.asc()).all()
+    spec = spec_cache.get_active_spec(db, target_id)
     
-    # 통계 분석 수행
-    stats_data = statistics.get_process_statistics(
-        db, target_id=target_id, start_date=start_date, end_date=end_date
+    # 측정 데이터 조회 (보고서 기간, 한 번만)
+    dataset = load_measurement_dataset(
+        db, target_id, start_date=start_date, end_date=end_date, extra_columns=REPORT_COLUMNS
     )
     
-    # SPC 분석 수행
-    spc_data = spc.analyze_spc(
-        db, target_id=target_id, days=7
-    )
+    # 통계 분석 수행
+    stats_data = statistics.calculate_dataset_statistics(db, target_id, dataset)
+    
+    # SPC 분석 수행 (보고서 기간과 같은 데이터)
+    spc_data = spc.analyze_spc_dataset(db, target_id, dataset, sections=("control_limits", "patterns"))
     
     # PDF 생성을 위한 버퍼
     buffer = BytesIO()
@@ -87,15 +111,18 @@ def generate_weekly_report(db: Session, target_id: int, report_date: Optional[da
     content = []
     
     # 제목
-    title = Paragraph(f"주간 품질 보고서: {product_group.name} - {process.name} - {target.name}", title_style)
+    title = Paragraph(
+        f"주간 품질 보고서: {report_target['product_group']} - {report_target['process']} - {report_target['target']}",
+        title_style
+    )
     content.append(title)
     content.append(Spacer(1, 0.25*inch))
     
     # 기본 정보
     content.append(Paragraph(f"기간: {start_date.strftime('%Y-%m-%d')} ~ {end_date.strftime('%Y-%m-%d')}", normal_style))
-    content.append(Paragraph(f"제품군: {product_group.name}", normal_style))
-    content.append(Paragraph(f"공정: {process.name}", normal_style))
-    content.append(Paragraph(f"타겟: {target.name}", normal_style))
+    content.append(Paragraph(f"제품군: {report_target['product_group']}", normal_style))
+    content.append(Paragraph(f"공정: {report_target['process']}", normal_style))
+    content.append(Paragraph(f"타겟: {report_target['target']}", normal_style))
     if spec:
         content.append(Paragraph(f"SPEC 범위: LSL={spec.lsl}, USL={spec.usl}", normal_style))
     content.append(Spacer(1, 0.25*inch))
@@ -107,19 +134,19 @@ def generate_weekly_report(db: Session, target_id: int, report_date: Optional[da
     # 측정 데이터 요약
     data = []
     data.append(["항목", "값"])
-    data.append(["측정 횟수", len(measurements)])
+    data.append(["측정 횟수", dataset["count"]])
     if stats_data.get("overall_statistics"):
         overall = stats_data["overall_statistics"]
-        data.append(["평균", f"{overall.get('avg', 'N/A'):.3f}"])
-        data.append(["표준편차", f"{overall.get('std_dev', 'N/A'):.3f}"])
-        data.append(["최소값", f"{overall.get('min', 'N/A'):.3f}"])
-        data.append(["최대값", f"{overall.get('max', 'N/A'):.3f}"])
-        data.append(["범위", f"{overall.get('range', 'N/A'):.3f}"])
+        data.append(["평균", _format_value(overall.get('avg'))])
+        data.append(["표준편차", _format_value(overall.get('std_dev'))])
+        data.append(["최소값", _format_value(overall.get('min'))])
+        data.append(["최대값", _format_value(overall.get('max'))])
+        data.append(["범위", _format_value(overall.get('range'))])
     
     if stats_data.get("process_capability"):
         pc = stats_data["process_capability"]
-        data.append(["Cp", f"{pc.get('cp', 'N/A'):.3f}"])
-        data.append(["Cpk", f"{pc.get('cpk', 'N/A'):.3f}"])
+        data.append(["Cp", _format_value(pc.get('cp'))])
+        data.append(["Cpk", _format_value(pc.get('cpk'))])
     
     # 요약 테이블 생성
     summary_table = Table(data, colWidths=[2*inch, 1.5*inch])
@@ -143,7 +170,10 @@ def generate_weekly_report(db: Session, target_id: int, report_date: Optional[da
     
     if spc_data.get("control_limits"):
         cl = spc_data["control_limits"]
-        content.append(Paragraph(f"관리 한계: CL={cl.get('cl', 'N/A'):.3f}, UCL={cl.get('ucl', 'N/A'):.3f}, LCL={cl.get('lcl', 'N/A'):.3f}", normal_style))
+        content.append(Paragraph(
+            f"관리 한계: CL={_format_value(cl.get('cl'))}, UCL={_format_value(cl.get('ucl'))}, LCL={_format_value(cl.get('lcl'))}",
+            normal_style
+        ))
     
     # SPC 패턴 감지 결과
     if spc_data.get("patterns") and len(spc_data["patterns"]) > 0:
@@ -162,22 +192,25 @@ def generate_weekly_report(db: Session, target_id: int, report_date: Optional[da
     content.append(Paragraph("측정 데이터", heading2_style))
     content.append(Spacer(1, 0.1*inch))
     
-    if measurements:
+    if dataset["count"] > 0:
         # 테이블 헤더
         table_data = [["날짜", "LOT NO", "WAFER NO", "평균", "최소", "최대", "범위", "표준편차"]]
         
         # 테이블 데이터
-        for m in measurements:
-            date_str = m.created_at.strftime("%Y-%m-%d")
+        rows = zip(
+            dataset["dates"], dataset["lot_nos"], dataset["wafer_no"], dataset["series"]["avg"].tolist(),
+            dataset["min_value"], dataset["max_value"], dataset["range_value"], dataset["std_dev"]
+        )
+        for created_at, lot_no, wafer_no, avg_value, min_value, max_value, range_value, std_dev in rows:
             table_data.append([
-                date_str,
-                m.lot_no,
-                m.wafer_no,
-                f"{m.avg_value:.3f}",
-                f"{m.min_value:.3f}",
-                f"{m.max_value:.3f}",
-                f"{m.range_value:.3f}",
-                f"{m.std_dev:.3f}"
+                created_at.strftime("%Y-%m-%d"),
+                lot_no,
+                wafer_no,
+                f"{avg_value:.3f}",
+                f"{min_value:.3f}",
+                f"{max_value:.3f}",
+                f"{range_value:.3f}",
+                f"{std_dev:.3f}"
             ])
         
         # 테이블 생성
@@ -224,8 +257,8 @@ def generate_weekly_report(db: Session, target_id: int, report_date: Optional[da
         chart.categoryAxis.labels.angle = 30
         chart.categoryAxis.labels.fontSize = 6
         
-        # 관리 한계선 추가
-        if spc_data.get("control_limits"):
+        # 관리 한계선 추가 (샘플이 2개 미만이면 계산되지 않음)
+        if spc_data.get("control_limits") and spc_data["control_limits"].get("cl") is not None:
             cl = spc_data["control_limits"].get("cl", 0)
             ucl = spc_data["control_limits"].get("ucl", 0)
             lcl = spc_data["control_limits"].get("lcl", 0)
@@ -0,0 +1,89 @@
+"""
+DICD 측정 관리 시스템 - 분석 결과 응답 형식
+SPC / 분포 / 공정 통계 분석 결과를 요청한 형식으로 직렬화합니다.
+
+- JSON (기본): orjson으로 직렬화 (NumPy 값도 그대로 처리하며 무한대/NaN은 null)
+- MessagePack: Accept 헤더에 application/msgpack (또는 application/x-msgpack)을 지정하거나 format=msgpack
+  원시 측정값 시계열(PACKED_KEYS 키의 실수 배열, 길이 MIN_PACKED_LENGTH 이상)은 float32 little-endian 바이트를 담은
+  확장 타입 FLOAT32_ARRAY_EXT로 보냅니다. 측정값 컬럼(FLOAT)이 원래 단정밀도이므로 정밀도 손실은 없습니다.
+  히스토그램 / 정규분포 곡선 / 통계값처럼 계산된 배열은 배정밀도 그대로 일반 배열로 보냅니다.
+  (JavaScript: new Float32Array(data.buffer, data.byteOffset, data.byteLength / 4))
+
+응답 압축(gzip)은 main.py의 GZipMiddleware가 Accept-Encoding에 따라 처리합니다.
+"""
+
+from typing import Any, Dict, Optional
+import msgpack
+import numpy as np
+import orjson
+from fastapi import Request, Response
+
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+MSGPACK_MEDIA_TYPES = (MSGPACK_MEDIA_TYPE, "application/x-msgpack")
+
+# float32 배열 확장 타입 번호
+FLOAT32_ARRAY_EXT = 1
+
+# 이보다 짧은 실수 배열은 일반 배열로 보냄
+MIN_PACKED_LENGTH = 8
+
+# float32로 보내는 원시 측정값 시계열의 키 (SPC data.values / position_data, 분포 values)
+PACKED_KEYS = frozenset({"values", "top", "center", "bottom", "left", "right"})
+
+ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+def wants_msgpack(request: Request, format: Optional[str] = None) -> bool:
+    """
+    MessagePack 응답 요청 여부 (format 파라미터가 Accept 헤더보다 우선)
+    """
+    if format:
+        return format == "msgpack"
+    accept = request.headers.get("accept", "")
+    media_types = [part.split(";")[0].strip().lower() for part in accept.split(",")]
+    return any(media_type in MSGPACK_MEDIA_TYPES for media_type in media_types)
+
+def _is_float_array(values: list) -> bool:
+    return len(values) >= MIN_PACKED_LENGTH and all(type(value) is float for value in values)
+
+def _pack_arrays(obj: Any, key: Optional[str] = None) -> Any:
+    """
+    PACKED_KEYS 키의 원시 측정값 배열을 float32 확장 타입으로 바꾼 사본 (원본은 캐시와 공유되므로 수정하지 않음)
+    """
+    if isinstance(obj, dict):
+        return {item_key: _pack_arrays(value, item_key) for item_key, value in obj.items()}
+    packed = key in PACKED_KEYS
+    if isinstance(obj, (list, tuple)):
+        if packed and _is_float_array(obj):
+            return msgpack.ExtType(FLOAT32_ARRAY_EXT, np.asarray(obj, dtype="<f4").tobytes())
+        return [_pack_arrays(value) for value in obj]
+    if isinstance(obj, np.ndarray):
+        if packed and obj.dtype.kind == "f" and obj.ndim == 1 and len(obj) >= MIN_PACKED_LENGTH:
+            return msgpack.ExtType(FLOAT32_ARRAY_EXT, obj.astype("<f4").tobytes())
+        return _pack_arrays(obj.tolist())
+    return obj
+
+def _msgpack_default(obj: Any) -> Any:
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if hasattr(obj, "isoformat"):
+        return obj.isoformat()
+    raise TypeError(f"MessagePack으로 직렬화할 수 없는 타입: {type(obj).__name__}")
+
+def encode_msgpack(result: Any) -> bytes:
+    return msgpack.packb(_pack_arrays(result), default=_msgpack_default, use_bin_type=True)
+
+def encode_json(result: Any) -> bytes:
+    return orjson.dumps(result, option=ORJSON_OPTIONS)
+
+def render(request: Request, result: Any, format: Optional[str] = None,
+           headers: Optional[Dict[str, str]] = None) -> Response:
+    """
+    요청한 형식(JSON / MessagePack)으로 분석 결과 응답 생성
+    """
+    headers = dict(headers or {})
+    # 같은 URL이라도 Accept 헤더에 따라 형식이 다름
+    headers["Vary"] = "Accept"
+
+    if wants_msgpack(request, format):
+        return Response(content=encode_msgpack(result), media_type=MSGPACK_MEDIA_TYPE, headers=headers)
+    return Response(content=encode_json(result), media_type="application/json", headers=headers)
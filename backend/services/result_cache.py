@@ -0,0 +1,217 @@
+"""
+DICD 측정 관리 시스템 - 분석 결과 캐시
+SPC 분석, 분포 분석, 공정 통계 결과를 프로세스 내에 보관하여 대시보드 모니터링 차트처럼
+같은 타겟/기간을 여러 사용자가 반복해서 조회할 때 측정 데이터를 다시 읽고 계산하지 않도록 합니다.
+
+캐시 키는 (분석 종류, 타겟, 기간, 파라미터, 워터마크)입니다.
+워터마크는 조회 기간 내 측정 데이터의 개수 / 최소 ID / 최대 ID / 최대 입력 시각 / 최대 수정 시각과 활성 SPEC,
+타겟의 데이터 버전으로, 인덱스 범위 하나를 집계하는 쿼리와 버전 조회로 구합니다. 다른 워커 프로세스에서
+입력/수정/삭제되거나 최근 N일 기간에서 오래된 데이터가 빠지면 워터마크가 달라지므로 이전 결과는 더 이상 사용되지 않습니다.
+수정은 개수와 ID 범위를 바꾸지 않고 수정 시각은 초 단위이므로, 같은 초 안의 두 번째 수정도 구분되도록
+crud의 수정/삭제는 cache_versions 테이블의 타겟별 데이터 버전(bump_data_version)을 올립니다.
+
+같은 프로세스의 쓰기(crud)는 invalidate()로 해당 타겟의 결과를 바로 지우고,
+나머지는 최대 MAX_ENTRIES개를 넘으면 가장 오래 사용하지 않은 결과부터(LRU), TTL초가 지나면 제거합니다.
+
+같은 키의 계산이 이미 진행 중이면 새로 계산하지 않고 그 결과를 기다려 함께 사용합니다(single-flight).
+교대 시간에 여러 화면이 동시에 대시보드를 열어도 같은 분석은 한 번만 계산됩니다.
+
+반환되는 결과는 캐시와 공유되므로 호출한 쪽에서 수정하지 않습니다.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..database import models
+from . import spec_cache
+
+# 최대 보관 결과 수
+MAX_ENTRIES = 256
+
+# 결과 유효 시간(초)
+TTL = 300
+
+# 진행 중인 같은 계산을 기다리는 최대 시간(초), 넘으면 직접 계산
+COALESCE_TIMEOUT = 30
+
+_lock = threading.Lock()
+_entries: "OrderedDict[Tuple, Tuple[float, Any]]" = OrderedDict()  # 키 -> (저장 시각, 결과)
+_hits = 0
+_misses = 0
+_coalesced = 0
+
+class _InFlight:
+    """
+    진행 중인 계산 (완료되면 결과 또는 예외를 기다리던 요청과 공유)
+    """
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+_in_flight: Dict[Tuple, _InFlight] = {}
+
+def window_key(start_date: Optional[datetime], end_date: Optional[datetime], now: datetime) -> Tuple:
+    """
+    조회 기간 키
+    종료일이 없는 최근 N일 기간은 요청마다 시작 시각이 조금씩 달라지므로 기간 길이(초)로 구분
+    (기간에 포함된 데이터가 바뀌면 워터마크가 달라짐)
+    """
+    if end_date is None:
+        if start_date is None:
+            return ("all",)
+        return ("recent", round((now - start_date).total_seconds()))
+    return ("range", start_date, end_date)
+
+def _data_version_name(target_id: int) -> str:
+    return f"measurements:{target_id}"
+
+def get_data_version(db: Session, target_id: int) -> int:
+    """
+    타겟의 측정 데이터 버전 (수정, 삭제 시 증가)
+    """
+    row = db.query(models.CacheVersion.version).filter(
+        models.CacheVersion.name == _data_version_name(target_id)
+    ).first()
+    return row.version if row else 0
+
+def bump_data_version(db: Session, *target_ids: int):
+    """
+    측정 데이터 수정/삭제를 워터마크에 반영하기 위해 타겟의 데이터 버전 증가
+    커밋은 호출한 쪽의 트랜잭션에서 수행
+    """
+    for target_id in sorted(set(target_ids)):
+        name = _data_version_name(target_id)
+        query = db.query(models.CacheVersion).filter(models.CacheVersion.name == name)
+        if query.update({"version": models.CacheVersion.version + 1}, synchronize_session=False):
+            continue
+        try:
+            with db.begin_nested():
+                db.add(models.CacheVersion(name=name, version=1))
+        except IntegrityError:
+            # 동시에 같은 타겟의 버전이 추가된 경우
+            query.update({"version": models.CacheVersion.version + 1}, synchronize_session=False)
+
+def get_watermark(db: Session, target_id: int, start_date: Optional[datetime] = None,
+                  end_date: Optional[datetime] = None) -> Tuple:
+    """
+    조회 기간 내 측정 데이터와 활성 SPEC, 데이터 버전의 워터마크 (ix_measurements_target_created 인덱스 범위 집계)
+    """
+    query = db.query(
+        func.count(models.Measurement.id),
+        func.min(models.Measurement.id),
+        func.max(models.Measurement.id),
+        func.max(models.Measurement.created_at),
+        func.max(models.Measurement.updated_at)
+    ).filter(models.Measurement.target_id == target_id)
+
+    if start_date:
+        query = query.filter(models.Measurement.created_at >= start_date)
+    if end_date:
+        query = query.filter(models.Measurement.created_at <= end_date)
+
+    count, min_id, max_id, created_at, updated_at = query.one()
+
+    spec = spec_cache.get_active_spec(db, target_id)
+    spec_key = (spec.id, spec.lsl, spec.usl) if spec else None
+
+    return (count, min_id, max_id, created_at, updated_at, spec_key, get_data_version(db, target_id))
+
+def _evict_expired(now: float):
+    """
+    만료된 결과 제거 (_lock을 잡은 상태에서 호출)
+    """
+    for key in [key for key, (stored_at, _) in _entries.items() if now - stored_at >= TTL]:
+        del _entries[key]
+
+def get_or_compute(
+    name: str,
+    target_id: int,
+    window: Tuple,
+    params: Tuple[Hashable, ...],
+    watermark: Tuple,
+    compute: Callable[[], Any]
+) -> Any:
+    """
+    캐시된 결과가 있으면 반환하고, 같은 키를 계산 중인 요청이 있으면 그 결과를 기다리고,
+    둘 다 없으면 compute()로 계산하여 저장
+    """
+    global _hits, _misses, _coalesced
+    key = (name, target_id, window, params, watermark)
+    now = time.monotonic()
+
+    with _lock:
+        entry = _entries.get(key)
+        if entry is not None and now - entry[0] < TTL:
+            # 최근 사용 순서 갱신 (LRU)
+            _entries.move_to_end(key)
+            _hits += 1
+            return entry[1]
+
+        flight = _in_flight.get(key)
+        if flight is None:
+            _misses += 1
+            flight = _in_flight[key] = _InFlight()
+            leader = True
+        else:
+            _coalesced += 1
+            leader = False
+
+    if not leader:
+        if flight.done.wait(COALESCE_TIMEOUT):
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+        # 먼저 시작한 계산이 끝나지 않으면 직접 계산 (결과는 저장하지 않음)
+        return compute()
+
+    try:
+        flight.result = compute()
+    except BaseException as e:
+        flight.error = e
+        raise
+    finally:
+        with _lock:
+            del _in_flight[key]
+            if flight.error is None:
+                now = time.monotonic()
+                _entries.pop(key, None)
+                _entries[key] = (now, flight.result)
+                _evict_expired(now)
+                while len(_entries) > MAX_ENTRIES:
+                    _entries.popitem(last=False)
+        flight.done.set()
+
+    return flight.result
+
+def invalidate(*target_ids: int):
+    """
+    해당 타겟의 결과 삭제 (타겟을 지정하지 않으면 전체 삭제)
+    """
+    with _lock:
+        if not target_ids:
+            _entries.clear()
+            return
+        targets = set(target_ids)
+        for key in [key for key in _entries if key[1] in targets]:
+            del _entries[key]
+
+def get_stats() -> Dict[str, int]:
+    """
+    캐시 사용 현황
+    hits: 저장된 결과 사용, misses: 새로 계산, coalesced: 진행 중인 같은 계산의 결과를 기다려 사용
+    """
+    with _lock:
+        return {
+            "entries": len(_entries),
+            "in_flight": len(_in_flight),
+            "hits": _hits,
+            "misses": _misses,
+            "coalesced": _coalesced
+        }
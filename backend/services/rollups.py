@@ -0,0 +1,378 @@
+"""
+DICD 측정 관리 시스템 - 일별 집계 서비스
+타겟별/일자별로 평균값과 위치별 값의 개수, 합계, 제곱합, 최소, 최대를 measurement_daily_rollups 테이블에 유지합니다.
+
+측정 데이터 입력 시에는 해당 일자의 집계에 값을 더하고(O(1)), 수정/삭제/일괄 업로드 시에는 영향받은 일자를
+측정 데이터로부터 다시 집계합니다. 기간 통계는 하루 단위로 완전히 포함되는 일자는 집계를 합산하고,
+기간 경계에 걸친 일부 일자만 측정 데이터에서 직접 집계합니다.
+
+기존 데이터에 대해서는 backend/utils/backfill_rollups.py를 한 번 실행해야 합니다.
+전체 기간을 다시 집계한 타겟(백필)과 집계 도입 후 생성된 타겟은 cache_versions에 rollups:{타겟 ID} 행으로
+집계 완료를 기록하며, 공정 통계(statistics.get_process_statistics)는 완료된 타겟의 일 단위 기간만 집계로 계산합니다.
+"""
+
+import math
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+from sqlalchemy import func
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..database import models
+from .dataset import SERIES, SERIES_COLUMNS
+
+Rollup = models.MeasurementDailyRollup
+
+# 하루의 마지막 시각으로 취급하는 기준 (라우터의 종료일 처리와 동일하게 23:59:59)
+END_OF_DAY = time(23, 59, 59)
+
+# 집계 완료 기록의 cache_versions 이름 접두사
+COVERAGE_PREFIX = "rollups:"
+
+def _to_date(value) -> date:
+    """
+    DATE() 결과 또는 일시 값을 date로 변환 (SQLite는 문자열로 반환)
+    """
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(str(value)[:10], "%Y-%m-%d").date()
+
+def _day_start(day: date) -> datetime:
+    return datetime.combine(day, time.min)
+
+def is_day_aligned(start_date: Optional[datetime] = None, end_date: Optional[datetime] = None) -> bool:
+    """
+    기간이 일 단위로 정렬되어 있는지 여부 (시작이 없거나 자정, 종료가 없거나 23:59:59 이후)
+    정렬된 기간은 측정 데이터를 조회하지 않고 일별 집계만으로 계산 가능
+    """
+    if start_date and start_date.time() != time.min:
+        return False
+    if end_date and end_date.time() < END_OF_DAY:
+        return False
+    return True
+
+def _coverage_name(target_id: int) -> str:
+    return f"{COVERAGE_PREFIX}{target_id}"
+
+def is_covered(db: Session, target_id: int) -> bool:
+    """
+    타겟의 전체 기간 집계가 채워져 있는지 여부 (백필 전 데이터가 있는 타겟은 False)
+    """
+    return db.query(models.CacheVersion.name).filter(
+        models.CacheVersion.name == _coverage_name(target_id)
+    ).first() is not None
+
+def mark_covered(db: Session, target_id: int):
+    """
+    타겟의 전체 기간 집계 완료를 기록 (이후 입력/수정/삭제는 집계에 바로 반영됨)
+    커밋은 호출한 쪽의 트랜잭션에서 수행
+    """
+    if is_covered(db, target_id):
+        return
+    try:
+        with db.begin_nested():
+            db.add(models.CacheVersion(name=_coverage_name(target_id), version=1))
+    except IntegrityError:
+        # 동시에 같은 타겟의 완료가 기록된 경우
+        pass
+
+def clear_coverage(db: Session, target_id: Optional[int] = None):
+    """
+    집계 완료 기록 삭제 (타겟을 지정하지 않으면 전체, 타겟 ID가 다시 사용되어도 잘못 판단하지 않도록)
+    """
+    query = db.query(models.CacheVersion)
+    if target_id is None:
+        query = query.filter(models.CacheVersion.name.like(f"{COVERAGE_PREFIX}%"))
+    else:
+        query = query.filter(models.CacheVersion.name == _coverage_name(target_id))
+    query.delete(synchronize_session=False)
+
+def empty_sums() -> Dict[str, Any]:
+    return {
+        "count": 0,
+        "series": {name: {"sum": 0.0, "sumsq": 0.0, "min": None, "max": None} for name in SERIES}
+    }
+
+def _add_series(target: Dict[str, Any], total: float, total_sq: float, min_val, max_val):
+    target["sum"] += float(total or 0)
+    target["sumsq"] += float(total_sq or 0)
+    if min_val is not None:
+        target["min"] = float(min_val) if target["min"] is None else min(target["min"], float(min_val))
+    if max_val is not None:
+        target["max"] = float(max_val) if target["max"] is None else max(target["max"], float(max_val))
+
+def _add_row(sums: Dict[str, Any], row: Tuple, offset: int = 0):
+    """
+    _sum_aggregates 순서의 집계 결과 한 행을 sums에 더함
+    """
+    count = int(row[offset] or 0)
+    if count == 0:
+        return
+    sums["count"] += count
+    for i, name in enumerate(SERIES):
+        start = offset + 1 + i * 4
+        _add_series(sums["series"][name], *row[start:start + 4])
+
+def _sum_aggregates() -> List:
+    """
+    측정 데이터에 대한 개수와 시계열별 합계/제곱합/최소/최대 집계 컬럼
+    """
+    aggregates = [func.count(models.Measurement.id)]
+    for name in SERIES:
+        column = SERIES_COLUMNS[name]
+        aggregates.extend([
+            func.sum(column),
+            func.sum(column * column),
+            func.min(column),
+            func.max(column)
+        ])
+    return aggregates
+
+def _rollup_aggregates() -> List:
+    """
+    일별 집계를 합산하는 집계 컬럼 (_sum_aggregates와 같은 순서)
+    """
+    aggregates = [func.sum(Rollup.sample_count)]
+    for name in SERIES:
+        aggregates.extend([
+            func.sum(getattr(Rollup, f"{name}_sum")),
+            func.sum(getattr(Rollup, f"{name}_sumsq")),
+            func.min(getattr(Rollup, f"{name}_min")),
+            func.max(getattr(Rollup, f"{name}_max"))
+        ])
+    return aggregates
+
+def _new_rollup(target_id: int, day: date) -> models.MeasurementDailyRollup:
+    rollup = Rollup(target_id=target_id, day=day, sample_count=0)
+    for name in SERIES:
+        setattr(rollup, f"{name}_sum", 0.0)
+        setattr(rollup, f"{name}_sumsq", 0.0)
+        setattr(rollup, f"{name}_min", None)
+        setattr(rollup, f"{name}_max", None)
+    return rollup
+
+def _upsert_measurement(db: Session, target_id: int, day: date, values: Dict[str, float]):
+    """
+    INSERT ... ON DUPLICATE KEY UPDATE로 일자 집계에 값을 더함 (MySQL)
+    없는 (타겟, 일자) 행은 FOR UPDATE로 잠기지 않아 동시에 처음 입력하면 둘 다 추가를 시도하므로
+    행 추가와 누적을 하나의 문장으로 처리
+    """
+    row = {"target_id": target_id, "day": day, "sample_count": 1}
+    for name, value in values.items():
+        row[f"{name}_sum"] = value
+        row[f"{name}_sumsq"] = value * value
+        row[f"{name}_min"] = value
+        row[f"{name}_max"] = value
+
+    statement = mysql_insert(Rollup).values(**row)
+    inserted = statement.inserted
+
+    updates = {"sample_count": Rollup.sample_count + 1}
+    for name in SERIES:
+        for key in (f"{name}_sum", f"{name}_sumsq"):
+            updates[key] = getattr(Rollup, key) + inserted[key]
+        min_key, max_key = f"{name}_min", f"{name}_max"
+        updates[min_key] = func.least(func.coalesce(getattr(Rollup, min_key), inserted[min_key]), inserted[min_key])
+        updates[max_key] = func.greatest(func.coalesce(getattr(Rollup, max_key), inserted[max_key]), inserted[max_key])
+    updates["updated_at"] = func.now()
+
+    db.execute(statement.on_duplicate_key_update(updates))
+
+def add_measurement(db: Session, measurement: models.Measurement):
+    """
+    새 측정 데이터 하나를 해당 일자의 집계에 더함
+    measurement.created_at이 로드되어 있어야 함 (flush 후 refresh)
+    커밋은 호출한 쪽의 트랜잭션에서 수행
+    """
+    day = _to_date(measurement.created_at)
+    values = {name: float(getattr(measurement, SERIES_COLUMNS[name].key)) for name in SERIES}
+
+    if db.get_bind().dialect.name == "mysql":
+        _upsert_measurement(db, measurement.target_id, day, values)
+        return
+
+    # 그 밖의 DB는 행 잠금 후 갱신
+    rollup = db.query(Rollup).filter(
+        Rollup.target_id == measurement.target_id,
+        Rollup.day == day
+    ).with_for_update().first()
+
+    if rollup is None:
+        rollup = _new_rollup(measurement.target_id, day)
+        db.add(rollup)
+
+    rollup.sample_count += 1
+    for name, value in values.items():
+        setattr(rollup, f"{name}_sum", getattr(rollup, f"{name}_sum") + value)
+        setattr(rollup, f"{name}_sumsq", getattr(rollup, f"{name}_sumsq") + value * value)
+
+        min_val = getattr(rollup, f"{name}_min")
+        max_val = getattr(rollup, f"{name}_max")
+        setattr(rollup, f"{name}_min", value if min_val is None else min(min_val, value))
+        setattr(rollup, f"{name}_max", value if max_val is None else max(max_val, value))
+
+def rebuild_daily_rollups(db: Session, target_id: int, start_day: Optional[date] = None,
+                          end_day: Optional[date] = None) -> int:
+    """
+    타겟의 지정 일자 범위(양 끝 포함) 집계를 측정 데이터로부터 다시 계산하고 갱신한 일자 수 반환
+    범위를 지정하지 않으면 전체 기간을 다시 계산하고 집계 완료를 기록
+    측정 데이터 변경 사항은 미리 flush되어 있어야 함 (세션의 autoflush가 꺼져 있음)
+    """
+    if start_day is None and end_day is None:
+        mark_covered(db, target_id)
+
+    day_column = func.date(models.Measurement.created_at)
+
+    query = db.query(day_column, *_sum_aggregates()).filter(
+        models.Measurement.target_id == target_id
+    )
+    if start_day:
+        query = query.filter(models.Measurement.created_at >= _day_start(start_day))
+    if end_day:
+        query = query.filter(models.Measurement.created_at < _day_start(end_day + timedelta(days=1)))
+
+    computed = {}
+    for row in query.group_by(day_column).all():
+        sums = empty_sums()
+        _add_row(sums, row, offset=1)
+        computed[_to_date(row[0])] = sums
+
+    # 기존 집계 행은 갱신하고, 데이터가 없어진 일자는 삭제
+    rollup_query = db.query(Rollup).filter(Rollup.target_id == target_id)
+    if start_day:
+        rollup_query = rollup_query.filter(Rollup.day >= start_day)
+    if end_day:
+        rollup_query = rollup_query.filter(Rollup.day <= end_day)
+    existing = {rollup.day: rollup for rollup in rollup_query.with_for_update().all()}
+
+    for day, rollup in existing.items():
+        if day not in computed:
+            db.delete(rollup)
+
+    for day, sums in computed.items():
+        rollup = existing.get(day)
+        if rollup is None:
+            rollup = _new_rollup(target_id, day)
+            db.add(rollup)
+
+        rollup.sample_count = sums["count"]
+        for name in SERIES:
+            series = sums["series"][name]
+            setattr(rollup, f"{name}_sum", series["sum"])
+            setattr(rollup, f"{name}_sumsq", series["sumsq"])
+            setattr(rollup, f"{name}_min", series["min"])
+            setattr(rollup, f"{name}_max", series["max"])
+
+    return len(computed) + sum(1 for day in existing if day not in computed)
+
+def rebuild_for_days(db: Session, target_id: int, days: Iterable) -> int:
+    """
+    수정/삭제된 측정 데이터가 속한 일자들의 집계를 다시 계산
+    """
+    days = sorted({_to_date(day) for day in days if day is not None})
+    if not days:
+        return 0
+    return rebuild_daily_rollups(db, target_id, start_day=days[0], end_day=days[-1])
+
+def rebuild_for_measurements(db: Session, target_id: int, measurement_ids: List[int]) -> int:
+    """
+    새로 추가된(flush된) 측정 데이터가 속한 일자들의 집계를 다시 계산 (일괄 업로드용)
+    """
+    if not measurement_ids:
+        return 0
+
+    first_created, last_created = db.query(
+        func.min(models.Measurement.created_at),
+        func.max(models.Measurement.created_at)
+    ).filter(
+        models.Measurement.target_id == target_id,
+        models.Measurement.id.between(min(measurement_ids), max(measurement_ids))
+    ).first()
+
+    return rebuild_for_days(db, target_id, [first_created, last_created])
+
+def _measurement_sums(db: Session, target_id: int, start: Optional[datetime], end: Optional[datetime],
+                      end_inclusive: bool, sums: Dict[str, Any]):
+    """
+    측정 데이터에서 직접 집계하여 sums에 더함 (기간 경계의 일부 일자용)
+    """
+    query = db.query(*_sum_aggregates()).filter(models.Measurement.target_id == target_id)
+    if start:
+        query = query.filter(models.Measurement.created_at >= start)
+    if end:
+        if end_inclusive:
+            query = query.filter(models.Measurement.created_at <= end)
+        else:
+            query = query.filter(models.Measurement.created_at < end)
+    _add_row(sums, query.first())
+
+def get_window_sums(db: Session, target_id: int, start_date: Optional[datetime] = None,
+                    end_date: Optional[datetime] = None) -> Dict[str, Any]:
+    """
+    기간(created_at >= start_date, created_at <= end_date) 내 측정 데이터의 개수와 시계열별 합계/제곱합/최소/최대
+    하루 전체가 포함되는 일자는 일별 집계를 합산하고, 경계에 걸친 일자만 측정 데이터에서 집계
+    """
+    sums = empty_sums()
+
+    # 집계로 처리할 수 있는 첫 일자와 마지막 일자
+    first_day = None
+    if start_date:
+        first_day = start_date.date() if start_date.time() == time.min else start_date.date() + timedelta(days=1)
+    last_day = None
+    if end_date:
+        last_day = end_date.date() if end_date.time() >= END_OF_DAY else end_date.date() - timedelta(days=1)
+
+    if first_day and last_day and first_day > last_day:
+        # 하루 안의 기간은 측정 데이터에서 직접 집계
+        _measurement_sums(db, target_id, start_date, end_date, True, sums)
+        return sums
+
+    # 시작 경계 일부 일자
+    if first_day and start_date < _day_start(first_day):
+        _measurement_sums(db, target_id, start_date, _day_start(first_day), False, sums)
+
+    # 하루 전체가 포함되는 일자
+    query = db.query(*_rollup_aggregates()).filter(Rollup.target_id == target_id)
+    if first_day:
+        query = query.filter(Rollup.day >= first_day)
+    if last_day:
+        query = query.filter(Rollup.day <= last_day)
+    _add_row(sums, query.first())
+
+    # 종료 경계 일부 일자
+    if last_day and end_date >= _day_start(last_day + timedelta(days=1)):
+        _measurement_sums(db, target_id, _day_start(last_day + timedelta(days=1)), end_date, True, sums)
+
+    return sums
+
+def sums_to_moments(sums: Dict[str, Any]) -> Dict[str, Optional[Dict[str, float]]]:
+    """
+    합계/제곱합으로부터 시계열별 평균, 표본 표준편차, 최소, 최대 계산 (데이터가 없으면 None)
+    """
+    count = sums["count"]
+    moments = {}
+
+    for name in SERIES:
+        series = sums["series"][name]
+        if count == 0:
+            moments[name] = None
+            continue
+
+        avg = series["sum"] / count
+        std_dev = 0.0
+        if count > 1:
+            # 부동소수점 오차로 음수가 되는 경우 방지
+            variance = max((series["sumsq"] - series["sum"] * avg) / (count - 1), 0.0)
+            std_dev = math.sqrt(variance)
+
+        moments[name] = {
+            "avg": avg,
+            "std_dev": std_dev,
+            "min": series["min"],
+            "max": series["max"]
+        }
+
+    return moments
@@ -0,0 +1,174 @@
+"""
+DICD 측정 관리 시스템 - 검색 색인 서비스
+DEVICE / LOT NO / WAFER NO의 고유 값을 검색어 사전(search_terms)에 저장하고
+각 값의 소문자 트라이그램을 search_term_grams에 색인합니다.
+
+부분 문자열 검색은 측정 데이터 대신 검색어 사전에서 일치하는 값을 먼저 찾고(트라이그램 교집합 후 LIKE로 확인),
+찾은 값 목록으로 측정 데이터를 인덱스 조회합니다. 고유 값의 수는 측정 데이터보다 훨씬 적으므로
+측정 데이터가 많아져도 검색 비용이 거의 늘지 않습니다.
+
+측정 데이터가 수정/삭제되어 더 이상 쓰이지 않는 값은 사전에 남지만 검색 결과에는 영향이 없습니다.
+기존 데이터는 backend/utils/backfill_search_index.py로 색인합니다.
+"""
+
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from sqlalchemy import func, exists, and_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..database import models
+
+# 색인 대상 컬럼
+SEARCH_FIELDS = ("device", "lot_no", "wafer_no")
+
+GRAM_SIZE = 3
+
+# 검색어가 일치하는 값이 이보다 많으면 더 이상 좁혀지지 않으므로 목록 대신 원래 조건(LIKE) 사용
+MAX_MATCHED_VALUES = 2000
+
+def make_grams(value: str) -> Set[str]:
+    """
+    소문자 트라이그램 집합 (3글자 미만이면 빈 집합)
+    """
+    value = (value or "").lower()
+    return {value[i:i + GRAM_SIZE] for i in range(len(value) - GRAM_SIZE + 1)}
+
+# LIKE 이스케이프 문자 (MySQL 문자열의 역슬래시 처리와 겹치지 않도록 '/' 사용)
+LIKE_ESCAPE = "/"
+
+def _escape_like(text: str) -> str:
+    return text.replace("/", "//").replace("%", "/%").replace("_", "/_")
+
+def _new_term(field: str, value: str) -> models.SearchTerm:
+    term = models.SearchTerm(field=field, value=value)
+    term.grams = [models.SearchTermGram(gram=gram) for gram in sorted(make_grams(value))]
+    return term
+
+def index_values(db: Session, values: Iterable[Tuple[str, str]]) -> int:
+    """
+    (컬럼, 값) 목록 중 사전에 없는 값을 추가하고 트라이그램 색인 생성, 추가된 값 수 반환
+    커밋은 호출한 쪽의 트랜잭션에서 수행
+    """
+    by_field: Dict[str, Set[str]] = {}
+    for field, value in values:
+        if value:
+            by_field.setdefault(field, set()).add(str(value))
+
+    added = 0
+    for field, field_values in by_field.items():
+        existing = {
+            row.value for row in db.query(models.SearchTerm.value).filter(
+                models.SearchTerm.field == field,
+                models.SearchTerm.value.in_(field_values)
+            ).all()
+        }
+        # MySQL 기본 정렬 규칙은 대소문자를 구분하지 않으므로 소문자로 비교
+        existing_lower = {value.lower() for value in existing}
+
+        new_values = []
+        for value in sorted(field_values):
+            if value.lower() not in existing_lower:
+                new_values.append(value)
+                existing_lower.add(value.lower())
+        if not new_values:
+            continue
+
+        try:
+            # 새 값을 한 번에 추가 (일괄 업로드 시 값마다 세이브포인트를 만들지 않도록)
+            with db.begin_nested():
+                db.add_all([_new_term(field, value) for value in new_values])
+            added += len(new_values)
+        except IntegrityError:
+            # 동시에 같은 값이 추가된 경우 값마다 다시 시도하여 해당 값만 건너뜀
+            for value in new_values:
+                try:
+                    with db.begin_nested():
+                        db.add(_new_term(field, value))
+                    added += 1
+                except IntegrityError:
+                    pass
+
+    return added
+
+def index_measurements(db: Session, measurements: Iterable[models.Measurement]) -> int:
+    """
+    측정 데이터의 DEVICE / LOT NO / WAFER NO를 사전에 추가
+    """
+    return index_values(db, [
+        (field, getattr(measurement, field))
+        for measurement in measurements
+        for field in SEARCH_FIELDS
+    ])
+
+def _term_query(db: Session, field: str, text: str):
+    """
+    text를 부분 문자열로 포함하는 사전 값 조회 쿼리
+    3글자 이상이면 트라이그램을 모두 포함하는 값으로 먼저 좁힌 뒤 LIKE로 확인
+    """
+    pattern = f"%{_escape_like(text)}%"
+    query = db.query(models.SearchTerm.value).filter(models.SearchTerm.field == field)
+
+    grams = make_grams(text)
+    if grams:
+        candidates = db.query(models.SearchTermGram.term_id).filter(
+            models.SearchTermGram.gram.in_(grams)
+        ).group_by(models.SearchTermGram.term_id).having(
+            func.count(models.SearchTermGram.gram) == len(grams)
+        ).subquery()
+        query = query.join(candidates, candidates.c.term_id == models.SearchTerm.id)
+
+    return query.filter(models.SearchTerm.value.like(pattern, escape=LIKE_ESCAPE))
+
+def find_values(db: Session, field: str, text: str) -> Optional[List[str]]:
+    """
+    text를 포함하는 field 값 목록 (일치하는 값이 MAX_MATCHED_VALUES보다 많으면 None)
+    """
+    values = [row.value for row in _term_query(db, field, text).limit(MAX_MATCHED_VALUES + 1).all()]
+    if len(values) > MAX_MATCHED_VALUES:
+        return None
+    return values
+
+def contains_condition(db: Session, field: str, text: str):
+    """
+    측정 데이터의 field가 text를 포함하는 조건 (LIKE '%text%'와 같은 결과)
+    검색어 사전에서 찾은 값 목록으로 IN 조건을 만들어 컬럼 인덱스를 사용
+    """
+    column = getattr(models.Measurement, field)
+    values = find_values(db, field, text)
+    if values is None:
+        return column.like(f"%{_escape_like(text)}%", escape=LIKE_ESCAPE)
+    # 빈 목록은 항상 거짓인 조건이 됨
+    return column.in_(values)
+
+def suggest_lot_nos(db: Session, text: str, target_id: Optional[int] = None, limit: int = 20) -> List[str]:
+    """
+    LOT NO 자동완성 (text를 포함하는 LOT NO, 실제 측정 데이터가 있는 값만)
+    """
+    query = _term_query(db, "lot_no", text)
+
+    # 수정/삭제로 더 이상 쓰이지 않는 값 제외 (target_id + lot_no 인덱스 사용)
+    measurement_filter = models.Measurement.lot_no == models.SearchTerm.value
+    if target_id:
+        measurement_filter = and_(models.Measurement.target_id == target_id, measurement_filter)
+    query = query.filter(exists().where(measurement_filter))
+
+    # 입력값으로 시작하는 값을 먼저, 그다음 사전순
+    rows = query.order_by(
+        models.SearchTerm.value.like(f"{_escape_like(text)}%", escape=LIKE_ESCAPE).desc(),
+        models.SearchTerm.value.asc()
+    ).limit(limit).all()
+
+    return [row.value for row in rows]
+
+def rebuild_search_index(db: Session, batch_size: int = 1000) -> int:
+    """
+    측정 데이터 전체의 고유 값을 사전에 추가 (이미 있는 값은 건너뜀), 추가된 값 수 반환
+    """
+    added = 0
+    for field in SEARCH_FIELDS:
+        column = getattr(models.Measurement, field)
+        values = [row[0] for row in db.query(column).distinct().all()]
+        for i in range(0, len(values), batch_size):
+            added += index_values(db, [(field, value) for value in values[i:i + batch_size]])
+            db.commit()
+    return added
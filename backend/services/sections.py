@@ -0,0 +1,28 @@
+"""
+DICD 측정 관리 시스템 - 분석 결과 구성 항목(sections) 선택
+SPC / 분포 분석에서 화면에 필요한 항목만 계산하도록 sections 파라미터를 해석합니다.
+(예: 대시보드 모니터링 차트는 평균값 시계열과 관리 한계선만 사용하므로 위치별 계산을 하지 않음)
+"""
+
+from typing import Iterable, Optional, Tuple, Union
+from fastapi import HTTPException
+
+def parse_sections(sections: Optional[Union[str, Iterable[str]]], available: Tuple[str, ...]) -> Tuple[str, ...]:
+    """
+    쉼표로 구분한 문자열 또는 목록을 available 순서의 튜플로 변환 (지정하지 않으면 전체)
+    결과 캐시 / ETag 키로 쓸 수 있도록 순서와 중복을 정규화
+    """
+    if sections is None:
+        return available
+
+    if isinstance(sections, str):
+        sections = sections.split(",")
+    requested = {section.strip() for section in sections if section.strip()}
+
+    unknown = requested - set(available)
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid sections: {', '.join(sorted(unknown))}. Use any of: {', '.join(available)}"
+        )
+    return tuple(section for section in available if section in requested)
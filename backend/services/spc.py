@@ -1,46 +1,94 @@
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime, timedelta
 import numpy as np
 from sqlalchemy.orm import Session
 from ..database import models
 from . import statistics as stats_service
+from . import spec_cache, result_cache, downsampling, control_limits as control_limit_service
+from .dataset import load_measurement_dataset, POSITIONS, SERIES
+from .sections import parse_sections
 
-def calculate_control_limits(values: List[float], sigma_level: int = 3) -> Dict[str, float]:
+# SPC 분석 결과에서 선택할 수 있는 항목 (평균값 시계열 data와 spec은 항상 포함)
+#   control_limits: 관리 한계선과 출처(control_limits, control_limit_source)
+#   patterns: 평균값의 Nelson 규칙 위반 (patterns, pattern_runs)
+#   position_patterns: 위치별 시계열 / 관리 한계선 / 규칙 위반 (position_*), R 차트 관리 한계선 (r_chart_limits)
+#   capability: 공정능력지수 (process_capability)
+SPC_SECTIONS = ("control_limits", "patterns", "position_patterns", "capability")
+
+# R 차트 관리 한계선 상수 (부분군 크기 5: 위치 5개)
+R_CHART_D2 = 2.326
+R_CHART_D3 = 0.864
+
+def control_limits_at(kernel: Dict[str, Any], column: int) -> Dict[str, float]:
     """
-    관리 한계선(CL, UCL, LCL) 계산
+    statistics.calculate_series_statistics 결과에서 한 열의 관리 한계선(CL, UCL, LCL)
     """
-    if not values or len(values) < 2:
+    if kernel["count"] < 2:
         return {
             "cl": None,
             "ucl": None,
             "lcl": None
         }
     
-    # 중심선 (CL)
-    cl = np.mean(values)
-    
-    # 표준편차
-    std_dev = np.std(values, ddof=1)  # ddof=1 for sample standard deviation
-    
-    # 관리 한계선
-    ucl = cl + (sigma_level * std_dev)
-    lcl = cl - (sigma_level * std_dev)
-    
     return {
-        "cl": round(cl, 3),
-        "ucl": round(ucl, 3),
-        "lcl": round(lcl, 3)
+        key: round(float(kernel[key][column]), 3)
+        for key in ("cl", "ucl", "lcl")
     }
 
-# detect_nelson_rules 함수 내에서 패턴 객체를 생성하는 부분 수정
-# "position" 대신 실제 측정 데이터의 LOT NO를 포함하도록 수정
+def calculate_r_chart_limits(position_matrix: np.ndarray) -> Dict[str, float]:
+    """
+    위치별 값 (n × 5) 행렬의 측정 데이터별 범위(최대-최소)로 R 차트 관리 한계선(CL=R-bar, UCL, LCL) 계산
+    차트용 시계열을 다운샘플링해도 한계선은 전체 데이터 기준이 되도록 서버에서 계산
+    """
+    r_bar = float(np.ptp(position_matrix, axis=1).mean())
+    spread = 3 * r_bar * R_CHART_D3 / R_CHART_D2
+    return {
+        "cl": round(r_bar, 3),
+        "ucl": round(r_bar + spread, 3),
+        "lcl": round(max(0.0, r_bar - spread), 3)  # LCL은 0보다 작을 수 없음
+    }
 
-def detect_nelson_rules(values: List[float], cl: float, ucl: float, lcl: float, lot_nos: List[str]) -> List[Dict[str, Any]]:
+def calculate_control_limits(values: List[float], sigma_level: int = 3) -> Dict[str, float]:
     """
-    Nelson Rules에 기반한 패턴 감지
+    관리 한계선(CL, UCL, LCL) 계산
     """
-    if not values:  # 데이터가 비어있는 경우만 체크
-        return []
+    if values is None:
+        values = []
+    return control_limits_at(stats_service.calculate_series_statistics(values, sigma_level=sigma_level), 0)
+
+# Nelson Rules 정의: 규칙 번호 -> (설명, 판정 구간 길이)
+NELSON_RULES = {
+    1: ("한 점이 관리 한계선을 벗어남", 1),
+    2: ("9개 연속 점이 중심선의 같은 쪽에 있음", 9),
+    3: ("6개 연속 점이 증가하거나 감소함", 6),
+    4: ("14개 연속 점이 교대로 증가/감소함", 14),
+    5: ("2점 중 2점이 3-시그마 구간의 같은 쪽에 있음 (Zone A)", 2),
+    6: ("4점 중 4점이 2-시그마 구간의 같은 쪽에 있음 (Zone B)", 4),
+    7: ("15개 연속 점이 1-시그마 구간 안에 있음 (Zone C)", 15),
+    8: ("8개 연속 점이 1-시그마 구간 바깥에 있음", 8),
+}
+
+def _window_all(mask: np.ndarray, window: int) -> np.ndarray:
+    """
+    길이 window인 모든 연속 구간에 대해 mask가 전부 True인지 판정 (누적합 커널, O(n))
+    결과의 i번째 값은 mask[i:i+window]의 판정 결과
+    """
+    if len(mask) < window:
+        return np.zeros(0, dtype=bool)
+    counts = np.concatenate(([0], np.cumsum(mask, dtype=np.int64)))
+    return (counts[window:] - counts[:-window]) == window
+
+def evaluate_nelson_rules(values, cl: float, ucl: float, lcl: float) -> Dict[int, np.ndarray]:
+    """
+    Nelson Rules 1~8을 벡터 연산으로 한 번에 평가
+    반환값: 규칙 번호 -> 규칙을 만족하는 구간의 시작 위치 배열 (오름차순)
+    """
+    arr = np.asarray(values, dtype=np.float64)
+    n = len(arr)
+    hits = {}
+    
+    if n == 0:
+        return hits
     
     # 표준편차 계산 (UCL-CL)/3 (3-시그마 기준)
     std_dev = (ucl - cl) / 3
@@ -51,129 +99,302 @@ def detect_nelson_rules(values: List[float], cl: float, ucl: float, lcl: float,
     zone_b_upper = cl + std_dev
     zone_b_lower = cl - std_dev
     
-    # 결과 저장 리스트
-    patterns = []
-    
     # Rule 1: 한 점이 관리 한계선을 벗어남 - 항상 검사
-    for i, value in enumerate(values):
-        if value > ucl or value < lcl:
-            patterns.append({
-                "rule": 1,
-                "description": "한 점이 관리 한계선을 벗어남",
-                "position": i,
-                "lot_no": lot_nos[i] if i < len(lot_nos) else f"포인트 {i+1}",
-                "value": value
-            })
+    hits[1] = np.flatnonzero((arr > ucl) | (arr < lcl))
     
     # 데이터가 충분하지 않으면 나머지 규칙은 건너뜀
-    if len(values) < 9:
-        return patterns
+    if n < 9:
+        return hits
+    
+    # 인접한 두 점의 증감 (길이 n-1)
+    increasing = arr[:-1] < arr[1:]
+    decreasing = arr[:-1] > arr[1:]
     
     # Rule 2: 9개 연속 점이 중심선의 같은 쪽에 있음
-    for i in range(len(values) - 8):
-        if all(v > cl for v in values[i:i+9]) or all(v < cl for v in values[i:i+9]):
-            patterns.append({
-                "rule": 2,
-                "description": "9개 연속 점이 중심선의 같은 쪽에 있음",
-                "position": i,
-                "length": 9
-            })
+    hits[2] = np.flatnonzero(_window_all(arr > cl, 9) | _window_all(arr < cl, 9))
     
-    # Rule 3: 6개 연속 점이 증가하거나 감소함
-    for i in range(len(values) - 5):
-        if all(values[i+j] < values[i+j+1] for j in range(5)) or all(values[i+j] > values[i+j+1] for j in range(5)):
-            patterns.append({
-                "rule": 3,
-                "description": "6개 연속 점이 증가하거나 감소함",
-                "position": i,
-                "length": 6
-            })
+    # Rule 3: 6개 연속 점이 증가하거나 감소함 (5개 연속 증감)
+    hits[3] = np.flatnonzero(_window_all(increasing, 5) | _window_all(decreasing, 5))
     
-    # Rule 4: 14개 연속 점이 교대로 증가/감소함
-    for i in range(len(values) - 13):
-        ups_and_downs = [1 if values[i+j] < values[i+j+1] else -1 for j in range(13)]
-        alternating = True
-        for j in range(len(ups_and_downs) - 1):
-            if ups_and_downs[j] == ups_and_downs[j+1]:
-                alternating = False
-                break
-        if alternating:
-            patterns.append({
-                "rule": 4,
-                "description": "14개 연속 점이 교대로 증가/감소함",
-                "position": i,
-                "length": 14
-            })
+    # Rule 4: 14개 연속 점이 교대로 증가/감소함 (13개 증감 부호 중 12번 연속 방향 전환)
+    # 기존 판정과 동일하게 같은 값은 감소(-1)로 취급
+    alternating = increasing[:-1] != increasing[1:]
+    hits[4] = np.flatnonzero(_window_all(alternating, 12))
     
     # Rule 5: 2점 중 2점이 3-시그마 구간의 같은 쪽에 있음 (Zone A)
-    for i in range(len(values) - 1):
-        if (values[i] > zone_a_upper and values[i+1] > zone_a_upper) or (values[i] < zone_a_lower and values[i+1] < zone_a_lower):
-            patterns.append({
-                "rule": 5,
-                "description": "2점 중 2점이 3-시그마 구간의 같은 쪽에 있음 (Zone A)",
-                "position": i,
-                "length": 2
-            })
+    hits[5] = np.flatnonzero(_window_all(arr > zone_a_upper, 2) | _window_all(arr < zone_a_lower, 2))
     
     # Rule 6: 4점 중 4점이 2-시그마 구간의 같은 쪽에 있음 (Zone B)
-    for i in range(len(values) - 3):
-        if all(v > zone_b_upper for v in values[i:i+4]) or all(v < zone_b_lower for v in values[i:i+4]):
-            patterns.append({
-                "rule": 6,
-                "description": "4점 중 4점이 2-시그마 구간의 같은 쪽에 있음 (Zone B)",
-                "position": i,
-                "length": 4
-            })
+    hits[6] = np.flatnonzero(_window_all(arr > zone_b_upper, 4) | _window_all(arr < zone_b_lower, 4))
     
     # Rule 7: 15개 연속 점이 1-시그마 구간 안에 있음 (Zone C)
-    for i in range(len(values) - 14):
-        if all(zone_b_lower < v < zone_b_upper for v in values[i:i+15]):
-            patterns.append({
-                "rule": 7,
-                "description": "15개 연속 점이 1-시그마 구간 안에 있음 (Zone C)",
-                "position": i,
-                "length": 15
-            })
+    hits[7] = np.flatnonzero(_window_all((arr > zone_b_lower) & (arr < zone_b_upper), 15))
     
     # Rule 8: 8개 연속 점이 1-시그마 구간 바깥에 있음
-    for i in range(len(values) - 7):
-        if all((v < zone_b_lower or v > zone_b_upper) for v in values[i:i+8]):
-            patterns.append({
-                "rule": 8,
-                "description": "8개 연속 점이 1-시그마 구간 바깥에 있음",
-                "position": i,
-                "length": 8
-            })
+    hits[8] = np.flatnonzero(_window_all((arr < zone_b_lower) | (arr > zone_b_upper), 8))
+    
+    return hits
+
+def build_nelson_patterns(values, hits: Dict[int, np.ndarray], lot_nos: List[str]) -> List[Dict[str, Any]]:
+    """
+    규칙별 위반 위치를 구간 시작 위치별 패턴 목록으로 변환 (기존 응답 형식)
+    """
+    patterns = []
+    
+    for rule, positions in hits.items():
+        description, length = NELSON_RULES[rule]
+        for i in positions.tolist():
+            if rule == 1:
+                patterns.append({
+                    "rule": 1,
+                    "description": description,
+                    "position": i,
+                    "lot_no": lot_nos[i] if i < len(lot_nos) else f"포인트 {i+1}",
+                    "value": values[i]
+                })
+            else:
+                patterns.append({
+                    "rule": rule,
+                    "description": description,
+                    "position": i,
+                    "length": length
+                })
     
     return patterns
 
+def merge_nelson_runs(hits: Dict[int, np.ndarray], lot_nos: List[str]) -> List[Dict[str, Any]]:
+    """
+    같은 규칙에서 서로 겹치는 위반 구간을 하나의 run(start, end, rule)으로 병합
+    """
+    runs = []
+    
+    for rule, positions in hits.items():
+        if len(positions) == 0:
+            continue
+        
+        description, length = NELSON_RULES[rule]
+        ends = positions + (length - 1)
+        
+        # 구간 길이가 규칙별로 고정이므로 끝 위치는 단조 증가 -> 직전 구간과 겹치지 않는 위치에서 새 run 시작
+        breaks = np.flatnonzero(positions[1:] > ends[:-1]) + 1
+        run_starts = positions[np.concatenate(([0], breaks))]
+        run_ends = ends[np.concatenate((breaks - 1, [len(positions) - 1]))]
+        
+        for start, end in zip(run_starts.tolist(), run_ends.tolist()):
+            runs.append({
+                "rule": rule,
+                "description": description,
+                "start": start,
+                "end": end,
+                "length": end - start + 1,
+                "start_lot_no": lot_nos[start] if start < len(lot_nos) else f"포인트 {start+1}",
+                "end_lot_no": lot_nos[end] if end < len(lot_nos) else f"포인트 {end+1}"
+            })
+    
+    return runs
+
+def detect_nelson_rules(values: List[float], cl: float, ucl: float, lcl: float, lot_nos: List[str]) -> List[Dict[str, Any]]:
+    """
+    Nelson Rules에 기반한 패턴 감지
+    """
+    if len(values) == 0:  # 데이터가 비어있는 경우만 체크
+        return []
+    
+    hits = evaluate_nelson_rules(values, cl, ucl, lcl)
+    return build_nelson_patterns(values, hits, lot_nos)
+
+def detect_nelson_runs(values: List[float], cl: float, ucl: float, lcl: float, lot_nos: List[str]) -> List[Dict[str, Any]]:
+    """
+    Nelson Rules 위반을 병합된 run 단위로 감지
+    """
+    if len(values) == 0:
+        return []
+    
+    hits = evaluate_nelson_rules(values, cl, ucl, lcl)
+    return merge_nelson_runs(hits, lot_nos)
+
+def _limit_source(stored_limits: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    관리 한계선 출처 (Phase I: 조회 기간으로 계산, Phase II: 저장된 고정 한계선)
+    """
+    if stored_limits is None:
+        return {"phase": "I"}
+    return {
+        "phase": "II",
+        "version": stored_limits["version"],
+        "sigma_level": stored_limits["sigma_level"],
+        "phase1_start": stored_limits["phase1_start"],
+        "phase1_end": stored_limits["phase1_end"],
+        "sample_count": stored_limits["sample_count"]
+    }
+
 # analyze_spc 함수 수정
-def analyze_spc(db: Session, target_id: int, days: int = 30, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None) -> Dict[str, Any]:
+def analyze_spc(db: Session, target_id: int, days: int = 30, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None,
+                limit_mode: str = "stored", max_points: Optional[int] = None,
+                watermark: Optional[Tuple] = None, sections=None) -> Dict[str, Any]:
     """
-    특정 타겟에 대한 SPC 분석 수행
+    특정 타겟에 대한 SPC 분석 수행 (같은 데이터에 대한 반복 조회는 result_cache의 결과 사용)
+    limit_mode
+        stored: 활성 고정 관리 한계선(Phase II)이 있으면 사용하고 없으면 조회 기간으로 계산
+        window: 항상 조회 기간의 데이터로 계산
+    max_points: 지정하면 차트용 시계열을 약 max_points개로 다운샘플링 (관리 한계선 / 패턴 판정은 전체 데이터 기준)
+    watermark: 같은 기간으로 이미 구한 result_cache.get_watermark() 값 (ETag 계산 등, 없으면 조회)
+    sections: 계산할 항목 (SPC_SECTIONS 중 쉼표로 구분한 문자열 또는 목록, 지정하지 않으면 전체)
     """
+    sections = parse_sections(sections, SPC_SECTIONS)
+    
+    # 다운샘플링할 때 규칙 위반 점을 유지하기 위해 평균값 패턴은 요청하지 않아도 계산
+    computed = sections
+    if max_points and "patterns" not in sections:
+        computed = parse_sections(sections + ("patterns",), SPC_SECTIONS)
+    
+    now = datetime.now()
+    
     # 시작 날짜와 종료 날짜 설정
     if not start_date:
-        start_date = datetime.now() - timedelta(days=days)
+        start_date = now - timedelta(days=days)
+    window = result_cache.window_key(start_date, end_date, now)
     
     if not end_date:
-        end_date = datetime.now()
+        end_date = now
     
-    # 측정 데이터 쿼리
-    query = db.query(models.Measurement).filter(
-        models.Measurement.target_id == target_id,
-        models.Measurement.created_at >= start_date
+    # 고정 관리 한계선 (Phase II)
+    stored_limits = None
+    if limit_mode == "stored":
+        stored_limits = control_limit_service.get_active_limits(db, target_id)
+    
+    result = result_cache.get_or_compute(
+        "spc",
+        target_id,
+        window,
+        (limit_mode, stored_limits["version"] if stored_limits else None, computed),
+        watermark or result_cache.get_watermark(db, target_id, start_date, end_date),
+        lambda: _analyze_spc(db, target_id, start_date, end_date, stored_limits, computed)
     )
+    
+    if max_points and result["sample_count"] > max_points:
+        result = downsample_spc_result(result, max_points)
+    if computed != sections:
+        result = {key: value for key, value in result.items() if key not in ("patterns", "pattern_runs")}
+    return result
 
-    # 종료 날짜가 지정된 경우 추가 필터링
-    if end_date:
-        query = query.filter(models.Measurement.created_at <= end_date)
+def downsample_spc_result(result: Dict[str, Any], max_points: int) -> Dict[str, Any]:
+    """
+    SPC 분석 결과의 시계열을 LTTB로 다운샘플링한 사본 (원본은 캐시와 공유되므로 수정하지 않음)
+    평균값 / 위치별 Nelson 규칙 위반 구간과 SPEC 위반 점은 모두 유지하고,
+    패턴 위치(position, start, end)는 다운샘플링된 배열의 인덱스로 바꿉니다.
+    data.indices에 남은 점의 원래 인덱스를 담습니다.
+    """
+    data = result["data"]
+    position_data = result.get("position_data", {})
+    
+    keep = [downsampling.run_indices(result.get("pattern_runs", []))]
+    keep += [downsampling.run_indices(runs) for runs in result.get("position_pattern_runs", {}).values()]
+    if "spec" in result:
+        keep.append(downsampling.out_of_spec_indices(
+            result["spec"]["lsl"], result["spec"]["usl"], data["values"], *position_data.values()
+        ))
+    
+    indices = downsampling.select_indices(data["values"], max_points, np.concatenate(keep))
+    index_list = indices.tolist()
+    
+    def remap(position: int) -> int:
+        return int(np.searchsorted(indices, position))
+    
+    def remap_patterns(patterns: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return [dict(pattern, position=remap(pattern["position"])) for pattern in patterns]
+    
+    def remap_runs(runs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return [dict(run, start=remap(run["start"]), end=remap(run["end"])) for run in runs]
+    
+    downsampled = dict(result)
+    downsampled["data"] = {
+        "values": [data["values"][i] for i in index_list],
+        "dates": [data["dates"][i] for i in index_list],
+        "lot_nos": [data["lot_nos"][i] for i in index_list],
+        "indices": index_list
+    }
+    if "patterns" in result:
+        downsampled["patterns"] = remap_patterns(result["patterns"])
+        downsampled["pattern_runs"] = remap_runs(result["pattern_runs"])
+    if "position_data" in result:
+        downsampled["position_data"] = {
+            position: [values[i] for i in index_list] for position, values in position_data.items()
+        }
+        downsampled["position_patterns"] = {
+            position: remap_patterns(patterns) for position, patterns in result["position_patterns"].items()
+        }
+        downsampled["position_pattern_runs"] = {
+            position: remap_runs(runs) for position, runs in result["position_pattern_runs"].items()
+        }
+    downsampled["downsampling"] = {
+        "max_points": max_points,
+        "original_count": len(data["values"]),
+        "returned_count": len(index_list)
+    }
+    return downsampled
 
-    query = query.order_by(models.Measurement.created_at.asc())
+def downsample_measurements(db: Session, target_id: int, measurements: List[models.Measurement],
+                            max_points: int) -> List[models.Measurement]:
+    """
+    한 타겟의 측정 데이터 목록(최신순)을 평균값 기준 LTTB로 다운샘플링 (순서 유지)
+    SPEC 위반(최소 / 최대값 기준)과 평균값의 Nelson 규칙 위반 구간에 포함된 측정 데이터는 모두 유지
+    """
+    if len(measurements) <= max_points:
+        return measurements
     
-    measurements = query.all()
+    # 시간순으로 판정
+    rows = measurements[::-1]
+    avg = np.array([row.avg_value for row in rows], dtype=float)
+    keep = []
     
-    if not measurements:
+    active_spec = spec_cache.get_active_spec(db, target_id)
+    if active_spec:
+        keep.append(downsampling.out_of_spec_indices(
+            active_spec.lsl, active_spec.usl,
+            [row.min_value for row in rows], [row.max_value for row in rows]
+        ))
+    
+    # SPC 분석과 같은 관리 한계선 (고정 한계선이 있으면 사용)
+    stored_limits = control_limit_service.get_active_limits(db, target_id)
+    if stored_limits is not None:
+        limits = stored_limits["limits"][SERIES[0]]
+    else:
+        limits = calculate_control_limits(avg)
+    if limits.get("cl") is not None:
+        hits = evaluate_nelson_rules(avg, limits["cl"], limits["ucl"], limits["lcl"])
+        keep.append(downsampling.run_indices(merge_nelson_runs(hits, [])))
+    
+    indices = downsampling.select_indices(avg, max_points, np.concatenate(keep) if keep else None)
+    return [rows[i] for i in indices[::-1].tolist()]
+
+def _analyze_spc(db: Session, target_id: int, start_date: datetime, end_date: datetime,
+                 stored_limits: Optional[Dict[str, Any]], sections: Tuple[str, ...] = SPC_SECTIONS) -> Dict[str, Any]:
+    """
+    SPC 분석 계산 (stored_limits가 있으면 저장된 관리 한계선으로 규칙 판정, sections의 항목만 계산)
+    """
+    # 측정 데이터 조회 (필요한 컬럼만 배열로 로드)
+    dataset = load_measurement_dataset(db, target_id, start_date=start_date, end_date=end_date)
+    
+    return _analyze_dataset(db, target_id, dataset, stored_limits, sections)
+
+def analyze_spc_dataset(db: Session, target_id: int, dataset: Dict[str, Any], limit_mode: str = "stored",
+                        sections=None) -> Dict[str, Any]:
+    """
+    이미 로드한 측정 데이터셋(dataset.load_measurement_dataset)으로 SPC 분석 (보고서 등, 결과 캐시 미사용)
+    limit_mode, sections는 analyze_spc와 같음
+    """
+    stored_limits = None
+    if limit_mode == "stored":
+        stored_limits = control_limit_service.get_active_limits(db, target_id)
+    return _analyze_dataset(db, target_id, dataset, stored_limits, parse_sections(sections, SPC_SECTIONS))
+
+def _analyze_dataset(db: Session, target_id: int, dataset: Dict[str, Any],
+                     stored_limits: Optional[Dict[str, Any]], sections: Tuple[str, ...]) -> Dict[str, Any]:
+    """
+    측정 데이터셋의 SPC 분석 계산
+    """
+    if dataset["count"] == 0:
         return {
             "target_id": target_id,
             "sample_count": 0,
@@ -181,75 +402,95 @@ def analyze_spc(db: Session, target_id: int, days: int = 30, start_date: Optiona
         }
     
     # 평균값 추출
-    values = [m.avg_value for m in measurements]
-    dates = [m.created_at for m in measurements]
-    lot_nos = [m.lot_no for m in measurements]  # LOT NO 추출
-    
-    # 관리 한계선 계산
-    control_limits = calculate_control_limits(values)
+    series = dataset["series"]
+    values = series["avg"].tolist()
+    dates = dataset["dates"]
+    lot_nos = dataset["lot_nos"]  # LOT NO 추출
+    with_positions = "position_patterns" in sections
     
-    # 패턴 감지와 LOT NO 연결
-    patterns = []
-    if control_limits["cl"] is not None:
-        patterns = detect_nelson_rules(values, control_limits["cl"], control_limits["ucl"], control_limits["lcl"], lot_nos)
-        
-        # 패턴에 LOT NO 정보 추가
-        for pattern in patterns:
-            pos = pattern.get("position", 0)
-            if 0 <= pos < len(lot_nos):
-                pattern["lot_no"] = lot_nos[pos]
-
-    # 위치별 데이터도 분석
-    position_values = {
-        "top": [m.value_top for m in measurements],
-        "center": [m.value_center for m in measurements],
-        "bottom": [m.value_bottom for m in measurements],
-        "left": [m.value_left for m in measurements],
-        "right": [m.value_right for m in measurements]
-    }
+    # SPEC 가져오기
+    active_spec = spec_cache.get_active_spec(db, target_id)
     
-    position_control_limits = {}
-    position_patterns = {}
+    # 관리 한계선과 공정능력지수를 한 번에 계산 (위치별 항목을 요청하면 평균값 + 위치별 값 (n × 6) 행렬, 아니면 평균값만)
+    # 고정 관리 한계선을 사용하고 공정능력지수도 요청하지 않으면 계산하지 않음
+    kernel = None
+    if stored_limits is None or "capability" in sections:
+        kernel = stats_service.calculate_series_statistics(
+            dataset["matrix"] if with_positions else dataset["matrix"][:, :1],
+            active_spec.lsl if active_spec else None,
+            active_spec.usl if active_spec else None
+        )
     
-    for position, pos_values in position_values.items():
-        pos_cl = calculate_control_limits(pos_values)
-        position_control_limits[position] = pos_cl
-        
-        if pos_cl["cl"] is not None:
-            pos_patterns = detect_nelson_rules(
-                pos_values,
-                pos_cl["cl"],
-                pos_cl["ucl"],
-                pos_cl["lcl"],
-                lot_nos
-            )
-            position_patterns[position] = pos_patterns
-            
+    # 고정 관리 한계선(Phase II)이 있으면 저장된 값, 없으면 조회 기간의 데이터로 계산
+    def limits_for(column: int) -> Dict[str, float]:
+        if stored_limits is not None:
+            return dict(stored_limits["limits"][SERIES[column]])
+        return control_limits_at(kernel, column)
     
-    # SPEC 가져오기
-    active_spec = db.query(models.Spec).filter(
-        models.Spec.target_id == target_id,
-        models.Spec.is_active == True
-    ).first()
+    # 관리 한계선 계산
+    control_limits = limits_for(0)
     
     # 결과 딕셔너리 초기화
     result = {
         "target_id": target_id,
-        "sample_count": len(measurements),
+        "sample_count": dataset["count"],
         "data": {
             "values": values,
             "dates": [d.isoformat() for d in dates],
             "lot_nos": lot_nos
-        },
-        "control_limits": control_limits,
-        "patterns": patterns,
-        "position_data": {
-            position: pos_values for position, pos_values in position_values.items()
-        },
-        "position_control_limits": position_control_limits,
-        "position_patterns": position_patterns
+        }
     }
     
+    if "control_limits" in sections:
+        result["control_limits"] = control_limits
+        result["control_limit_source"] = _limit_source(stored_limits)
+    
+    # 패턴 감지와 LOT NO 연결
+    if "patterns" in sections:
+        patterns = []
+        pattern_runs = []
+        if control_limits["cl"] is not None:
+            hits = evaluate_nelson_rules(series["avg"], control_limits["cl"], control_limits["ucl"], control_limits["lcl"])
+            patterns = build_nelson_patterns(values, hits, lot_nos)
+            pattern_runs = merge_nelson_runs(hits, lot_nos)
+            
+            # 패턴에 LOT NO 정보 추가
+            for pattern in patterns:
+                pos = pattern.get("position", 0)
+                if 0 <= pos < len(lot_nos):
+                    pattern["lot_no"] = lot_nos[pos]
+        
+        result["patterns"] = patterns
+        result["pattern_runs"] = pattern_runs
+
+    # 위치별 데이터도 분석
+    if with_positions:
+        position_values = {position: series[position].tolist() for position in POSITIONS}
+        
+        position_control_limits = {}
+        position_patterns = {}
+        position_pattern_runs = {}
+        
+        for i, (position, pos_values) in enumerate(position_values.items(), start=1):
+            pos_cl = limits_for(i)
+            position_control_limits[position] = pos_cl
+            
+            if pos_cl["cl"] is not None:
+                pos_hits = evaluate_nelson_rules(
+                    series[position],
+                    pos_cl["cl"],
+                    pos_cl["ucl"],
+                    pos_cl["lcl"]
+                )
+                position_patterns[position] = build_nelson_patterns(pos_values, pos_hits, lot_nos)
+                position_pattern_runs[position] = merge_nelson_runs(pos_hits, lot_nos)
+        
+        result["position_data"] = position_values
+        result["position_control_limits"] = position_control_limits
+        result["r_chart_limits"] = calculate_r_chart_limits(dataset["matrix"][:, 1:])
+        result["position_patterns"] = position_patterns
+        result["position_pattern_runs"] = position_pattern_runs
+    
     # SPEC 및 공정 능력 지수 추가
     if active_spec:
         result["spec"] = {
@@ -259,8 +500,7 @@ def analyze_spc(db: Session, target_id: int, days: int = 30, start_date: Optiona
         }
         
         # 공정 능력 지수 계산 및 추가
-        result["process_capability"] = stats_service.calculate_process_capability(
-            values, active_spec.lsl, active_spec.usl
-        )
+        if "capability" in sections:
+            result["process_capability"] = stats_service.process_capability_at(kernel, 0)
     
     return result
@@ -0,0 +1,380 @@
+"""
+DICD 측정 관리 시스템 - 실시간 SPC 판정 서비스
+측정 데이터가 입력되는 시점에 타겟별 Nelson Rule 상태를 갱신하고 위반을 기록합니다.
+
+평균값(avg_value) 시계열을 대상으로 하며, 각 규칙은 연속 카운터로 판정하므로
+새 측정값 하나당 O(1)로 처리됩니다. 판정 결과는 spc.detect_nelson_rules와 동일한
+규칙 정의(NELSON_RULES)를 따릅니다.
+
+관리 한계선은 타겟의 활성 고정 한계선(control_limits, Phase II)이 있으면 그 값을,
+없으면 최근 BASELINE_DAYS 기간의 데이터로 산출한 값을 사용합니다.
+산출한 한계선은 BASELINE_REFRESH_HOURS가 지나면 다음 입력 시 다시 산출하므로
+/api/spc/analyze가 같은 최근 기간으로 계산하는 한계선과 크게 달라지지 않습니다.
+"""
+
+import json
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Optional
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..database import models
+from . import spc, control_limits
+
+# 최근 포인트 버퍼 크기 (가장 긴 규칙 구간인 Rule 7의 길이)
+STATE_BUFFER_SIZE = 15
+
+# 관리 한계선 산출 기간(일) 및 최소 샘플 수
+BASELINE_DAYS = 30
+MIN_BASELINE_SAMPLES = 20
+
+# 기준 기간으로 산출한 한계선의 유효 시간 (기준 기간이 매일 이동하므로 하루)
+BASELINE_REFRESH_HOURS = 24
+
+# Rule 2~8은 spc.detect_nelson_rules와 동일하게 9개 이상의 데이터가 있을 때만 판정
+MIN_PATTERN_SAMPLES = 9
+
+def _reset_counters(state: models.SPCDetectorState):
+    """
+    상태의 카운터와 버퍼 초기화
+    """
+    state.sample_count = 0
+    state.last_measurement_id = None
+    state.last_value = None
+    state.last_increasing = None
+    state.run_above = 0
+    state.run_below = 0
+    state.run_increasing = 0
+    state.run_decreasing = 0
+    state.run_alternating = 0
+    state.run_zone_a_upper = 0
+    state.run_zone_a_lower = 0
+    state.run_zone_b_upper = 0
+    state.run_zone_b_lower = 0
+    state.run_zone_c = 0
+    state.run_outside_c = 0
+    state.active_rules = 0
+    state.recent_values = "[]"
+
+def _advance_state(state: models.SPCDetectorState, buffer: List[list], measurement_id: int, lot_no: str, value: float) -> List[int]:
+    """
+    새 포인트 하나로 상태를 갱신하고 이 포인트에서 끝나는 구간이 위반한 규칙 목록 반환
+    """
+    cl, ucl, lcl = state.cl, state.ucl, state.lcl
+
+    # 표준편차 계산 (UCL-CL)/3 (3-시그마 기준)
+    std_dev = (ucl - cl) / 3
+    zone_a_upper = cl + (2 * std_dev)
+    zone_a_lower = cl - (2 * std_dev)
+    zone_b_upper = cl + std_dev
+    zone_b_lower = cl - std_dev
+
+    def bump(run: int, condition: bool) -> int:
+        return run + 1 if condition else 0
+
+    state.run_above = bump(state.run_above, value > cl)
+    state.run_below = bump(state.run_below, value < cl)
+    state.run_zone_a_upper = bump(state.run_zone_a_upper, value > zone_a_upper)
+    state.run_zone_a_lower = bump(state.run_zone_a_lower, value < zone_a_lower)
+    state.run_zone_b_upper = bump(state.run_zone_b_upper, value > zone_b_upper)
+    state.run_zone_b_lower = bump(state.run_zone_b_lower, value < zone_b_lower)
+    state.run_zone_c = bump(state.run_zone_c, zone_b_lower < value < zone_b_upper)
+    state.run_outside_c = bump(state.run_outside_c, value < zone_b_lower or value > zone_b_upper)
+
+    if state.last_value is not None:
+        increasing = state.last_value < value
+        state.run_increasing = bump(state.run_increasing, increasing)
+        state.run_decreasing = bump(state.run_decreasing, state.last_value > value)
+
+        # 같은 값은 감소로 취급 (spc.evaluate_nelson_rules와 동일)
+        if state.last_increasing is not None:
+            state.run_alternating = bump(state.run_alternating, increasing != state.last_increasing)
+        state.last_increasing = increasing
+
+    state.last_value = value
+    state.last_measurement_id = measurement_id
+    state.sample_count += 1
+
+    buffer.append([measurement_id, lot_no, value])
+    del buffer[:-STATE_BUFFER_SIZE]
+
+    # 이 포인트에서 끝나는 구간 판정
+    rules = []
+    if value > ucl or value < lcl:
+        rules.append(1)
+
+    if state.sample_count >= MIN_PATTERN_SAMPLES:
+        if state.run_above >= 9 or state.run_below >= 9:
+            rules.append(2)
+        if state.run_increasing >= 5 or state.run_decreasing >= 5:
+            rules.append(3)
+        if state.run_alternating >= 12:
+            rules.append(4)
+        if state.run_zone_a_upper >= 2 or state.run_zone_a_lower >= 2:
+            rules.append(5)
+        if state.run_zone_b_upper >= 4 or state.run_zone_b_lower >= 4:
+            rules.append(6)
+        if state.run_zone_c >= 15:
+            rules.append(7)
+        if state.run_outside_c >= 8:
+            rules.append(8)
+
+    return rules
+
+def _rules_to_mask(rules: List[int]) -> int:
+    mask = 0
+    for rule in rules:
+        mask |= 1 << rule
+    return mask
+
+def _load_state(db: Session, target_id: int, create: bool = False) -> Optional[models.SPCDetectorState]:
+    """
+    타겟의 판정 상태를 행 잠금으로 조회 (동시 입력 시 카운터가 꼬이지 않도록)
+    create=True이면 상태가 없을 때 빈 상태를 추가해 반환
+    """
+    query = db.query(models.SPCDetectorState).filter(
+        models.SPCDetectorState.target_id == target_id
+    ).with_for_update()
+
+    state = query.first()
+    if state is not None or not create:
+        return state
+
+    # 없는 행은 FOR UPDATE로 잠기지 않으므로 먼저 추가하고,
+    # 동시에 같은 타겟의 상태가 추가된 경우 그 행을 다시 조회해 잠금
+    try:
+        with db.begin_nested():
+            state = models.SPCDetectorState(target_id=target_id)
+            _reset_counters(state)
+            db.add(state)
+    except IntegrityError:
+        state = query.first()
+    return state
+
+def _baseline_rows(db: Session, target_id: int, before_id: Optional[int] = None) -> list:
+    """
+    최근 BASELINE_DAYS 기간의 평균값 시계열 (입력 순)
+    """
+    query = db.query(
+        models.Measurement.id,
+        models.Measurement.lot_no,
+        models.Measurement.avg_value
+    ).filter(
+        models.Measurement.target_id == target_id,
+        models.Measurement.created_at >= datetime.now() - timedelta(days=BASELINE_DAYS)
+    )
+    if before_id is not None:
+        query = query.filter(models.Measurement.id < before_id)
+
+    return query.order_by(models.Measurement.created_at.asc(), models.Measurement.id.asc()).all()
+
+def rebuild_state(db: Session, target_id: int, before_id: Optional[int] = None,
+                  state: Optional[models.SPCDetectorState] = None,
+                  rows: Optional[list] = None) -> models.SPCDetectorState:
+    """
+    최근 BASELINE_DAYS 기간의 데이터로 관리 한계선을 다시 계산하고 카운터를 재구성
+    활성 고정 한계선이 있으면 다시 계산하지 않고 저장된 평균값 한계선 사용
+    before_id가 지정되면 해당 ID 이전의 측정 데이터만 사용 (아직 반영되지 않은 신규 데이터 제외)
+    rows가 지정되면 다시 조회하지 않고 해당 시계열 사용
+    """
+    if state is None:
+        state = _load_state(db, target_id, create=True)
+
+    _reset_counters(state)
+
+    if rows is None:
+        rows = _baseline_rows(db, target_id, before_id)
+
+    stored = control_limits.get_active_limits(db, target_id)
+    if stored is not None:
+        limits = stored["limits"]["avg"]
+        state.limits_source = "stored"
+        state.limits_version = stored["version"]
+    elif len(rows) < MIN_BASELINE_SAMPLES:
+        # 기준 데이터가 부족하면 한계선 없이 대기
+        state.cl = state.ucl = state.lcl = None
+        state.limits_source = state.limits_version = state.limits_computed_at = None
+        return state
+    else:
+        limits = spc.calculate_control_limits([row.avg_value for row in rows])
+        state.limits_source = "baseline"
+        state.limits_version = None
+
+    state.limits_computed_at = datetime.now()
+    state.cl = limits["cl"]
+    state.ucl = limits["ucl"]
+    state.lcl = limits["lcl"]
+
+    # 과거 데이터로 카운터만 채움 (알림은 기록하지 않음)
+    buffer = []
+    rules = []
+    for row in rows:
+        rules = _advance_state(state, buffer, row.id, row.lot_no, row.avg_value)
+
+    state.active_rules = _rules_to_mask(rules)
+    state.recent_values = json.dumps(buffer, ensure_ascii=False)
+
+    return state
+
+def _record_alerts(db: Session, state: models.SPCDetectorState, buffer: List[list], rules: List[int],
+                   previous_mask: int, open_alerts: Dict[int, models.SPCAlert]) -> List[models.SPCAlert]:
+    """
+    위반 규칙을 알림으로 기록 (직전 포인트에서 이어지는 위반은 기존 알림을 연장)
+    open_alerts: 이번 호출에서 생성/연장한 규칙별 알림 (아직 flush되지 않은 알림 포함)
+    """
+    alerts = []
+    measurement_id, lot_no, value = buffer[-1]
+
+    for rule in rules:
+        description, length = spc.NELSON_RULES[rule]
+        alert = None
+
+        if length > 1 and previous_mask & (1 << rule):
+            alert = open_alerts.get(rule)
+            if alert is None:
+                alert = db.query(models.SPCAlert).filter(
+                    models.SPCAlert.target_id == state.target_id,
+                    models.SPCAlert.rule == rule
+                ).order_by(models.SPCAlert.id.desc()).first()
+
+        if alert is not None:
+            alert.end_measurement_id = measurement_id
+            alert.end_lot_no = lot_no
+            alert.point_count += 1
+            alert.last_value = value
+        else:
+            start_id, start_lot_no, _ = buffer[-length] if len(buffer) >= length else buffer[0]
+            alert = models.SPCAlert(
+                target_id=state.target_id,
+                rule=rule,
+                description=description,
+                start_measurement_id=start_id,
+                end_measurement_id=measurement_id,
+                start_lot_no=start_lot_no,
+                end_lot_no=lot_no,
+                point_count=length,
+                last_value=value
+            )
+            db.add(alert)
+
+        open_alerts[rule] = alert
+        alerts.append(alert)
+
+    return alerts
+
+def _baseline_expired(state: models.SPCDetectorState) -> bool:
+    """
+    기준 기간으로 산출한 한계선이 BASELINE_REFRESH_HOURS보다 오래되었는지 여부 (고정 한계선은 만료 없음)
+    """
+    if state.limits_source != "baseline" or state.limits_computed_at is None:
+        return False
+    return state.limits_computed_at < datetime.now() - timedelta(hours=BASELINE_REFRESH_HOURS)
+
+def record_measurements(db: Session, target_id: int, measurements: List[models.Measurement]) -> List[models.SPCAlert]:
+    """
+    새로 추가된(flush된) 측정 데이터를 입력 순서대로 상태에 반영
+    커밋은 호출한 쪽의 트랜잭션에서 수행
+    """
+    if not measurements:
+        return []
+
+    state = _load_state(db, target_id, create=True)
+    if state.cl is None or _baseline_expired(state):
+        # 기준 기간 데이터는 한 번만 조회하고, 신규 데이터 이전 구간으로 먼저 재구성
+        rows = _baseline_rows(db, target_id)
+        before_id = min(m.id for m in measurements)
+        rebuild_state(db, target_id, state=state, rows=[row for row in rows if row.id < before_id])
+        if state.cl is None:
+            # 한계선이 아직 없으면 신규 데이터를 포함해 다시 산출 시도
+            rebuild_state(db, target_id, state=state, rows=rows)
+            return []
+
+    buffer = json.loads(state.recent_values or "[]")
+    open_alerts = {}
+    alerts = []
+
+    for m in measurements:
+        previous_mask = state.active_rules or 0
+        rules = _advance_state(state, buffer, m.id, m.lot_no, m.avg_value)
+        if rules:
+            alerts.extend(_record_alerts(db, state, buffer, rules, previous_mask, open_alerts))
+        state.active_rules = _rules_to_mask(rules)
+
+    state.recent_values = json.dumps(buffer, ensure_ascii=False)
+
+    return alerts
+
+def record_measurement(db: Session, measurement: models.Measurement) -> List[models.SPCAlert]:
+    """
+    단일 측정 데이터를 상태에 반영
+    """
+    return record_measurements(db, measurement.target_id, [measurement])
+
+def reset_state(db: Session, target_id: int):
+    """
+    과거 데이터가 수정/삭제된 경우 상태를 폐기 (다음 입력 시 재구성)
+    """
+    db.query(models.SPCDetectorState).filter(
+        models.SPCDetectorState.target_id == target_id
+    ).delete(synchronize_session=False)
+
+def alert_to_dict(alert: models.SPCAlert) -> Dict[str, Any]:
+    return {
+        "id": alert.id,
+        "target_id": alert.target_id,
+        "rule": alert.rule,
+        "description": alert.description,
+        "start_measurement_id": alert.start_measurement_id,
+        "end_measurement_id": alert.end_measurement_id,
+        "start_lot_no": alert.start_lot_no,
+        "end_lot_no": alert.end_lot_no,
+        "point_count": alert.point_count,
+        "last_value": alert.last_value,
+        "created_at": alert.created_at.isoformat() if alert.created_at else None,
+        "updated_at": alert.updated_at.isoformat() if alert.updated_at else None
+    }
+
+def get_alerts(db: Session, target_id: Optional[int] = None, days: Optional[int] = None, limit: int = 100) -> List[Dict[str, Any]]:
+    """
+    입력 시점에 기록된 SPC 알림 조회 (최신순)
+    """
+    query = db.query(models.SPCAlert)
+
+    if target_id:
+        query = query.filter(models.SPCAlert.target_id == target_id)
+    if days:
+        query = query.filter(models.SPCAlert.created_at >= datetime.now() - timedelta(days=days))
+
+    alerts = query.order_by(models.SPCAlert.id.desc()).limit(limit).all()
+    return [alert_to_dict(alert) for alert in alerts]
+
+def get_state_summary(db: Session, target_id: int) -> Optional[Dict[str, Any]]:
+    """
+    타겟의 현재 판정 상태 요약
+    """
+    state = db.query(models.SPCDetectorState).filter(
+        models.SPCDetectorState.target_id == target_id
+    ).first()
+
+    if state is None:
+        return None
+
+    return {
+        "target_id": target_id,
+        "control_limits": {
+            "cl": state.cl,
+            "ucl": state.ucl,
+            "lcl": state.lcl
+        },
+        "control_limit_source": {
+            "source": state.limits_source,
+            "version": state.limits_version,
+            "baseline_days": BASELINE_DAYS if state.limits_source == "baseline" else None,
+            "computed_at": state.limits_computed_at.isoformat() if state.limits_computed_at else None
+        },
+        "sample_count": state.sample_count,
+        "last_measurement_id": state.last_measurement_id,
+        "last_value": state.last_value,
+        "active_rules": [rule for rule in spc.NELSON_RULES if state.active_rules & (1 << rule)],
+        "updated_at": (state.updated_at or state.created_at).isoformat() if (state.updated_at or state.created_at) else None
+    }
@@ -0,0 +1,149 @@
+"""
+DICD 측정 관리 시스템 - 활성 SPEC 캐시
+타겟별 활성 SPEC을 프로세스 내에 보관하여 측정 데이터 입력, SPC 분석, 통계, 보고서 생성 시
+매번 SPEC을 다시 조회하지 않도록 합니다. SPEC이 없는 타겟도 캐시합니다.
+
+crud.py의 SPEC 생성, 수정, 활성화, 삭제 함수는 같은 트랜잭션에서 bump_version()으로
+cache_versions 테이블의 버전을 올리고, 커밋 후 invalidate()로 해당 타겟의 캐시를 지웁니다.
+다른 워커 프로세스는 VERSION_CHECK_INTERVAL초마다 버전을 확인하여 바뀌었으면 캐시를 비웁니다.
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Optional
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..database import models
+
+CACHE_NAME = "specs"
+
+# 다른 워커 프로세스의 변경을 확인하는 주기(초)
+VERSION_CHECK_INTERVAL = 5
+
+@dataclass(frozen=True)
+class CachedSpec:
+    """
+    세션과 무관하게 공유할 수 있는 활성 SPEC 사본 (schemas.spec.Spec과 같은 필드)
+    """
+    id: int
+    target_id: int
+    lsl: float
+    usl: float
+    is_active: bool
+    reason: Optional[str]
+    created_at: datetime
+    updated_at: Optional[datetime]
+
+_lock = threading.Lock()
+_entries: Dict[int, Optional[CachedSpec]] = {}
+_version = None  # 캐시 내용이 기준으로 하는 DB 버전
+_checked_at = 0.0
+_generation = 0  # 로컬 무효화 횟수 (조회 중에 무효화되었으면 결과를 보관하지 않음)
+
+def _read_version(db: Session) -> int:
+    row = db.query(models.CacheVersion.version).filter(models.CacheVersion.name == CACHE_NAME).first()
+    return row.version if row else 0
+
+def get_version(db: Session) -> int:
+    """
+    SPEC 변경 버전 (생성, 수정, 활성화, 삭제 시 증가)
+    """
+    return _read_version(db)
+
+def _apply_version(version: int):
+    """
+    더 새로운 DB 버전을 확인하면 캐시 전체 삭제 (_lock을 잡은 상태에서 호출)
+    """
+    global _version, _generation
+    if _version is None or version > _version:
+        _entries.clear()
+        _generation += 1
+        _version = version
+
+def bump_version(db: Session) -> int:
+    """
+    SPEC 변경을 다른 워커 프로세스에 알리기 위해 버전 증가 후 새 버전 반환
+    커밋은 호출한 쪽의 트랜잭션에서 수행하고, 커밋 후 새 버전으로 invalidate() 호출
+    """
+    query = db.query(models.CacheVersion).filter(models.CacheVersion.name == CACHE_NAME)
+    if not query.update({"version": models.CacheVersion.version + 1}, synchronize_session=False):
+        try:
+            with db.begin_nested():
+                db.add(models.CacheVersion(name=CACHE_NAME, version=1))
+        except IntegrityError:
+            # 다른 요청이 동시에 처음 버전 행을 추가한 경우
+            query.update({"version": models.CacheVersion.version + 1}, synchronize_session=False)
+    return _read_version(db)
+
+def invalidate(*target_ids: int, version: Optional[int] = None):
+    """
+    커밋 후 해당 타겟의 캐시 삭제 (타겟을 지정하지 않으면 전체 삭제)
+    version은 bump_version()이 반환한 새 버전
+    """
+    global _generation
+    with _lock:
+        _generation += 1
+        if target_ids:
+            for target_id in target_ids:
+                _entries.pop(target_id, None)
+        else:
+            _entries.clear()
+        if version is not None:
+            _apply_version(version)
+
+def _check_version(db: Session):
+    """
+    VERSION_CHECK_INTERVAL초마다 DB의 버전을 확인하고 바뀌었으면 캐시 전체 삭제
+    """
+    global _checked_at
+    now = time.monotonic()
+    with _lock:
+        if _version is not None and now - _checked_at < VERSION_CHECK_INTERVAL:
+            return
+
+    version = _read_version(db)
+    with _lock:
+        _apply_version(version)
+        _checked_at = now
+
+def get_active_spec(db: Session, target_id: int) -> Optional[CachedSpec]:
+    """
+    타겟의 활성 SPEC (없으면 None)
+    """
+    _check_version(db)
+
+    with _lock:
+        if target_id in _entries:
+            return _entries[target_id]
+        generation = _generation
+
+    # 버전을 먼저 읽어 SPEC과 같은 시점의 버전인지 확인
+    # (트랜잭션의 읽기 스냅샷이 오래되어 변경 전 SPEC을 읽은 경우 보관하지 않음)
+    version = _read_version(db)
+    spec = db.query(models.Spec).filter(
+        models.Spec.target_id == target_id,
+        models.Spec.is_active == True
+    ).first()
+
+    entry = None
+    if spec is not None:
+        entry = CachedSpec(
+            id=spec.id,
+            target_id=spec.target_id,
+            lsl=spec.lsl,
+            usl=spec.usl,
+            is_active=spec.is_active,
+            reason=spec.reason,
+            created_at=spec.created_at,
+            updated_at=spec.updated_at
+        )
+
+    with _lock:
+        _apply_version(version)
+        if _generation == generation and version == _version:
+            _entries[target_id] = entry
+
+    return entry
@@ -1,14 +1,94 @@
 import statistics
 import math
-from typing import List, Dict, Any, Optional
+import numpy as np
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Tuple
+from sqlalchemy import func, case, and_
 from sqlalchemy.orm import Session
 from ..database import models
+from .dataset import load_measurement_dataset, POSITIONS, SERIES, SERIES_COLUMNS
+from . import rollups, spec_cache, result_cache
 
-def calculate_basic_statistics(values: List[float]) -> Dict[str, float]:
+def calculate_capability_arrays(avg, std_dev, lsl: float, usl: float) -> Dict[str, np.ndarray]:
     """
-    기본 통계값 계산 (평균, 표준편차, 최소값, 최대값, 범위)
+    열별 평균/표준편차 배열로부터 공정능력지수(Cp, Cpk, Cpu, Cpl) 배열 계산
+    표준편차가 0인 열은 무한대
+    """
+    avg = np.asarray(avg, dtype=np.float64)
+    std_dev = np.asarray(std_dev, dtype=np.float64)
+    spread = std_dev > 0
+    
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # Cp: 규격 폭 대비 공정 산포 비율 (6시그마)
+        cp = np.where(spread, (usl - lsl) / (6 * std_dev), np.inf)
+        # Cpk: 편중까지 고려한 공정능력지수
+        cpu = np.where(spread, (usl - avg) / (3 * std_dev), np.inf)
+        cpl = np.where(spread, (avg - lsl) / (3 * std_dev), np.inf)
+    
+    return {
+        "cp": cp,
+        "cpk": np.minimum(cpu, cpl),
+        "cpu": cpu,
+        "cpl": cpl
+    }
+
+def calculate_series_statistics(matrix, lsl: Optional[float] = None, usl: Optional[float] = None,
+                                sigma_level: int = 3) -> Dict[str, np.ndarray]:
+    """
+    (n × 열 수) 측정값 행렬(보통 평균값 + 위치별 값의 n × 6)의 열별 통계를 한 번의 벡터 연산으로 계산
+    
+    반환값: 통계 이름 -> 열별 값 배열
+        count, avg, std_dev(표본), min, max, range, median,
+        cl, ucl, lcl (관리 한계선), skewness, kurtosis (분포 통계),
+        cp, cpk, cpu, cpl (lsl, usl이 모두 지정된 경우)
+    샘플이 부족한 항목은 호출한 쪽에서 count로 판단 (기본 통계 1개, 관리 한계선/공정능력 2개, 분포 통계 3개 이상)
+    """
+    matrix = np.asarray(matrix, dtype=np.float64)
+    if matrix.ndim == 1:
+        matrix = matrix[:, np.newaxis]
+    n, columns = matrix.shape
+    
+    kernel = {"count": n}
+    if n == 0:
+        return kernel
+    
+    avg = matrix.mean(axis=0)
+    deviations = matrix - avg
+    # 중심화한 편차의 거듭제곱 합 (분산, 왜도, 첨도에 공통 사용)
+    squared = deviations * deviations
+    m2 = squared.sum(axis=0)
+    std_dev = np.sqrt(m2 / (n - 1)) if n > 1 else np.zeros(columns)
+    min_val = matrix.min(axis=0)
+    max_val = matrix.max(axis=0)
+    
+    kernel.update({
+        "avg": avg,
+        "std_dev": std_dev,
+        "min": min_val,
+        "max": max_val,
+        "range": max_val - min_val,
+        "median": np.median(matrix, axis=0),
+        # 관리 한계선
+        "cl": avg,
+        "ucl": avg + sigma_level * std_dev,
+        "lcl": avg - sigma_level * std_dev
+    })
+    
+    # 왜도, 첨도 (정규분포의 첨도가 0이 되도록 조정한 Excess Kurtosis)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        kernel["skewness"] = (deviations * squared).sum(axis=0) / n / std_dev ** 3
+        kernel["kurtosis"] = (squared * squared).sum(axis=0) / n / std_dev ** 4 - 3
+    
+    if lsl is not None and usl is not None:
+        kernel.update(calculate_capability_arrays(avg, std_dev, lsl, usl))
+    
+    return kernel
+
+def basic_statistics_at(kernel: Dict[str, Any], column: int) -> Dict[str, float]:
+    """
+    calculate_series_statistics 결과에서 한 열의 기본 통계값 (평균, 표준편차, 최소값, 최대값, 범위)
     """
-    if not values:
+    if kernel["count"] == 0:
         return {
             "avg": None,
             "std_dev": None,
@@ -17,112 +97,70 @@ def calculate_basic_statistics(values: List[float]) -> Dict[str, float]:
             "range": None
         }
     
-    avg = statistics.mean(values)
-    std_dev = statistics.stdev(values) if len(values) > 1 else 0
-    min_val = min(values)
-    max_val = max(values)
-    range_val = max_val - min_val
-    
     return {
-        "avg": round(avg, 3),
-        "std_dev": round(std_dev, 3),
-        "min": round(min_val, 3),
-        "max": round(max_val, 3),
-        "range": round(range_val, 3)
+        key: round(float(kernel[key][column]), 3)
+        for key in ("avg", "std_dev", "min", "max", "range")
     }
 
-def calculate_process_capability(values: List[float], lsl: float, usl: float) -> Dict[str, float]:
+def process_capability_at(kernel: Dict[str, Any], column: int) -> Dict[str, float]:
     """
-    공정능력지수 계산 (Cp, Cpk, Pp, Ppk)
+    calculate_series_statistics 결과에서 한 열의 공정능력지수 (Cp, Cpk, Pp, Ppk, Cpu, Cpl)
     """
-    if not values or len(values) < 2:
+    if kernel["count"] < 2:
         return {
             "cp": None,
             "cpk": None,
             "pp": None,
             "ppk": None
         }
-    
-    # 기본 통계값 계산
-    avg = statistics.mean(values)
-    std_dev = statistics.stdev(values)
-    
-    # 규격 폭
-    spec_width = usl - lsl
-    
-    # Cp: 규격 폭 대비 공정 산포 비율 (6시그마)
-    cp = spec_width / (6 * std_dev) if std_dev > 0 else float('inf')
-    
-    # Cpk: 편중까지 고려한 공정능력지수
-    cpu = (usl - avg) / (3 * std_dev) if std_dev > 0 else float('inf')
-    cpl = (avg - lsl) / (3 * std_dev) if std_dev > 0 else float('inf')
-    cpk = min(cpu, cpl)
+    return _capability_at(kernel, column)
+
+def _capability_at(capability: Dict[str, np.ndarray], column: int) -> Dict[str, float]:
+    cp = round(float(capability["cp"][column]), 3)
+    cpk = round(float(capability["cpk"][column]), 3)
     
     # Pp, Ppk: 장기 공정능력지수 (여기서는 Cp, Cpk와 동일하게 계산)
-    pp = cp
-    ppk = cpk
-    
     return {
-        "cp": round(cp, 3),
-        "cpk": round(cpk, 3),
-        "pp": round(pp, 3),
-        "ppk": round(ppk, 3),
-        "cpu": round(cpu, 3),
-        "cpl": round(cpl, 3)
+        "cp": cp,
+        "cpk": cpk,
+        "pp": cp,
+        "ppk": cpk,
+        "cpu": round(float(capability["cpu"][column]), 3),
+        "cpl": round(float(capability["cpl"][column]), 3)
     }
 
-def get_process_statistics(db: Session, target_id: int, start_date=None, end_date=None) -> Dict[str, Any]:
+def calculate_basic_statistics(values: List[float]) -> Dict[str, float]:
     """
-    특정 타겟에 대한 공정 통계 계산
+    기본 통계값 계산 (평균, 표준편차, 최소값, 최대값, 범위)
+    """
+    return basic_statistics_at(calculate_series_statistics(values), 0)
+
+def calculate_process_capability(values: List[float], lsl: float, usl: float) -> Dict[str, float]:
+    """
+    공정능력지수 계산 (Cp, Cpk, Pp, Ppk)
+    """
+    return process_capability_at(calculate_series_statistics(values, lsl, usl), 0)
+
+def calculate_capability_from_moments(avg: float, std_dev: float, lsl: float, usl: float) -> Dict[str, float]:
+    """
+    평균과 표준편차로부터 공정능력지수 계산 (DB 집계값, 일별 집계 등 원시 데이터가 없는 경우에도 사용)
+    """
+    return _capability_at(calculate_capability_arrays([avg], [std_dev], lsl, usl), 0)
+
+def _statistics_result(target_id: int, kernel: Dict[str, Any], lsl: float, usl: float) -> Dict[str, Any]:
+    """
+    시계열별(SERIES 순서) 통계 배열로부터 공정 통계 결과 생성
     """
-    # 쿼리 설정
-    query = db.query(models.Measurement).filter(models.Measurement.target_id == target_id)
-    
-    if start_date:
-        query = query.filter(models.Measurement.created_at >= start_date)
-    if end_date:
-        query = query.filter(models.Measurement.created_at <= end_date)
-    
-    measurements = query.all()
-    
-    # 측정값 추출
-    all_values = []
-    position_values = {
-        "top": [],
-        "center": [],
-        "bottom": [],
-        "left": [],
-        "right": []
-    }
-    
-    for m in measurements:
-        all_values.append(m.avg_value)
-        position_values["top"].append(m.value_top)
-        position_values["center"].append(m.value_center)
-        position_values["bottom"].append(m.value_bottom)
-        position_values["left"].append(m.value_left)
-        position_values["right"].append(m.value_right)
-    
-    # 활성 SPEC 가져오기
-    active_spec = db.query(models.Spec).filter(
-        models.Spec.target_id == target_id,
-        models.Spec.is_active == True
-    ).first()
-    
-    lsl = active_spec.lsl if active_spec else None
-    usl = active_spec.usl if active_spec else None
-    
-    # 결과 생성
     result = {
         "target_id": target_id,
-        "sample_count": len(measurements),
-        "overall_statistics": calculate_basic_statistics(all_values)
+        "sample_count": kernel["count"],
+        "overall_statistics": basic_statistics_at(kernel, 0)
     }
     
     # 위치별 통계
     result["position_statistics"] = {}
-    for position, values in position_values.items():
-        result["position_statistics"][position] = calculate_basic_statistics(values)
+    for i, position in enumerate(POSITIONS, start=1):
+        result["position_statistics"][position] = basic_statistics_at(kernel, i)
     
     # 공정능력지수
     if lsl is not None and usl is not None:
@@ -131,71 +169,286 @@ def get_process_statistics(db: Session, target_id: int, start_date=None, end_dat
             "usl": usl,
             "target": (lsl + usl) / 2
         }
-        result["process_capability"] = calculate_process_capability(all_values, lsl, usl)
+        result["process_capability"] = process_capability_at(kernel, 0)
         
         # 위치별 공정능력
         result["position_capability"] = {}
-        for position, values in position_values.items():
-            result["position_capability"][position] = calculate_process_capability(values, lsl, usl)
+        for i, position in enumerate(POSITIONS, start=1):
+            result["position_capability"][position] = process_capability_at(kernel, i)
     
     return result
 
-def get_boxplot_data(db: Session, target_id: int, group_by: str, start_date=None, end_date=None) -> Dict[str, Any]:
+def _statistics_from_moments(target_id: int, sample_count: int, moments: Dict[str, Any], lsl: float, usl: float) -> Dict[str, Any]:
     """
-    박스플롯 분석을 위한 데이터 계산
-    group_by: 'equipment' 또는 'device'
+    시계열별 평균/표준편차/최소/최대로부터 get_process_statistics와 동일한 형식의 결과 생성
+    """
+    kernel = {"count": sample_count}
+    if sample_count > 0:
+        for key in ("avg", "std_dev", "min", "max"):
+            kernel[key] = np.array([moments[name][key] for name in SERIES], dtype=np.float64)
+        kernel["range"] = kernel["max"] - kernel["min"]
+        if lsl is not None and usl is not None:
+            kernel.update(calculate_capability_arrays(kernel["avg"], kernel["std_dev"], lsl, usl))
+    
+    return _statistics_result(target_id, kernel, lsl, usl)
+
+def get_process_statistics(db: Session, target_id: int, start_date=None, end_date=None,
+                           watermark: Optional[Tuple] = None) -> Dict[str, Any]:
+    """
+    특정 타겟에 대한 공정 통계 계산 (같은 데이터에 대한 반복 조회는 result_cache의 결과 사용)
+    watermark: 같은 기간으로 이미 구한 result_cache.get_watermark() 값 (없으면 조회)
+    """
+    return result_cache.get_or_compute(
+        "statistics",
+        target_id,
+        result_cache.window_key(start_date, end_date, datetime.now()),
+        (),
+        watermark or result_cache.get_watermark(db, target_id, start_date, end_date),
+        lambda: _process_statistics(db, target_id, start_date, end_date)
+    )
+
+def _process_statistics(db: Session, target_id: int, start_date=None, end_date=None) -> Dict[str, Any]:
+    """
+    공정 통계 계산
+    일 단위로 정렬된 기간(시작이 없거나 자정, 종료가 없거나 23:59:59)은 집계가 완료된 타겟에 한해 일별 집계를 합산하고,
+    그 밖에는 측정 데이터로 계산 (백필하지 않은 타겟의 집계는 과거 데이터가 빠져 있을 수 있음)
+    """
+    if rollups.is_day_aligned(start_date, end_date) and rollups.is_covered(db, target_id):
+        return get_process_statistics_from_rollups(db, target_id, start_date=start_date, end_date=end_date)
+    
+    # 측정 데이터 조회 (필요한 컬럼만 배열로 로드)
+    dataset = load_measurement_dataset(db, target_id, start_date=start_date, end_date=end_date)
+    
+    return calculate_dataset_statistics(db, target_id, dataset)
+
+def calculate_dataset_statistics(db: Session, target_id: int, dataset: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    이미 로드한 측정 데이터셋(dataset.load_measurement_dataset)의 공정 통계 (보고서 등, 결과 캐시 미사용)
+    """
+    # 활성 SPEC 가져오기
+    active_spec = spec_cache.get_active_spec(db, target_id)
+    
+    lsl = active_spec.lsl if active_spec else None
+    usl = active_spec.usl if active_spec else None
+    
+    # 평균값 + 위치별 값 (n × 6) 행렬의 통계를 한 번에 계산
+    kernel = calculate_series_statistics(dataset["matrix"], lsl, usl)
+    
+    return _statistics_result(target_id, kernel, lsl, usl)
+
+def get_process_statistics_pushdown(db: Session, target_id: int, start_date=None, end_date=None) -> Dict[str, Any]:
     """
-    # 쿼리 설정
-    query = db.query(models.Measurement).filter(models.Measurement.target_id == target_id)
+    특정 타겟에 대한 공정 통계 계산 (DB 집계 방식)
+    평균값과 위치별 값의 COUNT/AVG/STDDEV_SAMP/MIN/MAX 및 SPEC 내 개수를 하나의 집계 쿼리로 계산하므로
+    기간이 길어져도 애플리케이션 서버로 원시 데이터를 가져오지 않음
+    """
+    # 활성 SPEC 가져오기 (SPEC 내 개수 집계에 필요)
+    active_spec = spec_cache.get_active_spec(db, target_id)
+    
+    lsl = active_spec.lsl if active_spec else None
+    usl = active_spec.usl if active_spec else None
+    
+    # 시계열별 집계 컬럼 구성
+    aggregates = [func.count(models.Measurement.id)]
+    for name in SERIES:
+        column = SERIES_COLUMNS[name]
+        aggregates.extend([
+            func.avg(column),
+            func.stddev_samp(column),
+            func.min(column),
+            func.max(column)
+        ])
+        if active_spec:
+            aggregates.append(func.sum(case((column.between(lsl, usl), 1), else_=0)))
+    
+    query = db.query(models.Measurement.target_id, *aggregates).filter(
+        models.Measurement.target_id == target_id
+    )
     
     if start_date:
         query = query.filter(models.Measurement.created_at >= start_date)
-    
     if end_date:
         query = query.filter(models.Measurement.created_at <= end_date)
     
-    measurements = query.all()
+    row = query.group_by(models.Measurement.target_id).first()
+    
+    sample_count = int(row[1]) if row else 0
+    per_series = 5 if active_spec else 4
+    
+    # 시계열별 집계값 정리
+    moments = {}
+    for i, name in enumerate(SERIES):
+        offset = 2 + i * per_series
+        if sample_count == 0:
+            moments[name] = None
+            continue
+        
+        avg, std_dev, min_val, max_val = row[offset:offset + 4]
+        moments[name] = {
+            "avg": float(avg),
+            # 표본이 1개이면 STDDEV_SAMP는 NULL
+            "std_dev": float(std_dev) if std_dev is not None else 0.0,
+            "min": float(min_val),
+            "max": float(max_val),
+            "in_spec_count": int(row[offset + 4] or 0) if active_spec else None
+        }
+    
+    # 결과 생성 (get_process_statistics와 동일한 형식)
+    result = _statistics_from_moments(target_id, sample_count, moments, lsl, usl)
+    
+    # SPEC 내 개수
+    if lsl is not None and usl is not None and sample_count > 0:
+        result["in_spec"] = {
+            name: {
+                "count": moments[name]["in_spec_count"],
+                "ratio": round(moments[name]["in_spec_count"] / sample_count, 4)
+            }
+            for name in SERIES
+        }
+    
+    return result
+
+def get_process_statistics_from_rollups(db: Session, target_id: int, start_date=None, end_date=None) -> Dict[str, Any]:
+    """
+    특정 타겟에 대한 공정 통계 계산 (일별 집계 방식)
+    하루 전체가 포함되는 일자는 measurement_daily_rollups를 합산하고 기간 경계의 일부 일자만 측정 데이터에서 집계
+    """
+    sums = rollups.get_window_sums(db, target_id, start_date=start_date, end_date=end_date)
+    moments = rollups.sums_to_moments(sums)
+    
+    # 활성 SPEC 가져오기
+    active_spec = spec_cache.get_active_spec(db, target_id)
     
-    if not measurements:
+    lsl = active_spec.lsl if active_spec else None
+    usl = active_spec.usl if active_spec else None
+    
+    return _statistics_from_moments(target_id, sums["count"], moments, lsl, usl)
+
+def get_cpk_heatmap(db: Session, start_date=None, product_group_id: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    전체 타겟의 공정능력지수(Cp, Cpk)와 샘플 수 계산 (대시보드 히트맵용)
+    타겟-공정-제품군과 활성 SPEC, 기간 내 측정 데이터를 조인한 하나의 집계 쿼리로 처리
+    측정 데이터가 없는 타겟도 cp/cpk가 None인 항목으로 포함
+    """
+    # 기간 조건은 외부 조인 조건에 포함 (데이터가 없는 타겟도 결과에 남도록)
+    measurement_join = models.Measurement.target_id == models.Target.id
+    if start_date:
+        measurement_join = and_(measurement_join, models.Measurement.created_at >= start_date)
+    
+    group_columns = [
+        models.ProductGroup.id,
+        models.ProductGroup.name,
+        models.Process.id,
+        models.Process.name,
+        models.Target.id,
+        models.Target.name,
+        models.Spec.lsl,
+        models.Spec.usl
+    ]
+    
+    query = db.query(
+        *group_columns,
+        func.count(models.Measurement.id),
+        func.avg(models.Measurement.avg_value),
+        func.stddev_samp(models.Measurement.avg_value)
+    ).select_from(models.Target).join(
+        models.Process, models.Target.process_id == models.Process.id
+    ).join(
+        models.ProductGroup, models.Process.product_group_id == models.ProductGroup.id
+    ).outerjoin(
+        models.Spec, and_(models.Spec.target_id == models.Target.id, models.Spec.is_active == True)
+    ).outerjoin(
+        models.Measurement, measurement_join
+    )
+    
+    if product_group_id:
+        query = query.filter(models.ProductGroup.id == product_group_id)
+    
+    rows = query.group_by(*group_columns).order_by(
+        models.ProductGroup.id, models.Process.id, models.Target.id
+    ).all()
+    
+    items = []
+    seen_targets = set()
+    for (group_id, group_name, process_id, process_name, target_id, target_name,
+         lsl, usl, sample_count, avg, std_dev) in rows:
+        # 활성 SPEC이 중복된 경우 첫 번째 SPEC만 사용
+        if target_id in seen_targets:
+            continue
+        seen_targets.add(target_id)
+        
+        item = {
+            "product_group_id": group_id,
+            "product_group": group_name,
+            "process_id": process_id,
+            "process": process_name,
+            "target_id": target_id,
+            "target": target_name,
+            "sample_count": int(sample_count or 0),
+            "avg": round(float(avg), 3) if avg is not None else None,
+            "std_dev": round(float(std_dev), 3) if std_dev is not None else None,
+            "lsl": lsl,
+            "usl": usl,
+            "cp": None,
+            "cpk": None
+        }
+        
+        if lsl is not None and usl is not None and item["sample_count"] >= 2:
+            capability = calculate_capability_from_moments(float(avg), float(std_dev or 0), lsl, usl)
+            item["cp"] = capability["cp"]
+            item["cpk"] = capability["cpk"]
+        
+        items.append(item)
+    
+    return items
+
+def get_boxplot_data(db: Session, target_id: int, group_by: str, start_date=None, end_date=None) -> Dict[str, Any]:
+    """
+    박스플롯 분석을 위한 데이터 계산
+    group_by: 'equipment' 또는 'device'
+    """
+    # 측정 데이터 조회 (그룹화에 필요한 컬럼 포함)
+    equipment_columns = [
+        ("coating_equipment_id", "코팅"),
+        ("exposure_equipment_id", "노광"),
+        ("development_equipment_id", "현상")
+    ]
+    dataset = load_measurement_dataset(
+        db, target_id, start_date=start_date, end_date=end_date,
+        extra_columns=["device"] + [column for column, _ in equipment_columns]
+    )
+    
+    if dataset["count"] == 0:
         return {"target_id": target_id, "groups": []}
     
+    avg_values = dataset["series"]["avg"].tolist()
+    
     # 그룹화 기준에 따라 데이터 정리
     groups = {}
     
     if group_by == 'equipment':
-        # 장비 ID별로 그룹화
-        for m in measurements:
-            # 각 장비 유형별로 처리
-            if m.coating_equipment_id:
-                equipment = db.query(models.Equipment).filter(models.Equipment.id == m.coating_equipment_id).first()
-                if equipment:
-                    key = f"코팅: {equipment.name}"
-                    if key not in groups:
-                        groups[key] = []
-                    groups[key].append(m.avg_value)
-            
-            if m.exposure_equipment_id:
-                equipment = db.query(models.Equipment).filter(models.Equipment.id == m.exposure_equipment_id).first()
-                if equipment:
-                    key = f"노광: {equipment.name}"
-                    if key not in groups:
-                        groups[key] = []
-                    groups[key].append(m.avg_value)
-            
-            if m.development_equipment_id:
-                equipment = db.query(models.Equipment).filter(models.Equipment.id == m.development_equipment_id).first()
-                if equipment:
-                    key = f"현상: {equipment.name}"
+        # 장비 이름은 한 번에 조회
+        equipment_names = {
+            equipment.id: equipment.name
+            for equipment in db.query(models.Equipment.id, models.Equipment.name).all()
+        }
+        
+        # 장비 ID별로 그룹화 (각 장비 유형별로 처리)
+        for i, avg_value in enumerate(avg_values):
+            for column, label in equipment_columns:
+                equipment_id = dataset[column][i]
+                if equipment_id and equipment_id in equipment_names:
+                    key = f"{label}: {equipment_names[equipment_id]}"
                     if key not in groups:
                         groups[key] = []
-                    groups[key].append(m.avg_value)
+                    groups[key].append(avg_value)
     
     elif group_by == 'device':
         # 디바이스별로 그룹화
-        for m in measurements:
-            if m.device not in groups:
-                groups[m.device] = []
-            groups[m.device].append(m.avg_value)
+        for device, avg_value in zip(dataset["device"], avg_values):
+            if device not in groups:
+                groups[device] = []
+            groups[device].append(avg_value)
     
     # 결과 데이터 구성
     result_groups = []
@@ -243,10 +496,7 @@ def get_boxplot_data(db: Session, target_id: int, group_by: str, start_date=None
     target = db.query(models.Target).filter(models.Target.id == target_id).first()
     
     # 활성 SPEC 가져오기
-    spec = db.query(models.Spec).filter(
-        models.Spec.target_id == target_id,
-        models.Spec.is_active == True
-    ).first()
+    spec = spec_cache.get_active_spec(db, target_id)
     
     result = {
         "target_id": target_id,
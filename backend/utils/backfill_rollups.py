@@ -0,0 +1,78 @@
+"""
+DICD 측정 관리 시스템 - 일별 집계 백필 스크립트
+
+기존 측정 데이터로 measurement_daily_rollups 테이블을 채웁니다.
+일별 집계가 도입되기 전에 입력된 데이터가 있으면 한 번 실행해야 하며, 다시 실행해도 같은 결과가 됩니다.
+타겟 단위로 커밋하므로 중간에 중단되어도 다시 실행하면 됩니다.
+전체 기간을 집계한 타겟은 집계 완료가 기록되어 공정 통계가 일 단위 기간을 집계로 계산합니다 (--days 지정 시 기록하지 않음).
+
+사용법:
+    python backend/utils/backfill_rollups.py                  # 전체 타겟, 전체 기간
+    python backend/utils/backfill_rollups.py --target-id 3    # 특정 타겟만
+    python backend/utils/backfill_rollups.py --days 90        # 최근 90일만
+"""
+
+import sys
+import os
+import argparse
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from datetime import date, timedelta
+from typing import Optional
+from sqlalchemy.orm import Session
+
+from backend.database import database, models
+from backend.services import rollups
+
+def backfill_rollups(db: Session, target_id: Optional[int] = None, days: Optional[int] = None) -> int:
+    """
+    타겟별 일별 집계를 측정 데이터로부터 다시 계산하고 갱신한 일자 수 반환
+    """
+    start_day = date.today() - timedelta(days=days) if days else None
+
+    if start_day is None:
+        # 전체 기간이면 데이터가 없는 타겟도 집계 완료로 기록
+        query = db.query(models.Target.id.label("target_id"))
+        if target_id:
+            query = query.filter(models.Target.id == target_id)
+    else:
+        query = db.query(models.Measurement.target_id).distinct()
+        if target_id:
+            query = query.filter(models.Measurement.target_id == target_id)
+    target_ids = sorted(row.target_id for row in query.all())
+
+    if not target_ids:
+        print("집계할 타겟이 없습니다.")
+        return 0
+
+    total = 0
+    for current_target_id in target_ids:
+        count = rollups.rebuild_daily_rollups(db, current_target_id, start_day=start_day)
+        db.commit()
+        total += count
+        print(f"타겟 {current_target_id}: {count}일 집계 완료")
+
+    print(f"\n{len(target_ids)}개 타겟, {total}일의 집계가 갱신되었습니다.")
+    return total
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="측정 데이터 일별 집계 백필")
+    parser.add_argument("--target-id", type=int, help="대상 타겟 ID (기본: 전체)")
+    parser.add_argument("--days", type=int, help="최근 일수 (기본: 전체 기간)")
+    args = parser.parse_args()
+
+    # 집계 테이블이 없으면 생성
+    models.Base.metadata.create_all(
+        bind=database.engine,
+        tables=[models.MeasurementDailyRollup.__table__, models.CacheVersion.__table__]
+    )
+
+    db = database.SessionLocal()
+    try:
+        backfill_rollups(db, target_id=args.target_id, days=args.days)
+    except Exception as e:
+        db.rollback()
+        print(f"오류 발생: {e}")
+        sys.exit(1)
+    finally:
+        db.close()
@@ -0,0 +1,34 @@
+"""
+DICD 측정 관리 시스템 - 검색 색인 백필 스크립트
+
+기존 측정 데이터의 DEVICE / LOT NO / WAFER NO 고유 값을 검색어 사전(search_terms)과
+트라이그램 색인(search_term_grams)에 추가합니다. 이미 색인된 값은 건너뛰므로 다시 실행해도 됩니다.
+
+사용법:
+    python backend/utils/backfill_search_index.py
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from backend.database import database, models
+from backend.services import search_index
+
+if __name__ == "__main__":
+    # 색인 테이블이 없으면 생성
+    models.Base.metadata.create_all(
+        bind=database.engine,
+        tables=[models.SearchTerm.__table__, models.SearchTermGram.__table__]
+    )
+
+    db = database.SessionLocal()
+    try:
+        added = search_index.rebuild_search_index(db)
+        print(f"{added}개의 검색어가 색인되었습니다.")
+    except Exception as e:
+        db.rollback()
+        print(f"오류 발생: {e}")
+        sys.exit(1)
+    finally:
+        db.close()
@@ -6,11 +6,19 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(
 
 from sqlalchemy.orm import Session
 from backend.database import models, database
+from backend.services import rollups
 
 def clear_database(db: Session):
     try:
         # 삭제 순서는 외래 키 제약 조건 때문에 중요함 (자식->부모 순)
         db.query(models.SPCAlert).delete()
+        db.query(models.SPCDetectorState).delete()
+        db.query(models.ControlLimit).delete()
+        db.query(models.MeasurementDailyRollup).delete()
+        rollups.clear_coverage(db)
+        db.query(models.ImportJob).delete()
+        db.query(models.SearchTermGram).delete()
+        db.query(models.SearchTerm).delete()
         db.query(models.SPCRuleChange).delete()
         db.query(models.SPCRule).delete()
         db.query(models.ReportRecipient).delete()
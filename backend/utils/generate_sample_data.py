@@ -9,6 +9,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(
 from sqlalchemy.orm import Session
 from backend.database import models, database
 from backend.schemas import measurement
+from backend.services import rollups
 
 # 랜덤 측정값 생성 함수
 def generate_random_measurement(target_id, equipment_id, base_value=50.0, std_dev=1.0):
@@ -261,6 +262,10 @@ def generate_sample_data(db: Session, target_id: int, equipment_id: int = 1, day
     db.add_all(random_measurements)
     db.add_all(trend_db_measurements)
     db.add_all(outlier_db_measurements)
+    db.flush()
+    
+    # 측정 데이터를 직접 추가/삭제했으므로 일별 집계 재계산
+    rollups.rebuild_daily_rollups(db, target_id)
     db.commit()
     
     print(f"생성된 샘플 데이터: {len(random_measurements) + len(trend_db_measurements) + len(outlier_db_measurements)}개")
@@ -0,0 +1,106 @@
+"""
+DICD 측정 관리 시스템 - 인덱스 마이그레이션 스크립트
+
+models.py에 정의된 인덱스 중 운영 데이터베이스에 없는 인덱스를 추가합니다.
+create_all은 이미 존재하는 테이블을 변경하지 않으므로, 인덱스 정의가 바뀐 뒤에는 이 스크립트를 실행하세요.
+MySQL에서는 ALGORITHM=INPLACE, LOCK=NONE으로 실행하여 서비스 중에도 테이블 잠금 없이 적용됩니다.
+
+사용법:
+    python backend/utils/migrate_indexes.py            # 누락된 인덱스 추가
+    python backend/utils/migrate_indexes.py --dry-run  # 실행할 SQL만 출력
+"""
+
+import sys
+import os
+import argparse
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from typing import List
+from sqlalchemy import inspect, text, Index
+from sqlalchemy.engine import Engine
+
+from backend.database import database, models
+
+def find_missing_indexes(engine: Engine) -> List[Index]:
+    """
+    모델에 정의되어 있지만 데이터베이스에 없는 인덱스 목록 반환
+    같은 컬럼 구성의 인덱스가 이미 있으면 (예: MySQL이 외래 키용으로 자동 생성한 인덱스) 추가하지 않음
+    """
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    missing = []
+
+    for table in models.Base.metadata.sorted_tables:
+        # 테이블이 없으면 create_all이 인덱스와 함께 생성
+        if table.name not in existing_tables:
+            continue
+
+        existing = inspector.get_indexes(table.name)
+        existing_names = {ix["name"] for ix in existing}
+        existing_columns = {tuple(ix["column_names"]) for ix in existing}
+
+        for index in sorted(table.indexes, key=lambda ix: ix.name):
+            columns = tuple(column.name for column in index.columns)
+            if index.name in existing_names or columns in existing_columns:
+                continue
+            missing.append(index)
+
+    return missing
+
+def build_index_statement(engine: Engine, index: Index) -> str:
+    """
+    인덱스 추가 SQL 생성 (MySQL은 온라인 DDL 사용)
+    """
+    preparer = engine.dialect.identifier_preparer
+    columns = ", ".join(preparer.quote(column.name) for column in index.columns)
+    unique = "UNIQUE " if index.unique else ""
+
+    if engine.dialect.name == "mysql":
+        return (
+            f"ALTER TABLE {preparer.quote(index.table.name)} "
+            f"ADD {unique}INDEX {preparer.quote(index.name)} ({columns}), "
+            f"ALGORITHM=INPLACE, LOCK=NONE"
+        )
+
+    return (
+        f"CREATE {unique}INDEX {preparer.quote(index.name)} "
+        f"ON {preparer.quote(index.table.name)} ({columns})"
+    )
+
+def migrate_indexes(engine: Engine, dry_run: bool = False) -> List[str]:
+    """
+    누락된 인덱스를 하나씩 추가하고 실행한 SQL 목록 반환
+    """
+    statements = [build_index_statement(engine, index) for index in find_missing_indexes(engine)]
+
+    if not statements:
+        print("추가할 인덱스가 없습니다.")
+        return statements
+
+    for statement in statements:
+        print(statement)
+        if dry_run:
+            continue
+
+        # DDL은 인덱스마다 별도로 실행 (하나가 실패해도 이미 추가된 인덱스는 유지)
+        with engine.begin() as conn:
+            conn.execute(text(statement))
+        print("  -> 완료")
+
+    if dry_run:
+        print(f"\n{len(statements)}개의 인덱스가 추가될 예정입니다. (dry-run)")
+    else:
+        print(f"\n{len(statements)}개의 인덱스가 추가되었습니다.")
+
+    return statements
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="누락된 데이터베이스 인덱스 추가")
+    parser.add_argument("--dry-run", action="store_true", help="실행할 SQL만 출력")
+    args = parser.parse_args()
+
+    try:
+        migrate_indexes(database.engine, dry_run=args.dry_run)
+    except Exception as e:
+        print(f"오류 발생: {e}")
+        sys.exit(1)
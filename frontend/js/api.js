@@ -10,6 +10,16 @@ class API {
             data: {},
             timeout: 300000 // 5분 캐시 타임아웃
         };
+
+        // 기준 정보 스냅샷 (ETag로 재검증)
+        this.hierarchy = {
+            data: null,
+            index: null,
+            etag: null,
+            checkedAt: 0,
+            pending: null,
+            timeout: 10000 // 10초 이내의 반복 조회는 재검증 없이 사용
+        };
     }
     
     // 캐시 키 생성 메서드
@@ -89,6 +99,9 @@ class API {
                 throw new Error(`HTTP error! Status: ${response.status}`);
             }
             
+            // 기준 정보가 바뀌었을 수 있으므로 다음 조회 시 재검증
+            this.invalidateHierarchy();
+            
             return await response.json();
         } catch (error) {
             console.error('API POST 요청 오류:', error);
@@ -111,6 +124,9 @@ class API {
                 throw new Error(`HTTP error! Status: ${response.status}`);
             }
             
+            // 기준 정보가 바뀌었을 수 있으므로 다음 조회 시 재검증
+            this.invalidateHierarchy();
+            
             return await response.json();
         } catch (error) {
             console.error('API PUT 요청 오류:', error);
@@ -129,6 +145,9 @@ class API {
                 throw new Error(`HTTP error! Status: ${response.status}`);
             }
             
+            // 기준 정보가 바뀌었을 수 있으므로 다음 조회 시 재검증
+            this.invalidateHierarchy();
+            
             return await response.json();
         } catch (error) {
             console.error('API DELETE 요청 오류:', error);
@@ -136,26 +155,113 @@ class API {
         }
     }
     
-    // 제품군 관련 메서드
+    // 기준 정보 스냅샷 조회 (제품군 > 공정 > 타겟 트리와 장비 목록)
+    // 변경이 없으면 서버는 304만 반환하므로 이전 스냅샷 재사용
+    async getHierarchy() {
+        const hierarchy = this.hierarchy;
+        if (hierarchy.data && (Date.now() - hierarchy.checkedAt) < hierarchy.timeout) {
+            return hierarchy.data;
+        }
+        
+        // 동시에 여러 번 호출되면 하나의 요청 공유
+        if (hierarchy.pending) {
+            return hierarchy.pending;
+        }
+        
+        hierarchy.pending = (async () => {
+            const headers = {};
+            if (hierarchy.etag && hierarchy.data) {
+                headers['If-None-Match'] = hierarchy.etag;
+            }
+            
+            const response = await fetch(`${this.baseUrl}${this.endpoints.HIERARCHY}`, { headers });
+            if (response.status !== 304) {
+                if (!response.ok) {
+                    throw new Error(`HTTP error! Status: ${response.status}`);
+                }
+                hierarchy.data = await response.json();
+                hierarchy.etag = response.headers.get('ETag');
+                hierarchy.index = null;
+            }
+            
+            hierarchy.checkedAt = Date.now();
+            return hierarchy.data;
+        })();
+        
+        try {
+            return await hierarchy.pending;
+        } catch (error) {
+            console.error('기준 정보 조회 오류:', error);
+            throw error;
+        } finally {
+            hierarchy.pending = null;
+        }
+    }
+    
+    // 기준 정보를 ID로 찾을 수 있는 맵 (productGroups, processes, targets, equipments)
+    async getHierarchyIndex() {
+        await this.getHierarchy();
+        const hierarchy = this.hierarchy;
+        
+        if (!hierarchy.index) {
+            const index = { productGroups: {}, processes: {}, targets: {}, equipments: {} };
+            hierarchy.data.product_groups.forEach(productGroup => {
+                index.productGroups[productGroup.id] = productGroup;
+                productGroup.processes.forEach(process => {
+                    index.processes[process.id] = process;
+                    process.targets.forEach(target => {
+                        index.targets[target.id] = target;
+                    });
+                });
+            });
+            hierarchy.data.equipments.forEach(equipment => {
+                index.equipments[equipment.id] = equipment;
+            });
+            hierarchy.index = index;
+        }
+        
+        return hierarchy.index;
+    }
+    
+    // 기준 정보 변경 후 다음 조회 시 재검증
+    invalidateHierarchy() {
+        this.hierarchy.checkedAt = 0;
+    }
+    
+    // 제품군 관련 메서드 (기준 정보 스냅샷에서 조회)
     async getProductGroups() {
-        return this.get(this.endpoints.PRODUCT_GROUPS);
+        const hierarchy = await this.getHierarchy();
+        return hierarchy.product_groups.map(({ processes, ...productGroup }) => productGroup);
     }
     
     // 공정 관련 메서드
     async getProcesses(productGroupId = null) {
-        const params = productGroupId ? { product_group_id: productGroupId } : {};
-        return this.get(this.endpoints.PROCESSES, params);
+        const hierarchy = await this.getHierarchy();
+        const processes = [];
+        hierarchy.product_groups.forEach(productGroup => {
+            if (productGroupId && productGroup.id !== Number(productGroupId)) return;
+            productGroup.processes.forEach(({ targets, ...process }) => processes.push(process));
+        });
+        return processes;
     }
     
     // 타겟 관련 메서드
     async getTargets(processId = null) {
-        const params = processId ? { process_id: processId } : {};
-        return this.get(this.endpoints.TARGETS, params);
+        const hierarchy = await this.getHierarchy();
+        const targets = [];
+        hierarchy.product_groups.forEach(productGroup => {
+            productGroup.processes.forEach(process => {
+                if (processId && process.id !== Number(processId)) return;
+                process.targets.forEach(target => targets.push({ ...target }));
+            });
+        });
+        return targets;
     }
     
     // 장비 관련 메서드
     async getEquipments() {
-        return this.get(this.endpoints.EQUIPMENTS);
+        const hierarchy = await this.getHierarchy();
+        return hierarchy.equipments.map(equipment => ({ ...equipment }));
     }
     
     // 측정 데이터 관련 메서드
@@ -163,6 +269,18 @@ class API {
         return this.get(this.endpoints.MEASUREMENTS, params);
     }
     
+    // LOT NO 자동완성
+    async suggestLotNos(query, targetId = null) {
+        const params = { q: query };
+        if (targetId) params.target_id = targetId;
+        return this.get(`${this.endpoints.MEASUREMENTS}/lot-suggestions`, params);
+    }
+    
+    // 측정 데이터 페이지 조회 (params: 필터, sort, order, limit, cursor)
+    async getMeasurementsPage(params = {}) {
+        return this.get(`${this.endpoints.MEASUREMENTS}/page`, params);
+    }
+    
     async createMeasurement(data) {
         return this.post(this.endpoints.MEASUREMENTS, data);
     }
@@ -188,15 +306,54 @@ class API {
         return this.get(`${this.endpoints.SPC}/analyze/${targetId}`, params);
     }
     
+    // 입력 시점에 감지된 SPC 알림 조회
+    async getSpcAlerts(params = {}) {
+        return this.get(`${this.endpoints.SPC}/alerts`, params);
+    }
+    
+    async getSpcState(targetId) {
+        return this.get(`${this.endpoints.SPC}/state/${targetId}`);
+    }
+    
+    // 고정 관리 한계선 (Phase I 기준 기간으로 산출, Phase II 판정에 사용)
+    async getControlLimits(targetId) {
+        return this.get(`${this.endpoints.SPC}/limits/${targetId}`);
+    }
+    
+    async getControlLimitVersions(targetId) {
+        return this.get(`${this.endpoints.SPC}/limits/${targetId}/versions`);
+    }
+    
+    // data: { start_date, end_date, sigma_level, reason }
+    async establishControlLimits(targetId, data) {
+        return this.post(`${this.endpoints.SPC}/limits/${targetId}`, data);
+    }
+    
+    async activateControlLimits(targetId, version) {
+        return this.put(`${this.endpoints.SPC}/limits/${targetId}/versions/${version}/activate`, {});
+    }
+    
+    async releaseControlLimits(targetId) {
+        return this.delete(`${this.endpoints.SPC}/limits/${targetId}`);
+    }
+    
     // 통계 관련 메서드
     async getTargetStatistics(targetId, params) {
         // params가 숫자인 경우 days로 처리 (이전 버전 호환성)
         if (typeof params === 'number') {
             params = { days: params };
         }
+        // 기본은 DB 집계 방식 사용 (기간이 길어도 응답 시간 일정)
+        // 일별 집계(mode: 'rollup')는 백필 여부를 확인하지 않으므로 명시적으로 지정한 경우에만 사용
+        params = Object.assign({ mode: 'pushdown' }, params);
         return this.get(`${this.endpoints.STATISTICS}/target/${targetId}`, params);
     }
     
+    // 전체 타겟 공정능력지수 히트맵 (params: days, product_group_id)
+    async getCpkHeatmap(params = { days: 14 }) {
+        return this.get(`${this.endpoints.STATISTICS}/heatmap`, params);
+    }
+    
     // 보고서 관련 메서드
     async getReports(params = {}) {
         return this.get(this.endpoints.REPORTS, params);
@@ -308,14 +308,19 @@
             // 결과 카드 숨기기
             document.getElementById('result-card').style.display = 'none';
             
-            // API 호출
-            const response = await fetch(`${API_CONFIG.BASE_URL}/bulk-upload`, {
+            // 작업 등록 (파일 저장 후 바로 작업 ID 반환)
+            const response = await fetch(`${API_CONFIG.BASE_URL}/bulk-upload/jobs`, {
                 method: 'POST',
                 body: formData
             });
             
             // JSON 응답 파싱
-            const result = await response.json();
+            let result = await response.json();
+            
+            // 작업이 끝날 때까지 진행 상황 조회
+            if (response.ok) {
+                result = await waitForImportJob(result.job_id, uploadBtn);
+            }
             
             // 업로드 버튼 복원
             uploadBtn.disabled = false;
@@ -343,6 +348,34 @@
         }
     }
     
+    // 가져오기 작업 진행 상황 조회 (완료 또는 실패할 때까지)
+    async function waitForImportJob(jobId, uploadBtn) {
+        while (true) {
+            const response = await fetch(`${API_CONFIG.BASE_URL}/bulk-upload/jobs/${jobId}`);
+            const job = await response.json();
+            
+            if (!response.ok || job.status === 'completed') {
+                return job;
+            }
+            
+            if (job.status === 'failed') {
+                return {
+                    ...job,
+                    detail: `${job.error_message || '알 수 없는 오류'} (${job.total_rows}개 행까지 처리됨)`
+                };
+            }
+            
+            if (job.status === 'pending' && job.queue_position) {
+                uploadBtn.innerHTML = `<i class="fas fa-spinner fa-spin mr-1"></i> 대기 중 (${job.queue_position}번째)...`;
+            } else {
+                const speed = job.rows_per_second ? ` · ${Math.round(job.rows_per_second)}행/초` : '';
+                uploadBtn.innerHTML = `<i class="fas fa-spinner fa-spin mr-1"></i> ${job.total_rows}행 처리 중${speed}...`;
+            }
+            
+            await new Promise(resolve => setTimeout(resolve, 1000));
+        }
+    }
+    
     // 업로드 결과 표시
     function displayResult(result) {
         const resultContainer = document.getElementById('upload-result');
@@ -367,9 +400,10 @@
             
             // 오류가 있는 경우
             if (result.errors && result.errors.length > 0) {
+                const errorCount = result.error_count || result.errors.length;
                 resultHtml += `
                 <div class="alert alert-warning">
-                    <h5><i class="icon fas fa-exclamation-triangle"></i> 부분적으로 성공 (${result.errors.length}개 오류)</h5>
+                    <h5><i class="icon fas fa-exclamation-triangle"></i> 부분적으로 성공 (${errorCount}개 오류)</h5>
                     <p>다음 행에서 오류가 발생하여 처리되지 않았습니다:</p>
                     <div class="table-responsive mt-3">
                         <table class="table table-sm table-bordered">
@@ -394,11 +428,11 @@
                 });
                 
                 // 표시되지 않은 오류가 있는 경우
-                if (result.errors.length > 20) {
+                if (errorCount > 20) {
                     resultHtml += `
                     <tr>
                         <td colspan="2" class="text-center">
-                            ... 외 ${result.errors.length - 20}개의 오류가 더 있습니다.
+                            ... 외 ${errorCount - 20}개의 오류가 더 있습니다.
                         </td>
                     </tr>
                     `;
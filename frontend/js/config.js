@@ -27,6 +27,8 @@ const API_CONFIG = {
         DISTRIBUTION: "/distribution",
         // 박스플롯 분석 엔드포인트 추가
         BOXPLOT: '/statistics/boxplot',
+        // 기준 정보 스냅샷 (제품군 > 공정 > 타겟, 장비)
+        HIERARCHY: '/hierarchy',
     }
 };
 
@@ -4,6 +4,9 @@ let monitoringCharts = [];
 let monitoringTargets = [];
 let currentPeriodDays = 14; // 기본값은 14일
 
+// 모니터링 차트에 보낼 최대 점 수 (초과 시 서버에서 다운샘플링)
+const MONITORING_CHART_MAX_POINTS = 300;
+
 // 초기화 함수
 function initDashboard() {
     // 공정능력지수 히트맵 로드
@@ -103,82 +106,17 @@ async function loadCpkHeatmap() {
         // 히트맵 데이터 초기화
         cpkHeatmapData = [];
         
-        // 제품군 목록 한 번에 가져오기 
-        const productGroups = await api.getProductGroups();
-        
-        // 모든 공정 정보 병렬로 가져오기
-        const processPromises = productGroups.map(productGroup => 
-            api.getProcesses(productGroup.id).then(processes => 
-                ({ productGroup, processes })
-            )
-        );
-        
-        const processResults = await Promise.all(processPromises);
-        
-        // 모든 타겟 정보 병렬로 가져오기 
-        const targetPromises = [];
-        processResults.forEach(result => {
-            result.processes.forEach(process => {
-                targetPromises.push(
-                    api.getTargets(process.id).then(targets => 
-                        ({ 
-                            productGroup: result.productGroup, 
-                            process, 
-                            targets 
-                        })
-                    )
-                );
-            });
-        });
-        
-        const targetResults = await Promise.all(targetPromises);
-        
-        // 각 타겟에 대한 통계 정보 한 번에 요청 (병렬 처리)
-        const statisticsPromises = [];
-        const targetMap = {};  // 타겟 ID를 키로 하는 맵 (통계 결과와 연결하기 위함)
-        
-        targetResults.forEach(result => {
-            result.targets.forEach(target => {
-                // 통계 정보 가져오기 (비동기)
-                statisticsPromises.push(
-                    api.getTargetStatistics(target.id, currentPeriodDays)
-                        .then(stats => ({ targetId: target.id, stats }))
-                        .catch(error => {
-                            console.warn(`타겟 ${target.id}에 대한 통계 정보를 가져올 수 없습니다.`, error);
-                            return { targetId: target.id, stats: null };
-                        })
-                );
-                
-                // 타겟 정보 맵에 저장
-                targetMap[target.id] = {
-                    productGroup: result.productGroup,
-                    process: result.process,
-                    target
-                };
-            });
-        });
-        
-        // 모든 통계 정보 요청을 병렬로 처리하고 결과 받기
-        const statisticsResults = await Promise.all(statisticsPromises);
+        // 전체 타겟의 공정능력지수를 한 번에 조회
+        const heatmap = await api.getCpkHeatmap({ days: heatmapDays });
         
-        // 모든 데이터를 결합하여 히트맵 데이터 생성
-        statisticsResults.forEach(({ targetId, stats }) => {
-            const targetInfo = targetMap[targetId];
-            if (!targetInfo) return;
-            
-            // 공정능력지수 추출
-            let cpk = null;
-            if (stats && stats.process_capability && stats.process_capability.cpk !== undefined) {
-                cpk = stats.process_capability.cpk;
-            }
-            
-            // 히트맵 데이터에 추가
+        // 히트맵 데이터 생성
+        heatmap.items.forEach(item => {
             cpkHeatmapData.push({
-                productGroup: targetInfo.productGroup.name,
-                process: targetInfo.process.name,
-                target: targetInfo.target.name,
-                cpk: cpk,
-                targetId: targetId
+                productGroup: item.product_group,
+                process: item.process,
+                target: item.target,
+                cpk: item.cpk,
+                targetId: item.target_id
             });
         });
         
@@ -728,8 +666,12 @@ async function createMonitoringChart(index) {
     const target = monitoringTargets[index];
     
     try {
-        // SPC 분석 데이터 가져오기 (최근 30일)
-        const spcResult = await api.analyzeSpc(target.targetId, 30);
+        // SPC 분석 데이터 가져오기 (최근 30일, 작은 차트이므로 다운샘플링하고 평균값 관리 한계선만 계산)
+        const spcResult = await api.analyzeSpc(target.targetId, {
+            days: 30,
+            max_points: MONITORING_CHART_MAX_POINTS,
+            sections: 'control_limits'
+        });
         
         // 차트 데이터 준비
         const labels = spcResult.data.dates.map(date => date.split('T')[0]);
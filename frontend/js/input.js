@@ -487,6 +487,29 @@
         });
     
         
+        // LOT NO 자동완성 (입력이 멈춘 뒤 조회)
+        let lotSuggestTimer = null;
+        document.getElementById('lot-no').addEventListener('input', function() {
+            const query = this.value.trim();
+            clearTimeout(lotSuggestTimer);
+            
+            if (!query) {
+                document.getElementById('lot-no-suggestions').innerHTML = '';
+                return;
+            }
+            
+            lotSuggestTimer = setTimeout(async () => {
+                try {
+                    const lotNos = await api.suggestLotNos(query, selectedTargetId);
+                    document.getElementById('lot-no-suggestions').innerHTML = lotNos
+                        .map(lotNo => `<option value="${lotNo}"></option>`)
+                        .join('');
+                } catch (error) {
+                    console.error('LOT NO 자동완성 조회 실패:', error);
+                }
+            }, 250);
+        });
+        
         // 측정값 입력 필드에 SPEC 검증 이벤트 추가
         document.querySelectorAll('.measurement-value').forEach(input => {
             input.addEventListener('input', function(e) {
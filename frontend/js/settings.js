@@ -1163,6 +1163,9 @@ async function saveEquipment() {
             throw new Error('장비 저장에 실패했습니다.');
         }
         
+        // 기준 정보 스냅샷 재검증
+        api.invalidateHierarchy();
+        
         // 성공 메시지
         alert(equipmentId ? '장비가 수정되었습니다.' : '새 장비가 추가되었습니다.');
         
@@ -1189,6 +1192,9 @@ async function deleteEquipment(equipmentId) {
             throw new Error('장비 삭제에 실패했습니다.');
         }
         
+        // 기준 정보 스냅샷 재검증
+        api.invalidateHierarchy();
+        
         // 성공 메시지
         alert('장비가 삭제되었습니다.');
         
@@ -7,6 +7,9 @@
     let selectedTargetId = null;
     let rChart = null; // 추가: R 차트 변수
     
+    // 관리도에 보낼 최대 점 수 (초과 시 서버에서 다운샘플링)
+    const SPC_CHART_MAX_POINTS = 1500;
+    
     // 페이지 초기화
     async function initSpcPage() {
         // 제품군 목록 로드
@@ -241,6 +244,9 @@
                 apiParams.end_date = endDate;
             }
 
+            // 차트용 시계열은 다운샘플링 (규칙/SPEC 위반 점은 항상 포함)
+            apiParams.max_points = SPC_CHART_MAX_POINTS;
+
             // SPC 분석 API 호출
             const result = await api.analyzeSpc(selectedTargetId, apiParams);
 
@@ -294,7 +300,7 @@
         createRChart(result);
         
         // 관리 한계 테이블 업데이트
-        updateControlLimitsTable(result.control_limits);
+        updateControlLimitsTable(result.control_limits, result.control_limit_source);
         
         // 공정능력지수 테이블 업데이트 (process_capability가 없을 수도 있음)
         updateCapabilityTable(result.process_capability || {});
@@ -677,13 +683,20 @@
             }
         }
         
-        // R 차트의 관리 한계 계산
-        // 이 값은 API에서 제공하거나 직접 계산할 수 있음
-        const rAvg = rValues.reduce((sum, value) => sum + value, 0) / rValues.length;
-        const d2 = 2.326; // k=5 subgroup 크기에 대한 d2 상수 (위치 5개 기준)
-        const d3 = 0.864; // k=5에 대한 d3 상수
-        const rUcl = rAvg + (3 * rAvg * d3 / d2);
-        const rLcl = Math.max(0, rAvg - (3 * rAvg * d3 / d2)); // LCL은 0보다 작을 수 없음
+        // R 차트의 관리 한계
+        // 차트 시계열은 다운샘플링되므로 API가 전체 데이터로 계산한 값을 사용하고, 없으면 직접 계산
+        let rAvg, rUcl, rLcl;
+        if (data.r_chart_limits) {
+            rAvg = data.r_chart_limits.cl;
+            rUcl = data.r_chart_limits.ucl;
+            rLcl = data.r_chart_limits.lcl;
+        } else {
+            rAvg = rValues.reduce((sum, value) => sum + value, 0) / rValues.length;
+            const d2 = 2.326; // k=5 subgroup 크기에 대한 d2 상수 (위치 5개 기준)
+            const d3 = 0.864; // k=5에 대한 d3 상수
+            rUcl = rAvg + (3 * rAvg * d3 / d2);
+            rLcl = Math.max(0, rAvg - (3 * rAvg * d3 / d2)); // LCL은 0보다 작을 수 없음
+        }
         
         // Chart.js 설정
         const ctx = document.getElementById('r-chart').getContext('2d');
@@ -781,11 +794,16 @@
     }
 
     // 관리 한계 테이블 업데이트
-    function updateControlLimitsTable(controlLimits) {
+    function updateControlLimitsTable(controlLimits, source) {
         if (!controlLimits) {
             return;
         }
         
+        // 한계선 출처 (Phase II: 저장된 고정 한계선)
+        const sourceText = source && source.phase === 'II'
+            ? `고정 한계선 v${source.version} (${source.phase1_start.slice(0, 10)} ~ ${source.phase1_end.slice(0, 10)}, ${source.sample_count}개)`
+            : '조회 기간 기준';
+        
         // 테이블 업데이트
         const tableBody = document.querySelector('#control-limits-table tbody');
         
@@ -802,6 +820,10 @@
             <th>하한 관리선 (LCL)</th>
             <td>${controlLimits.lcl ? controlLimits.lcl.toFixed(3) : '-'}</td>
         </tr>
+        <tr>
+            <th>기준</th>
+            <td>${sourceText}</td>
+        </tr>
         `;
     }
     
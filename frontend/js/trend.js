@@ -10,6 +10,9 @@
     let customStartDate = null;
     let customEndDate = null;
     
+    // 추이 차트에 보낼 최대 점 수 (초과 시 서버에서 다운샘플링)
+    const TREND_CHART_MAX_POINTS = 1500;
+    
     // 페이지 초기화
     async function initTrendPage() {
         // 날짜 범위 선택기 초기화 (삭제)
@@ -164,7 +167,7 @@
             // 측정 데이터 API 호출
             const measureParams = {
                 target_id: selectedTargetId,
-                limit: 1000,
+                max_points: TREND_CHART_MAX_POINTS,
                 ...params
             };
             const measurementsResult = await api.getMeasurements(measureParams);
@@ -9,6 +9,16 @@
     
     // 전역 변수 (함수 맨 위에 추가)
     let currentMeasurementId = null;
+    
+    // 페이지 조회 상태 (서버 정렬 + 커서)
+    const PAGE_SIZE = 100;
+    const pageState = {
+        sort: 'created_at',
+        order: 'desc',
+        nextCursor: null,
+        totalCount: null,
+        totalIsEstimate: false
+    };
 
     // 페이지 초기화
     async function initViewPage() {
@@ -84,38 +94,52 @@
         }
     }
     
-    // 측정 데이터 로드
-    async function loadMeasurements() {
+    // 측정 데이터 로드 (loadMore가 true이면 다음 페이지를 이어서 로드)
+    async function loadMeasurements(loadMore = false) {
         try {
-            // 로딩 표시
-            document.getElementById('data-table-body').innerHTML = `
-            <tr>
-                <td colspan="12" class="text-center">
-                    <div class="spinner-border text-primary" role="status">
-                        <span class="sr-only">로딩 중...</span>
-                    </div>
-                </td>
-            </tr>
-            `;
+            if (!loadMore) {
+                // 로딩 표시
+                document.getElementById('data-table-body').innerHTML = `
+                <tr>
+                    <td colspan="12" class="text-center">
+                        <div class="spinner-border text-primary" role="status">
+                            <span class="sr-only">로딩 중...</span>
+                        </div>
+                    </td>
+                </tr>
+                `;
+                pageState.nextCursor = null;
+            }
             
             // 필터 파라미터 수집
             const filters = getFilterParams();
             
-            // API 호출 파라미터
+            // API 호출 파라미터 (서버 정렬 + 커서 페이지네이션)
             const params = {
                 ...filters,
-                limit: 100
+                sort: pageState.sort,
+                order: pageState.order,
+                limit: PAGE_SIZE
             };
+            if (loadMore && pageState.nextCursor) {
+                params.cursor = pageState.nextCursor;
+                params.include_total = false;
+            }
             
             // 측정 데이터 가져오기
-            const measurements = await api.getMeasurements(params);
+            const page = await api.getMeasurementsPage(params);
             
             // 캐시에 저장
-            measurementsCache = measurements;
+            measurementsCache = loadMore ? measurementsCache.concat(page.items) : page.items;
+            pageState.nextCursor = page.next_cursor;
+            if (!loadMore) {
+                pageState.totalCount = page.total_count;
+                pageState.totalIsEstimate = page.total_is_estimate;
+            }
             
             // 테이블 업데이트
-            updateDataTable(measurements);
-            
+            updateDataTable(measurementsCache);
+            updatePageControls();
             
         } catch (error) {
             console.error('측정 데이터 로드 실패:', error);
@@ -129,6 +153,28 @@
         }
     }
     
+    // 건수 표시 및 더 보기 버튼 갱신
+    function updatePageControls() {
+        const total = pageState.totalCount;
+        let countText = `${measurementsCache.length}건 표시`;
+        if (total !== null && total !== undefined) {
+            countText += ` / 전체 ${total.toLocaleString()}${pageState.totalIsEstimate ? '건 이상' : '건'}`;
+        }
+        document.getElementById('data-count').textContent = countText;
+        document.getElementById('load-more').style.display = pageState.nextCursor ? '' : 'none';
+        
+        // 정렬 표시
+        document.querySelectorAll('#data-table th.sortable').forEach(th => {
+            const icon = th.querySelector('i');
+            if (!icon) return;
+            if (th.dataset.sort === pageState.sort) {
+                icon.className = `fas fa-sort-${pageState.order === 'asc' ? 'up' : 'down'}`;
+            } else {
+                icon.className = 'fas fa-sort text-muted';
+            }
+        });
+    }
+    
     // frontend/js/view.js 파일의 getFilterParams 함수 수정
 
     function getFilterParams() {
@@ -174,6 +220,9 @@
         
         let tableHtml = '';
         
+        // 기준 정보 스냅샷으로 캐시 채우기 (스냅샷에 없는 항목만 개별 조회)
+        await fillCachesFromHierarchy();
+        
         // 필요한 모든 ID 목록 수집
         const targetIds = new Set();
         const processIds = new Set();
@@ -637,7 +686,7 @@
         // 필터 폼 제출 이벤트
         document.getElementById('filter-form').addEventListener('submit', function(e) {
             e.preventDefault();
-            loadMeasurements(1);
+            loadMeasurements();
         });
         
         // 필터 폼 초기화 이벤트
@@ -648,10 +697,28 @@
             
             // 1초 후 데이터 리로드 (폼 리셋 완료 후)
             setTimeout(() => {
-                loadMeasurements(1);
+                loadMeasurements();
             }, 100);
         });
         
+        // 더 보기 버튼 이벤트
+        document.getElementById('load-more').addEventListener('click', function() {
+            loadMeasurements(true);
+        });
+        
+        // 열 제목 클릭 시 서버 정렬 (같은 열을 다시 누르면 방향 전환)
+        document.querySelectorAll('#data-table th.sortable').forEach(th => {
+            th.addEventListener('click', function() {
+                if (pageState.sort === this.dataset.sort) {
+                    pageState.order = pageState.order === 'desc' ? 'asc' : 'desc';
+                } else {
+                    pageState.sort = this.dataset.sort;
+                    pageState.order = 'desc';
+                }
+                loadMeasurements();
+            });
+        });
+        
         // 내보내기 버튼 이벤트
         document.getElementById('export-csv').addEventListener('click', function(e) {
             e.preventDefault();
@@ -788,8 +855,23 @@
         }
     }
 
+    // 기준 정보 스냅샷으로 타겟/공정/제품군/장비 캐시 채우기
+    async function fillCachesFromHierarchy() {
+        try {
+            const index = await api.getHierarchyIndex();
+            Object.assign(targetsCache, index.targets);
+            Object.assign(processesCache, index.processes);
+            Object.assign(productGroupsCache, index.productGroups);
+            Object.assign(equipmentsCache, index.equipments);
+        } catch (error) {
+            console.error('기준 정보 스냅샷 로드 실패:', error);
+        }
+    }
+
     // 내보내기용 데이터 준비
     async function prepareExportData(measurements) {
+        await fillCachesFromHierarchy();
+        
         // 측정 데이터 추가 정보 로드
         let exportData = [];
         let count = 0;